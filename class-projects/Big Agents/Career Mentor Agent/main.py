@@ -1,68 +1,45 @@
-import os
+import sys
 import asyncio
-from dotenv import load_dotenv
-from typing import List, Dict
+import argparse
+from pathlib import Path
+from typing import TYPE_CHECKING
 from colorama import init, Fore, Style
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, handoff
-from agents.run import RunConfig
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.cache import cache_from_env
+from common.history import HistoryStore
+from common.lazy import AgentGraph
+from common.metrics import format_summary, metrics_from_env
+from common.prompts import compile_prompt
+from common.provider import get_config
+from common.router import IntentRouter
+from common.sessions import restore_history, session_store_from_env
+from common.speculate import Speculator
+from common.streaming import stream_turn
+from common.tools import tool
+from roadmaps import get_index
+
+if TYPE_CHECKING:
+    from agents import Agent
 
 init(autoreset=True)
 
-load_dotenv()
-gemini_api_key = os.getenv("GEMINI_API_KEY")
-if not gemini_api_key:
-    raise ValueError("GEMINI_API_KEY is not set in your .env file.")
+MODEL_NAME = "gemini-2.5-flash"
 
 # === Tools ===
 def get_career_roadmap(field: str) -> str:
-    field = field.lower()
-    if "software" in field:
-        return "🧑‍💻 Software Engineering Roadmap:\n1. Learn Python or Java\n2. Study Data Structures\n3. Build full-stack apps\n4. Version control (Git)\n5. Interview prep"
-    elif "data" in field:
-        return "📊 Data Science Roadmap:\n1. Python & Statistics\n2. Pandas, NumPy, Scikit-learn\n3. ML Models\n4. Kaggle projects\n5. Portfolio & Jobs"
-    elif "medicine" in field:
-        return "🩺 Medical Field Roadmap:\n1. Pre-med subjects\n2. Medical entrance tests\n3. MBBS studies\n4. Clinical rotations\n5. Specialization"
-    else:
-        return f"⚠️ No roadmap found for '{field}'. Try software, data, or medicine."
-
-# === Main Function ===
-async def main_cli():
-    print(Fore.CYAN + "🎓 Welcome to Career Mentor AI!")
-    print(Fore.CYAN + "Tell me your career goals or interests, and I’ll guide you through next steps.")
-    print(Fore.YELLOW + "Type 'exit' to quit.\n")
-
-    client = AsyncOpenAI(
-        api_key=gemini_api_key,
-        base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
-    )
-    
-    model = OpenAIChatCompletionsModel(
-        model="gemini-2.5-flash",
-        openai_client=client
-    )
-    
-    config = RunConfig(
-        model=model,
-        model_provider=client,
-        tracing_disabled=True
-    )
-
-    # Agents
-    skill_agent = Agent(
-        name="SkillAgent",
-        instructions="You provide step-by-step skill roadmaps based on the user's career interest. Ask for their target field and use get_career_roadmap().",
-        model=model,
-        tools={"get_career_roadmap": get_career_roadmap}
-    )
-
-    job_agent = Agent(
-        name="JobAgent",
-        instructions="You suggest popular job roles, responsibilities, and how to prepare for them.",
-        model=model
-    )
-
-    # Career Mentor Agent instructions
-    Career_Agent_Instrucution = """
+    # Roadmaps live in roadmaps.json; the index matches aliases and typos too.
+    index = get_index()
+    matches = index.search(field)
+    if not matches or matches[0].score < 0.3:
+        if matches:
+            return f"⚠️ No roadmap found for '{field}'. Closest fields: {', '.join(m.roadmap.field for m in matches)}."
+        return f"⚠️ No roadmap found for '{field}'. Try {', '.join(r.field.lower() for r in index.roadmaps[:5])}, ..."
+    best, related = matches[0], [m.roadmap.field for m in matches[1:] if m.score >= 0.3]
+    return best.roadmap.render() + (f"\nRelated: {', '.join(related)}" if related else "")
+
+# Career Mentor Agent instructions
+Career_Agent_Instrucution = """
 ## 💼 Advanced AI Career Mentor Prompt
 
 You are a friendly and intelligent **AI Career Mentor** designed to help users explore and plan their future careers. Your role is to **understand the user's goals and questions**, then connect them to the appropriate specialist agent for expert guidance.
@@ -118,64 +95,163 @@ Use the appropriate handoff function when the user's request matches the criteri
 > 🎯 Your mission is to empower users in their career journeys by helping them explore, plan, and grow with the right expert support.
 """
 
+# === Agents ===
+# Built on first use rather than at import (see common/lazy.py), so the CLI
+# shows its prompt without waiting for the Agents SDK to load.
+def build_agents() -> dict:
+    from agents import Agent, handoff
+
+    skill_agent = Agent(
+        name="SkillAgent",
+        instructions="You provide step-by-step skill roadmaps based on the user's career interest. Ask for their target field and use get_career_roadmap().",
+        tools=[tool(get_career_roadmap, ttl=3600)]
+    )
+
+    job_agent = Agent(
+        name="JobAgent",
+        instructions="You suggest popular job roles, responsibilities, and how to prepare for them."
+    )
+
     career_agent = Agent(
         name="CareerAgent",
-        instructions=Career_Agent_Instrucution,
-        model=model,
+        instructions=compile_prompt("CareerAgent", Career_Agent_Instrucution),
         handoffs=[
             handoff(skill_agent, tool_name_override="handoff_to_skill", tool_description_override="Handoff to SkillAgent for skill roadmaps"),
             handoff(job_agent, tool_name_override="handoff_to_job", tool_description_override="Handoff to JobAgent for job roles and salaries"),
         ]
     )
 
-    history: List[Dict[str, str]] = []
-    agent = career_agent
+    agents = {agent.name: agent for agent in [career_agent, skill_agent, job_agent]}
+    return {"career_agent": career_agent, "skill_agent": skill_agent, "job_agent": job_agent, "AGENTS": agents}
+
+graph = AgentGraph(build_agents)
+__getattr__ = graph.module_getattr
+
+AGENT_INFO = {
+    "SkillAgent": {
+        "emoji": "📚",
+        "description": "I'll create a detailed skill roadmap to help you succeed in your chosen field!"
+    },
+    "JobAgent": {
+        "emoji": "💼",
+        "description": "I'll help you explore job roles, salaries, and career preparation strategies!"
+    }
+}
+
+# Unambiguous requests go straight to the specialist, skipping the CareerAgent triage call.
+intent_router = IntentRouter({
+    "JobAgent": ["salary", "salaries", "job", "hiring", "interview", "resume", "job role", "job title",
+                 "pay", "career preparation"],
+    "SkillAgent": ["learn", "skill", "roadmap", "course", "learning path", "study", "certification",
+                   "what should i learn"],
+})
+
+def start_agent(agent: "Agent", user_input: str) -> "Agent":
+    if agent is graph.career_agent:
+        return graph.AGENTS.get(intent_router.confident(user_input), agent)
+    return agent
+
+def final_agent(result):
+    # Newer SDK releases expose the agent that produced the answer as last_agent.
+    return getattr(result, "final_agent", None) or getattr(result, "last_agent", None)
+
+# === Main Function ===
+async def main_cli(stream: bool = False, session: str | None = None, speculate: bool = False):
+    print(Fore.CYAN + "🎓 Welcome to Career Mentor AI!")
+    print(Fore.CYAN + "Tell me your career goals or interests, and I’ll guide you through next steps.")
+    print(Fore.YELLOW + "Type 'exit' to quit.\n")
+
+    # The SDK, agents and model client load in the background while the user types.
+    graph.prewarm(lambda: get_config(MODEL_NAME))
+    history = HistoryStore()
+    agent = config = run = cache = speculator = None
+    metrics = metrics_from_env()
+    store = session_store_from_env() if session else None
+    saved = store.load(session) if store else None
+    if saved:
+        restore_history(history, saved)
+        print(Fore.YELLOW + f"📂 Resumed '{session}': {len(saved.messages)} messages, "
+                            f"talking to {saved.agent or 'CareerAgent'}.\n")
 
     while True:
         user_input = input(Fore.GREEN + "👤 You: ")
         if user_input.strip().lower() in ["exit", "quit"]:
             print(Fore.MAGENTA + "👋 Goodbye and best of luck with your career!")
+            if cache:
+                print(Fore.YELLOW + f"⚡ Cache: {cache.summary()}")
+            if speculator:
+                print(Fore.YELLOW + f"🎯 Speculation: {speculator.summary()}")
+            if metrics.exporting:
+                print(Fore.YELLOW + f"📈 Latency: {format_summary(metrics.summary('career'))}")
+            if store:
+                store.close()
             break
 
+        if agent is None:
+            # First turn: waits for the prewarm if it is still running.
+            try:
+                from agents import Runner
+
+                config = get_config(MODEL_NAME)
+                agent = graph.AGENTS.get(saved.agent if saved else None, graph.career_agent)
+                cache = cache_from_env(graph.AGENTS.values(), cacheable=["JobAgent"])
+                run = cache.run if cache else Runner.run
+                if speculate and not stream:
+                    speculator = Speculator(graph.career_agent, intent_router, graph.AGENTS, run)
+            except Exception as e:
+                print(Fore.RED + f"❌ Error: {str(e)}")
+                continue
+
         history.append({"role": "user", "content": user_input})
 
         try:
-            result = await Runner.run(agent, history, run_config=config)
+            with metrics.turn("career") as turn:
+                start = start_agent(agent, user_input)
+                if stream:
+                    result = await stream_turn(start, history.window(), config, cache, hooks=turn.hooks)
+                elif speculator:
+                    result = await speculator.run(agent, history.window(), user_input, run_config=config,
+                                                  hooks=turn.hooks)
+                else:
+                    result = await run(start, history.window(), run_config=config, hooks=turn.hooks)
+                turn.finish(result)
             final = result.final_output
 
             # Show handoff message if agent changed
-            if hasattr(result, 'final_agent') and result.final_agent and result.final_agent != agent:
+            new_agent = final_agent(result)
+            if new_agent and new_agent != agent:
                 # Get agent name safely
-                if isinstance(result.final_agent, Agent):
-                    agent_name = result.final_agent.name
-                    agent = result.final_agent
+                if hasattr(new_agent, "name"):
+                    agent_name = new_agent.name
+                    agent = new_agent
                 else:
-                    agent_name = result.final_agent
-
-                # Emoji and description
-                agent_info = {
-                    "SkillAgent": {
-                        "emoji": "📚",
-                        "description": "I'll create a detailed skill roadmap to help you succeed in your chosen field!"
-                    },
-                    "JobAgent": {
-                        "emoji": "💼",
-                        "description": "I'll help you explore job roles, salaries, and career preparation strategies!"
-                    }
-                }
-
-                info = agent_info.get(agent_name, {"emoji": "🤖", "description": "I'll help you with your request!"})
+                    agent_name = new_agent
+
+                info = AGENT_INFO.get(agent_name, {"emoji": "🤖", "description": "I'll help you with your request!"})
                 print(Fore.LIGHTYELLOW_EX + f"{info['emoji']} Switching to {agent_name}...\n{info['description']}\n")
 
-            # Display response
-            agent_display_name = agent.name if isinstance(agent, Agent) else str(agent)
-            print(Fore.BLUE + f"🤖 {agent_display_name}: " + Style.RESET_ALL + final)
+            # Display response (already shown token by token when streaming)
+            if not stream:
+                agent_display_name = getattr(agent, "name", str(agent))
+                print(Fore.BLUE + f"🤖 {agent_display_name}: " + Style.RESET_ALL + final)
 
             history.append({"role": "assistant", "content": final})
+            if store:
+                store.save_turn(session, [{"role": "user", "content": user_input},
+                                          {"role": "assistant", "content": final}], agent=agent.name)
 
         except Exception as e:
             print(Fore.RED + f"❌ Error: {str(e)}")
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Career Mentor AI")
+    parser.add_argument("--stream", action="store_true", help="Print replies token by token as they are generated")
+    parser.add_argument("--session", metavar="NAME", help="Save the conversation under NAME and resume it next time")
+    parser.add_argument("--speculate", action="store_true",
+                        help="Answer with the predicted specialist while a short triage call checks it (not with --stream)")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    asyncio.run(main_cli())
+    args = parse_args()
+    asyncio.run(main_cli(args.stream, args.session, args.speculate))
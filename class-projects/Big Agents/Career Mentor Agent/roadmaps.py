@@ -0,0 +1,197 @@
+import re
+import json
+import math
+import bisect
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+DATA_PATH = Path(__file__).with_name("roadmaps.json")
+
+STOPWORDS = {"a", "an", "the", "in", "into", "of", "for", "to", "and", "or", "i", "want", "become", "be",
+             "career", "roadmap", "field", "job", "jobs", "my", "as", "how", "learn", "about", "me"}
+
+_word = re.compile(r"[a-z0-9+#]+")
+
+
+def _tokens(text: str) -> List[str]:
+    # Lower-cased words with a plural "s" dropped ("engineers" -> "engineer").
+    words = _word.findall(text.lower())
+    return [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words]
+
+
+def _trigrams(word: str) -> set:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class Roadmap:
+    field: str
+    emoji: str
+    steps: Tuple[str, ...]
+    aliases: Tuple[str, ...] = ()
+
+    def render(self) -> str:
+        steps = "\n".join(f"{i}. {step}" for i, step in enumerate(self.steps, 1))
+        return f"{self.emoji} {self.field} Roadmap:\n{steps}"
+
+
+@dataclass(frozen=True)
+class Match:
+    roadmap: Roadmap
+    score: float
+    how: str  # "exact", "phrase", "keyword" or "fuzzy"
+
+
+PREFIX_WEIGHT = 0.9  # "dev" -> "development": below an exact word, above most typos
+
+
+# === Roadmap Index ===
+# Built once from roadmaps.json:
+#   phrases  - every field name and alias, so "data analyst" is one lookup
+#   postings - word -> fields whose name or aliases use it, weighted by IDF
+#   vocab    - the sorted vocabulary, for prefixes ("dev" -> "developer")
+#   grams    - character trigram -> vocabulary words, for misspellings
+# A query is scored by exact phrase first, then any known phrase inside it
+# (spelled out or abbreviated word by word, "web dev" for "web development"),
+# then its words. A word matches itself and the vocabulary words it begins;
+# only a word that matches neither is mapped to its closest word by
+# trigrams. Results are ranked by score, ties going to the order of the
+# data file.
+class RoadmapIndex:
+    def __init__(self, roadmaps: List[Roadmap], fuzzy_threshold: float = 0.45):
+        self.roadmaps = roadmaps
+        self.fuzzy_threshold = fuzzy_threshold
+        self.phrases: Dict[str, int] = {}
+        self.postings: Dict[str, Dict[int, float]] = {}
+        for i, roadmap in enumerate(roadmaps):
+            for phrase in (roadmap.field, *roadmap.aliases):
+                key = " ".join(_tokens(phrase))
+                self.phrases.setdefault(key, i)
+                for word in key.split():
+                    self.postings.setdefault(word, {})[i] = 1.0
+        self.idf = {word: math.log(1 + len(roadmaps) / len(fields)) for word, fields in self.postings.items()}
+        self.max_idf = max(self.idf.values(), default=1.0)
+        self.vocab = sorted(self.postings)
+        self.phrase_words: Dict[int, List[Tuple[Tuple[str, ...], int]]] = {}
+        for phrase, i in self.phrases.items():
+            self.phrase_words.setdefault(len(phrase.split()), []).append((tuple(phrase.split()), i))
+        self.grams: Dict[str, List[str]] = {}
+        self.gram_counts: Dict[str, int] = {}
+        for word in self.postings:
+            grams = _trigrams(word)
+            self.gram_counts[word] = len(grams)
+            for gram in grams:
+                self.grams.setdefault(gram, []).append(word)
+        self.position = {id(roadmap): i for i, roadmap in enumerate(roadmaps)}
+        self.longest_phrase = max((len(p.split()) for p in self.phrases), default=1)
+        self._search = lru_cache(maxsize=4096)(self._search_uncached)
+
+    @classmethod
+    def from_file(cls, path: Path = DATA_PATH) -> "RoadmapIndex":
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+        return cls([Roadmap(e["field"], e.get("emoji", "🧭"), tuple(e["steps"]), tuple(e.get("aliases", ())))
+                    for e in entries])
+
+    def _prefixed(self, word: str) -> List[str]:
+        # Vocabulary words that start with `word`, itself excluded.
+        start = bisect.bisect_right(self.vocab, word)
+        end = bisect.bisect_left(self.vocab, word + "\uffff", start)
+        return self.vocab[start:end]
+
+    def _abbreviates(self, words: List[str], phrase: Tuple[str, ...]) -> bool:
+        return all(w == p or (len(w) > 1 and p.startswith(w)) for w, p in zip(words, phrase))
+
+    def _closest(self, word: str) -> Optional[Tuple[str, float]]:
+        grams = _trigrams(word)
+        counts: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self.grams.get(gram, ()):
+                counts[candidate] = counts.get(candidate, 0) + 1
+        best = None
+        for candidate, shared in counts.items():
+            similarity = shared / (len(grams) + self.gram_counts[candidate] - shared)
+            if similarity >= self.fuzzy_threshold and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+        return best
+
+    def _search_uncached(self, query: str, limit: int) -> Tuple[Match, ...]:
+        words = _tokens(query)
+        key = " ".join(words)
+        if key in self.phrases:
+            ranked = [Match(self.roadmaps[self.phrases[key]], 1.0, "exact")]
+            return tuple(ranked + [m for m in self._score(words) if m.roadmap is not ranked[0].roadmap][:limit - 1])
+
+        # Longest known phrase inside the query ("... become a data analyst").
+        phrase_hits: Dict[int, float] = {}
+        for n in range(min(self.longest_phrase, len(words)), 1, -1):
+            for start in range(len(words) - n + 1):
+                i = self.phrases.get(" ".join(words[start:start + n]))
+                if i is not None and i not in phrase_hits:
+                    phrase_hits[i] = 0.9 + 0.01 * n
+            for start in range(len(words) - n + 1):
+                window = words[start:start + n]
+                for phrase, i in self.phrase_words.get(n, ()):
+                    if i not in phrase_hits and self._abbreviates(window, phrase):
+                        phrase_hits[i] = 0.88 + 0.01 * n
+        ranked = [Match(self.roadmaps[i], score, "phrase") for i, score in phrase_hits.items()]
+        seen = {id(m.roadmap) for m in ranked}
+        ranked += [m for m in self._score(words) if id(m.roadmap) not in seen]
+        ranked.sort(key=lambda m: (-m.score, self.position[id(m.roadmap)]))
+        return tuple(ranked[:limit])
+
+    def _score(self, words: List[str]) -> List[Match]:
+        scores: Dict[int, float] = {}
+        fuzzy = set()
+        total = 0.0
+        for word in words:
+            if word in STOPWORDS:
+                continue
+            candidates = {prefixed: PREFIX_WEIGHT for prefixed in self._prefixed(word) if len(word) > 1}
+            if word in self.postings:
+                candidates[word] = 1.0
+            if not candidates:
+                closest = self._closest(word)
+                if closest is None:
+                    # Unknown words still count, so "quantum data" is a weak match.
+                    total += self.max_idf
+                    continue
+                candidates = dict([closest])
+                fuzzy.add(word)
+            # Each field counts once per query word, at its best match; the
+            # word's IDF is over every field it reaches.
+            best: Dict[int, float] = {}
+            for candidate, weight in candidates.items():
+                for i in self.postings[candidate]:
+                    best[i] = max(best.get(i, 0.0), weight)
+            idf = math.log(1 + len(self.roadmaps) / len(best))
+            total += idf
+            for i, weight in best.items():
+                scores[i] = scores.get(i, 0.0) + idf * weight
+        if not total:
+            return []
+        matches = [Match(self.roadmaps[i], 0.85 * score / total, "fuzzy" if fuzzy else "keyword")
+                   for i, score in scores.items()]
+        matches.sort(key=lambda m: (-m.score, self.position[id(m.roadmap)]))
+        return matches
+
+    def search(self, query: str, limit: int = 3) -> List[Match]:
+        return list(self._search(query, limit))
+
+
+_index: Optional[RoadmapIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> RoadmapIndex:
+    # Loaded on first use and shared by every session in the process.
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = RoadmapIndex.from_file()
+    return _index
@@ -0,0 +1,148 @@
+import time
+import asyncio
+import argparse
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+from agents import Agent, Runner
+
+from main import AGENTS, MODEL_NAME, career_agent, final_agent, job_agent, skill_agent, start_agent
+from common.cache import cache_from_env
+from common.history import HistoryStore
+from common.metrics import metrics_from_env
+from common.provider import get_config
+from common.serving import Connection, Session, SessionInboxes, listen
+from common.sessions import SessionStore, restore_history
+
+# === Protocol ===
+# One JSON object per line in each direction.
+#   -> {"session": "alice", "message": "How do I become a data analyst?"}
+#   <- {"session": "alice", "agent": "SkillAgent", "switched": true, "reply": "..."}
+#   -> {"session": "alice", "type": "close"}        ends the conversation
+#   -> {"type": "stats"}                            server counters
+# Errors come back as {"session": ..., "error": "..."}.
+
+
+@dataclass
+class Conversation:
+    id: str
+    agent: Agent
+    history: HistoryStore = field(default_factory=HistoryStore)
+    turns: int = 0
+
+
+# === Session Server ===
+# Sessions are queued and drained by common/serving.py (one bounded inbox and
+# worker per session); a semaphore caps how many Runner.run calls are in flight.
+class MentorServer:
+    def __init__(self, max_concurrent_runs: int = 32, max_pending: int = 4, max_sessions: int = 1000,
+                 store: Optional[SessionStore] = None, idle_timeout: float = 600.0):
+        self.config = get_config(MODEL_NAME)
+        self.inboxes = SessionInboxes(self.open_session, self.turn, max_pending, max_sessions,
+                                      idle_timeout=idle_timeout)
+        self.run_slots = asyncio.Semaphore(max_concurrent_runs)
+        self.stats = {"turns": 0, "errors": 0, "rejected": 0, "running": 0}
+        self.cache = cache_from_env([career_agent, skill_agent, job_agent], cacheable=["JobAgent"])
+        self._run = self.cache.run if self.cache else Runner.run
+        self.metrics = metrics_from_env()
+        # With a store, conversations survive restarts and are resumed on their next message.
+        self.store = store
+
+    def open_session(self, session_id: str) -> Conversation:
+        conversation = Conversation(session_id, career_agent)
+        saved = self.store.load(session_id) if self.store else None
+        if saved:
+            restore_history(conversation.history, saved)
+            conversation.agent = AGENTS.get(saved.agent, career_agent)
+        return conversation
+
+    async def turn(self, session: Session, message: str, queued_at: float) -> Dict[str, Any]:
+        conversation = session.state
+        conversation.history.append({"role": "user", "content": message})
+        try:
+            async with self.run_slots:
+                # Queue wait covers both the session inbox and the run-slot semaphore.
+                with self.metrics.turn("career", time.perf_counter() - queued_at) as turn:
+                    self.stats["running"] += 1
+                    try:
+                        result = await self._run(start_agent(conversation.agent, message),
+                                                 conversation.history.window(), run_config=self.config,
+                                                 hooks=turn.hooks)
+                        turn.finish(result)
+                    finally:
+                        self.stats["running"] -= 1
+        except Exception as e:
+            conversation.history.pop()
+            self.stats["errors"] += 1
+            return {"session": conversation.id, "error": str(e)}
+
+        reply = result.final_output
+        new_agent = final_agent(result)
+        switched = isinstance(new_agent, Agent) and new_agent != conversation.agent
+        if switched:
+            conversation.agent = new_agent
+        conversation.history.append({"role": "assistant", "content": reply})
+        if self.store:
+            self.store.save_turn(conversation.id, [{"role": "user", "content": message},
+                                                   {"role": "assistant", "content": reply}],
+                                 agent=conversation.agent.name)
+        conversation.turns += 1
+        self.stats["turns"] += 1
+        return {"session": conversation.id, "agent": conversation.agent.name, "switched": switched, "reply": reply,
+                "tokens_sent": conversation.history.metrics["last_tokens"]}
+
+    async def handle(self, request: Dict[str, Any], conn: Connection) -> None:
+        kind = request.get("type", "message")
+        session_id = str(request.get("session", ""))
+        if kind == "stats":
+            stats = {"type": "stats", "sessions": len(self.inboxes), **self.stats, "pending": self.inboxes.pending}
+            if self.cache:
+                stats["cache"] = self.cache.summary()
+            stats["latency"] = self.metrics.summary("career")
+            await conn.send(stats)
+            return
+        if not session_id:
+            await conn.send({"error": "Missing 'session'."})
+            return
+        if kind == "close":
+            await conn.send({"session": session_id, "closed": await self.inboxes.close(session_id)})
+            return
+
+        message = str(request.get("message", "")).strip()
+        if not message:
+            await conn.send({"session": session_id, "error": "Missing 'message'."})
+            return
+        rejected = self.inboxes.submit(session_id, message, conn)
+        if rejected:
+            self.stats["rejected"] += 1
+            await conn.send({"session": session_id, "error": rejected})
+
+
+async def serve(args) -> None:
+    store = SessionStore(args.store) if args.store else None
+    server = MentorServer(args.max_concurrent_runs, args.max_pending, args.max_sessions, store, args.idle_timeout)
+    try:
+        await listen(server.handle, server.inboxes, args, "🎓 Career Mentor server listening on {where}")
+    finally:
+        await server.inboxes.shutdown()
+        if store:
+            store.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve many Career Mentor conversations over line-delimited JSON")
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument("--stdio", action="store_true", help="Read requests from stdin, write replies to stdout")
+    transport.add_argument("--unix", metavar="PATH", help="Listen on a Unix socket")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument("--max-concurrent-runs", type=int, default=32, help="Cap on in-flight Runner.run calls")
+    parser.add_argument("--max-pending", type=int, default=4, help="Queued messages allowed per session")
+    parser.add_argument("--max-sessions", type=int, default=1000, help="Cap on open sessions")
+    parser.add_argument("--idle-timeout", type=float, default=600.0,
+                        help="Seconds a quiet session is kept once the session cap is reached (default: 600)")
+    parser.add_argument("--store", metavar="PATH", help="Persist sessions to PATH.log / PATH.idx and resume them")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(serve(parse_args()))
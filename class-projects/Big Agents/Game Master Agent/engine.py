@@ -0,0 +1,143 @@
+import os
+import json
+import math
+import bisect
+import random
+import hashlib
+import itertools
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DATA_PATH = Path(__file__).with_name("events.json")
+
+
+@dataclass(frozen=True)
+class Event:
+    text: str
+    kind: str
+    weight: float = 1.0
+
+
+# === Event Tables ===
+# Loaded once from events.json when the module is imported. Each area keeps
+# its events and their cumulative weights, so a weighted pick is one random
+# number and a bisect, and a bulk pick is one NumPy searchsorted. Weights
+# must be finite and non-negative with a positive total, or there is nothing
+# to pick.
+class EventTable:
+    def __init__(self, area: str, events: List[Event]):
+        for event in events:
+            if not math.isfinite(event.weight) or event.weight < 0:
+                raise ValueError(f"Event {event.text!r} in area {area!r} has weight {event.weight}; "
+                                 f"weights must be finite and non-negative")
+        if not sum(event.weight for event in events) > 0:
+            raise ValueError(f"Area {area!r} has no event with a positive weight")
+        self.area = area
+        self.events: Tuple[Event, ...] = tuple(events)
+        self.cum_weights = list(itertools.accumulate(e.weight for e in events))
+        self.total = self.cum_weights[-1] if self.cum_weights else 0.0
+
+    def pick(self, rng: random.Random) -> Event:
+        return self.events[bisect.bisect(self.cum_weights, rng.random() * self.total)]
+
+    def pick_many(self, rng: "np.random.Generator", n: int) -> "np.ndarray":
+        import numpy as np
+
+        return np.searchsorted(np.asarray(self.cum_weights), rng.random(n) * self.total, side="right")
+
+
+def load_tables(path: Path = DATA_PATH) -> Tuple[Dict[str, EventTable], Event, int]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    tables = {
+        area.lower(): EventTable(area.lower(), [Event(e["text"], e.get("kind", "event"), float(e.get("weight", 1)))
+                                                for e in events])
+        for area, events in data["areas"].items()
+    }
+    default = data.get("default", {})
+    sides = int(data.get("dice", {}).get("sides", 20))
+    if sides < 1:
+        raise ValueError(f"Dice need at least one side, not {sides}")
+    return tables, Event(default.get("text", "Nothing unusual happens..."), default.get("kind", "none")), sides
+
+
+TABLES, DEFAULT_EVENT, DICE_SIDES = load_tables()
+
+
+def _seed_int(seed: Any) -> int:
+    # Any seed ("42", "campaign/hero", 42) maps to the same 64-bit integer on every run.
+    return int.from_bytes(hashlib.blake2b(str(seed).encode(), digest_size=8).digest(), "little")
+
+
+# === Game Engine ===
+# Dice and events for one session, with its own RNG so concurrent parties
+# never share random state and a seeded session replays exactly. Single
+# rolls use random.Random; bulk rolls for simulations use a NumPy Generator
+# seeded from the same seed (NumPy is only imported when first needed).
+class GameEngine:
+    def __init__(self, seed: Any = None, tables: Optional[Dict[str, EventTable]] = None):
+        self.seed = seed
+        self._seed = _seed_int(seed) if seed is not None else int.from_bytes(os.urandom(8), "little")
+        self.rng = random.Random(self._seed)
+        self.tables = TABLES if tables is None else tables
+        self._np_rng: Optional["np.random.Generator"] = None
+
+    @property
+    def np_rng(self) -> "np.random.Generator":
+        if self._np_rng is None:
+            import numpy as np
+
+            self._np_rng = np.random.default_rng(self._seed)
+        return self._np_rng
+
+    def roll_dice(self, sides: int = DICE_SIDES, n: Optional[int] = None) -> Any:
+        # One roll as an int, or n rolls as a NumPy array.
+        if n is None:
+            return self.rng.randint(1, sides)
+        return self.np_rng.integers(1, sides + 1, size=n, dtype="int16" if sides < 2**15 else "int64")
+
+    def table(self, area: str) -> Optional[EventTable]:
+        return self.tables.get(area.lower())
+
+    def event(self, area: str) -> Event:
+        table = self.table(area)
+        return table.pick(self.rng) if table else DEFAULT_EVENT
+
+    def events(self, area: str, n: int) -> List[Event]:
+        table = self.table(area)
+        if table is None:
+            return [DEFAULT_EVENT] * n
+        return [table.events[i] for i in table.pick_many(self.np_rng, n)]
+
+    def event_counts(self, area: str, n: int) -> Dict[str, int]:
+        # How often each event comes up in n draws, without building n objects.
+        import numpy as np
+
+        table = self.table(area)
+        if table is None:
+            return {DEFAULT_EVENT.text: n}
+        counts = np.bincount(table.pick_many(self.np_rng, n), minlength=len(table.events))
+        return {event.text: int(count) for event, count in zip(table.events, counts)}
+
+
+_current: ContextVar[GameEngine] = ContextVar("game_engine")
+_shared = GameEngine()
+
+
+def current_engine() -> GameEngine:
+    # The engine of the campaign whose turn is running (tools called by the
+    # model included), or a shared unseeded one outside a campaign.
+    return _current.get(_shared)
+
+
+def use_engine(engine: GameEngine):
+    return _current.set(engine)
+
+
+def reset_engine(token) -> None:
+    _current.reset(token)
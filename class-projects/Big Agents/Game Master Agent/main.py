@@ -1,79 +1,37 @@
-import os
-import random
-from dotenv import load_dotenv
-from typing import cast
+import sys
+import asyncio
+import argparse
+from pathlib import Path
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, Tuple
 from colorama import init, Fore, Style
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, handoff
-from agents.run import RunConfig
 
-init(autoreset=True)
-
-load_dotenv()
-
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    raise ValueError("GEMINI_API_KEY is not set in your .env file.")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.history import HistoryStore
+from common.lazy import AgentGraph
+from common.metrics import format_summary, metrics_from_env
+from common.prompts import compile_prompt
+from common.provider import get_config
+from common.router import IntentRouter
+from common.sessions import SessionStore, restore_history, session_store_from_env
+from common.streaming import StreamPrinter, stream_turn
+from common.tools import tool
+from engine import DICE_SIDES, GameEngine, current_engine, reset_engine, use_engine
+
+if TYPE_CHECKING:
+    from agents import Agent
 
-client = AsyncOpenAI(
-    api_key=api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
-)
-
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.5-flash",
-    openai_client=client
-)
+init(autoreset=True)
 
-config = RunConfig(
-    model=model,
-    model_provider=client,
-    tracing_disabled=True
-)
+MODEL_NAME = "gemini-2.5-flash"
 
 # === Tool Functions ===
-def roll_dice(sides: int = 20) -> int:
-    return random.randint(1, sides)
+# Dice and events come from the running campaign's own seeded engine
+# (see engine.py), so parties never share random state.
+def roll_dice(sides: int = DICE_SIDES) -> int:
+    return current_engine().roll_dice(sides)
 
 def generate_event(context: str) -> str:
-    events = {
-        "forest": [
-            "You hear rustling in the bushes. A goblin appears!",
-            "You find an ancient tree with glowing runes.",
-            "A traveling merchant offers you a mysterious potion."
-        ],
-        "dungeon": [
-            "A trap triggers beneath your feet!",
-            "A skeleton warrior blocks your path.",
-            "You discover a chest filled with gold... or is it a mimic?"
-        ],
-        "village": [
-            "A child runs up to you, asking for help.",
-            "The blacksmith offers to upgrade your weapon.",
-            "You overhear talk of a dragon nearby."
-        ]
-    }
-    return random.choice(events.get(context.lower(), ["Nothing unusual happens..."]))
-
-# === Agents ===
-NarratorAgent = Agent(
-    name="NarratorAgent",
-    instructions="Narrate the fantasy adventure based on player decisions. Use vivid descriptions and advance the story.",
-    model=model
-)
-
-MonsterAgent = Agent(
-    name="MonsterAgent",
-    instructions="Control monster behavior during combat. Ask the user what action they take (attack, defend, run), then narrate outcome using dice roll.",
-    model=model,
-    tools={"roll_dice": roll_dice}
-)
-
-ItemAgent = Agent(
-    name="ItemAgent",
-    instructions="Describe items found by the player and manage inventory. Assign rewards after events or combat.",
-    model=model,
-    tools={"generate_event": generate_event}
-)
+    return current_engine().event(context).text
 
 Game_Master_Agent_Instructions = """
 ## 🏰 Advanced Fantasy Adventure Game Master
@@ -135,77 +93,306 @@ Use the appropriate handoff function when the player's action matches the criter
 > 🎯 Your mission is to deliver an unforgettable fantasy adventure where every choice matters, every battle is thrilling, and every treasure feels earned.
 """
 
-GameMasterAgent = Agent(
-    name="GameMasterAgent",
-    instructions=Game_Master_Agent_Instructions,
-    model=model,
-    handoffs=[
-        handoff(NarratorAgent, tool_name_override="handoff_to_narrator"),
-        handoff(MonsterAgent, tool_name_override="handoff_to_monster"),
-        handoff(ItemAgent, tool_name_override="handoff_to_item"),
-    ]
-)
+# === Agents ===
+# Built on first use rather than at import (see common/lazy.py), so the game
+# starts without waiting for the Agents SDK to load.
+def build_agents() -> dict:
+    from agents import Agent, handoff
+
+    NarratorAgent = Agent(
+        name="NarratorAgent",
+        instructions="Narrate the fantasy adventure based on player decisions. Use vivid descriptions and advance the story."
+    )
+
+    MonsterAgent = Agent(
+        name="MonsterAgent",
+        instructions="Control monster behavior during combat. Ask the user what action they take (attack, defend, run), then narrate outcome using dice roll.",
+        tools=[tool(roll_dice)]
+    )
+
+    ItemAgent = Agent(
+        name="ItemAgent",
+        instructions="Describe items found by the player and manage inventory. Assign rewards after events or combat.",
+        tools=[tool(generate_event)]
+    )
+
+    GameMasterAgent = Agent(
+        name="GameMasterAgent",
+        instructions=compile_prompt("GameMasterAgent", Game_Master_Agent_Instructions),
+        handoffs=[
+            handoff(NarratorAgent, tool_name_override="handoff_to_narrator"),
+            handoff(MonsterAgent, tool_name_override="handoff_to_monster"),
+            handoff(ItemAgent, tool_name_override="handoff_to_item"),
+        ]
+    )
+
+    agents = {agent.name: agent for agent in [NarratorAgent, MonsterAgent, ItemAgent]}
+    return {**agents, "GameMasterAgent": GameMasterAgent, "AGENTS": agents}
+
+graph = AgentGraph(build_agents)
+__getattr__ = graph.module_getattr
+
+AGENT_INFO = {
+    "NarratorAgent": ("📖", "I'll narrate your adventure and guide you through the story!"),
+    "MonsterAgent": ("⚔️", "I'll handle combat encounters and dice-based battles!"),
+    "ItemAgent": ("🎁", "I'll manage your inventory and distribute rewards!")
+}
+AREAS = ["forest", "dungeon", "village"]
+
+# Listed in priority order: combat wins a tie with loot.
+intent_router = IntentRouter({
+    "MonsterAgent": ["attack", "defend", "monster", "fight", "battle", "combat", "enemy", "enemies"],
+    "ItemAgent": ["item", "chest", "reward", "loot", "inventory", "collect", "treasure"],
+}, default="NarratorAgent")
+area_router = IntentRouter({area: [area] for area in AREAS})
+
+def route(user_input: str) -> "Agent":
+    return graph.AGENTS[intent_router.route(user_input).target]
+
+def find_area(user_input: str) -> Optional[str]:
+    return area_router.route(user_input).target
+
+def combat_outcome(roll: int, sides: int = DICE_SIDES) -> str:
+    # Top quarter of the die is a critical, bottom quarter a weak strike.
+    return ("🗡️ Critical Hit!" if roll > sides * 3 / 4 else "💢 Weak strike..." if roll < sides / 4
+            else "⚔️ You strike the enemy.")
+
+# === Campaign ===
+# One party's game state. play() is a coroutine so model calls never block
+# other parties, and cheap local tools run in worker threads alongside them:
+# while the narrator is generating, the next event for the current area is
+# prefetched so a later search or loot answers instantly. A responder, if
+# given, answers in place of the model (see simulate.py).
+Responder = Callable[["Agent", List[Dict[str, str]]], Awaitable[str]]
+
+class Campaign:
+    def __init__(self, name: str, config, stream: bool = False,
+                 emit: Optional[Callable[[List[Tuple[str, str]]], None]] = None, prefix: str = "",
+                 store: Optional[SessionStore] = None, session_id: Optional[str] = None, seed: Optional[str] = None,
+                 responder: Optional[Responder] = None):
+        self.name = name
+        self.config = config
+        self.responder = responder
+        self.stream = stream
+        self.emit = emit
+        self.prefix = prefix
+        # The opening move sets up the campaign, so it is always kept in context.
+        self.history = HistoryStore(pin_first=1)
+        self.agent = graph.NarratorAgent
+        self.area: Optional[str] = None
+        self.prefetched: Dict[str, str] = {}
+        self.last_reply: Optional[str] = None
+        self.metrics = metrics_from_env()
+        self.store = store
+        self.session_id = session_id or name
+        saved = store.load(self.session_id) if store else None
+        if saved:
+            restore_history(self.history, saved)
+            self.agent = graph.AGENTS.get(saved.agent, graph.NarratorAgent)
+            self.area = saved.state.get("area")
+            seed = saved.state.get("seed", seed)
+        self.resumed_messages = len(saved.messages) if saved else 0
+        # A seeded campaign replays the same rolls; a resumed one continues
+        # from a seed derived from how far it had got.
+        self.seed = seed
+        self.engine = GameEngine(f"{seed}:{self.resumed_messages}" if seed is not None else None)
+
+    def world_state(self) -> Dict[str, Optional[str]]:
+        return {"area": self.area, "seed": self.seed}
+
+    async def _event(self, area: str) -> str:
+        event = self.prefetched.pop(area, None)
+        return event if event is not None else (await asyncio.to_thread(self.engine.event, area)).text
+
+    async def _prefetch(self, area: Optional[str]) -> None:
+        if area and area not in self.prefetched:
+            self.prefetched[area] = (await asyncio.to_thread(self.engine.event, area)).text
+
+    async def _model_turn(self, turn) -> str:
+        # Tools the model calls during this run use this campaign's engine.
+        token = use_engine(self.engine)
+        try:
+            if self.responder:
+                turn.model_ran = True
+                return await self.responder(self.agent, self.history.window())
+            from agents import Runner
+
+            self.config = self.config or get_config(MODEL_NAME)
+            if self.stream:
+                result = await stream_turn(self.agent, self.history.window(), self.config,
+                                           printer=StreamPrinter(self.prefix), hooks=turn.hooks)
+            else:
+                result = await Runner.run(self.agent, self.history.window(), run_config=self.config, hooks=turn.hooks)
+        finally:
+            reset_engine(token)
+        turn.finish(result)
+        return result.final_output
+
+    async def play(self, user_input: str) -> List[Tuple[str, str]]:
+        output: List[Tuple[str, str]] = []
+        previous_agent, previous_area, previous_reply = self.agent, self.area, self.last_reply
+        self.last_reply = None
+        self.history.append({"role": "user", "content": user_input})
+        self.area = find_area(user_input) or self.area
 
-def main():
+        # === Agent Handoff Notification ===
+        new_agent = route(user_input)
+        if new_agent != self.agent:
+            emoji, desc = AGENT_INFO.get(new_agent.name, ("🤖", "I'll help you on your adventure!"))
+            output.append((Fore.LIGHTYELLOW_EX, f"{emoji} Switching to {new_agent.name}...\n{desc}\n"))
+            self.agent = new_agent
+
+        try:
+            with self.metrics.turn("game_master", agent=self.agent.name) as turn:
+                # === Manual Tool Execution for Quick Responses ===
+                if self.agent == graph.ItemAgent and find_area(user_input):
+                    with turn.tool():
+                        event = await self._event(find_area(user_input))
+                    output.append((Fore.CYAN, f"🎁 You discover:\n\n{event}"))
+                    reply = event
+                elif self.agent == graph.MonsterAgent:
+                    with turn.tool():
+                        roll = await asyncio.to_thread(self.engine.roll_dice)
+                    reply = combat_outcome(roll)
+                    output.append((Fore.RED, f"You rolled a {roll}.\n{reply}"))
+                elif self.stream:
+                    # Show the switch notice now; the reply itself is printed as it streams.
+                    if self.emit and output:
+                        self.emit(output)
+                        output = []
+                    reply, _ = await asyncio.gather(self._model_turn(turn), self._prefetch(self.area))
+                else:
+                    reply, _ = await asyncio.gather(self._model_turn(turn), self._prefetch(self.area))
+                    output.append((Fore.BLUE, f"🤖 {self.agent.name}: {Style.RESET_ALL}{reply}"))
+        except asyncio.CancelledError:
+            # Superseded by a newer command: forget this one entirely.
+            self.agent, self.area, self.last_reply = previous_agent, previous_area, previous_reply
+            self.history.pop()
+            raise
+        except Exception as e:
+            output.append((Fore.RED, f"❌ Error: {e}"))
+            return output
+
+        self.history.append({"role": "assistant", "content": reply})
+        self.last_reply = reply
+        if self.store:
+            self.store.save_turn(self.session_id, [{"role": "user", "content": user_input},
+                                                   {"role": "assistant", "content": reply}],
+                                 agent=self.agent.name, state=self.world_state())
+        return output
+
+# === Game Host ===
+# Runs any number of campaigns on one event loop. Each party has at most one
+# turn in flight; a new command from the same party cancels the slow one.
+class GameHost:
+    def __init__(self, config, on_output: Callable[[str, List[Tuple[str, str]]], None], stream: bool = False,
+                 store: Optional[SessionStore] = None, session: Optional[str] = None, seed: Optional[str] = None):
+        self.config = config
+        self.on_output = on_output
+        self.stream = stream
+        self.store = store
+        self.session = session
+        self.seed = seed
+        self.campaigns: Dict[str, Campaign] = {}
+        self.inflight: Dict[str, asyncio.Task] = {}
+
+    def campaign(self, party: str) -> Campaign:
+        if party not in self.campaigns:
+            campaign = Campaign(party, self.config, self.stream,
+                                emit=lambda lines: self.on_output(party, lines),
+                                prefix=f"[{party}] " if self.campaigns else "",
+                                store=self.store, session_id=f"{self.session}/{party}" if self.session else party,
+                                seed=f"{self.seed}/{party}" if self.seed is not None else None)
+            self.campaigns[party] = campaign
+            if campaign.resumed_messages:
+                where = f" in the {campaign.area}" if campaign.area else ""
+                self.on_output(party, [(Fore.YELLOW, f"📂 Resumed '{party}'{where}: "
+                                                     f"{campaign.resumed_messages} messages, {campaign.agent.name} leads.")])
+        return self.campaigns[party]
+
+    def submit(self, party: str, user_input: str) -> asyncio.Task:
+        previous = self.inflight.get(party)
+        if previous and not previous.done():
+            previous.cancel()
+            self.on_output(party, [(Fore.LIGHTBLACK_EX, "⏭️ Previous action superseded.")])
+        task = asyncio.create_task(self._play(party, previous, user_input))
+        self.inflight[party] = task
+        return task
+
+    async def _play(self, party: str, previous: Optional[asyncio.Task], user_input: str) -> None:
+        if previous:
+            # Wait for the cancelled turn to roll back before touching history.
+            await asyncio.gather(previous, return_exceptions=True)
+        self.on_output(party, await self.campaign(party).play(user_input))
+
+    async def finish(self) -> int:
+        # Lets every turn still in flight reply (and save) before exit;
+        # returns how many there were.
+        pending = [task for task in self.inflight.values() if not task.done()]
+        await asyncio.gather(*pending, return_exceptions=True)
+        return len(pending)
+
+    async def shutdown(self) -> None:
+        for task in self.inflight.values():
+            task.cancel()
+        await asyncio.gather(*self.inflight.values(), return_exceptions=True)
+
+async def main_async(stream: bool = False, session: Optional[str] = None, seed: Optional[str] = None):
     print(Fore.MAGENTA + "🧙 Welcome, adventurer! Your quest begins now...")
     print(Fore.CYAN + "Tell me what you'd like to do — explore a forest, enter a dungeon, or visit a village?")
-
-    history = []
-    agent = NarratorAgent
-
+    print(Fore.YELLOW + "Type '/party <name>' to switch between parties, 'exit' to quit.\n")
+
+    # The SDK, agents and model client load in the background while the user types.
+    graph.prewarm(lambda: get_config(MODEL_NAME))
+    config = None  # each campaign takes the shared config on its first model turn
+    party = "hero"
+
+    def show(name: str, lines: List[Tuple[str, str]]) -> None:
+        prefix = f"[{name}] " if len(host.campaigns) > 1 else ""
+        for color, text in lines:
+            print(color + prefix + text)
+
+    store = session_store_from_env() if session else None
+    host = GameHost(config, show, stream, store, session, seed)
+    if store:
+        host.campaign(party)
     while True:
-        user_input = input(Fore.GREEN + "👤 You: ").strip()
+        try:
+            user_input = (await asyncio.to_thread(input, Fore.GREEN + "👤 You: ")).strip()
+        except EOFError:
+            user_input = "exit"
         if user_input.lower() in ["exit", "quit"]:
+            # The last commands still get their replies; only a new command
+            # from the same party cancels a turn.
+            if any(not task.done() for task in host.inflight.values()):
+                print(Fore.LIGHTBLACK_EX + "⏳ Finishing the turns in progress...")
+            await host.finish()
             print(Fore.MAGENTA + "👋 Farewell, brave hero!")
+            metrics = metrics_from_env()
+            if metrics.exporting:
+                print(Fore.YELLOW + f"📈 Latency: {format_summary(metrics.summary('game_master'))}")
             break
+        if user_input.startswith("/party"):
+            party = user_input.removeprefix("/party").strip() or party
+            print(Fore.YELLOW + f"🛡️ Now playing as party '{party}'.")
+            continue
+        if user_input:
+            host.submit(party, user_input)
+
+    await host.shutdown()
+    if store:
+        store.close()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fantasy Adventure Game Master")
+    parser.add_argument("--stream", action="store_true", help="Print narration token by token as it is generated")
+    parser.add_argument("--session", metavar="NAME", help="Save every party's campaign under NAME and resume it next time")
+    parser.add_argument("--seed", help="Seed dice and events so a campaign can be replayed exactly")
+    return parser.parse_args(argv)
 
-        history.append({"role": "user", "content": user_input})
-
-        if any(word in user_input for word in ["attack", "defend", "monster", "fight", "battle", "combat", "enemy"]):
-            new_agent = MonsterAgent
-        elif any(word in user_input for word in ["item", "chest", "reward", "loot", "inventory", "collect", "treasure"]):
-            new_agent = ItemAgent
-        else:
-            new_agent = NarratorAgent
-
-        # === Agent Handoff Notification ===
-        if new_agent != agent:
-            agent_info = {
-                "NarratorAgent": ("📖", "I'll narrate your adventure and guide you through the story!"),
-                "MonsterAgent": ("⚔️", "I'll handle combat encounters and dice-based battles!"),
-                "ItemAgent": ("🎁", "I'll manage your inventory and distribute rewards!")
-            }
-            emoji, desc = agent_info.get(new_agent.name, ("🤖", "I'll help you on your adventure!"))
-            print(Fore.LIGHTYELLOW_EX + f"{emoji} Switching to {new_agent.name}...\n{desc}\n")
-            agent = new_agent
-
-        try:
-            # === Manual Tool Execution for Quick Responses ===
-            if agent == ItemAgent:
-                for area in ["forest", "dungeon", "village"]:
-                    if area in user_input:
-                        event = generate_event(area)
-                        print(Fore.CYAN + f"🎁 You discover:\n\n{event}")
-                        history.append({"role": "assistant", "content": event})
-                        break
-                else:
-                    result = Runner.run_sync(agent, history, run_config=cast(RunConfig, config))
-                    print(Fore.BLUE + f"🤖 {agent.name}: {Style.RESET_ALL}{result.final_output}")
-                    history.append({"role": "assistant", "content": result.final_output})
-
-            elif agent == MonsterAgent:
-                roll = roll_dice()
-                outcome = "🗡️ Critical Hit!" if roll > 15 else "💢 Weak strike..." if roll < 5 else "⚔️ You strike the enemy."
-                print(Fore.RED + f"You rolled a {roll}.\n{outcome}")
-                history.append({"role": "assistant", "content": outcome})
-
-            else:
-                result = Runner.run_sync(agent, history, run_config=cast(RunConfig, config))
-                print(Fore.BLUE + f"🤖 {agent.name}: {Style.RESET_ALL}{result.final_output}")
-                history.append({"role": "assistant", "content": result.final_output})
-
-        except Exception as e:
-            print(Fore.RED + f"❌ Error: {e}")
+def main():
+    args = parse_args()
+    asyncio.run(main_async(args.stream, args.session, args.seed))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
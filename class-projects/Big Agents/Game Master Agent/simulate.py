@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import importlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from main import AREAS, Campaign, ItemAgent, MonsterAgent, Responder, combat_outcome, find_area
+from engine import DEFAULT_EVENT, DICE_SIDES, TABLES
+
+if TYPE_CHECKING:
+    from agents import Agent
+
+# === Player Actions ===
+# Random campaigns draw each turn's action kind by weight, then a phrasing.
+# "{area}" is filled with a random area, so movement and loot also exercise
+# the area router and the per-area event tables.
+ACTIONS = {
+    "explore": ["go to the {area}", "walk deeper into the {area}", "look around", "follow the winding path",
+                "talk to the stranger", "rest by the campfire"],
+    "combat": ["attack the goblin", "fight the skeleton", "defend against the enemy", "attack with my sword",
+               "battle the monster"],
+    "loot": ["search the chest in the {area}", "collect loot in the {area}", "look for treasure in the {area}",
+             "check my inventory"],
+}
+DEFAULT_MIX = {"explore": 5, "combat": 3, "loot": 2}
+
+OUTCOMES = {combat_outcome(DICE_SIDES): "critical", combat_outcome((DICE_SIDES + 1) // 2): "hit",
+            combat_outcome(1): "weak"}
+
+
+def random_actions(rng: random.Random, turns: int, mix: Dict[str, float] = DEFAULT_MIX) -> List[str]:
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=turns)
+    return [rng.choice(ACTIONS[kind]).format(area=rng.choice(AREAS)) for kind in kinds]
+
+
+def load_script(path: str) -> List[List[str]]:
+    # A .json file holds a list of action lists, one per campaign (reused in
+    # turn); any other file is one action per line, played by every campaign.
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return [[str(action) for action in actions] for actions in json.load(f)]
+        return [[line.strip() for line in f if line.strip()]]
+
+
+# === Stub Model ===
+async def stub_responder(agent: "Agent", messages: List[Dict[str, str]]) -> str:
+    # Answers instantly, so a simulated turn costs only the game's own logic.
+    return f"{agent.name} carries the story forward."
+
+
+def load_responder(spec: Optional[str]) -> Responder:
+    # "package.module:function" names an async (agent, messages) -> str callable.
+    if not spec:
+        return stub_responder
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name or "respond")
+
+
+# === Simulation ===
+def new_stats() -> Dict[str, Any]:
+    return {"campaigns": 0, "turns": 0, "errors": 0, "switches": 0, "routing": Counter(), "combat": Counter(),
+            "events": {}, "seconds": 0.0}
+
+
+def merge_stats(total: Dict[str, Any], part: Dict[str, Any]) -> Dict[str, Any]:
+    for key in ("campaigns", "turns", "errors", "switches", "seconds"):
+        total[key] += part[key]
+    total["routing"].update(part["routing"])
+    total["combat"].update(part["combat"])
+    for area, counts in part["events"].items():
+        total["events"].setdefault(area, Counter()).update(counts)
+    return total
+
+
+async def play_campaign(index: int, actions: List[str], seed: str, responder: Responder,
+                        stats: Dict[str, Any]) -> None:
+    campaign = Campaign(f"sim-{index}", config=None, seed=f"{seed}/{index}", responder=responder)
+    for action in actions:
+        previous = campaign.agent
+        await campaign.play(action)
+        stats["turns"] += 1
+        reply = campaign.last_reply
+        if reply is None:
+            stats["errors"] += 1
+            continue
+        agent = campaign.agent
+        stats["routing"][agent.name] += 1
+        stats["switches"] += agent is not previous
+        if agent is MonsterAgent:
+            stats["combat"][OUTCOMES.get(reply, reply)] += 1
+        elif agent is ItemAgent:
+            area = find_area(action)
+            if area:
+                stats["events"].setdefault(area, Counter())[reply] += 1
+    stats["campaigns"] += 1
+
+
+def run_batch(job: Dict[str, Any]) -> Dict[str, Any]:
+    # One worker's share of campaigns, played one after another.
+    responder = load_responder(job["responder"])
+    scripts = job["scripts"]
+    stats = new_stats()
+    start = time.perf_counter()
+
+    async def play_all() -> None:
+        for index in range(job["start"], job["start"] + job["count"]):
+            if scripts:
+                actions = scripts[index % len(scripts)]
+            else:
+                actions = random_actions(random.Random(f"{job['seed']}/actions/{index}"), job["turns"], job["mix"])
+            await play_campaign(index, actions, job["seed"], responder, stats)
+
+    asyncio.run(play_all())
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def simulate(campaigns: int, turns: int = 30, seed: Optional[str] = None, workers: Optional[int] = None,
+             scripts: Optional[List[List[str]]] = None, mix: Dict[str, float] = DEFAULT_MIX,
+             responder: Optional[str] = None) -> Dict[str, Any]:
+    # Splits the campaigns into batches across a process pool and merges
+    # their counts. The same seed, campaign count and scripts give the same
+    # stats whatever the worker count.
+    seed = str(seed if seed is not None else random.randrange(1 << 32))
+    workers = workers or os.cpu_count() or 1
+    batches = min(campaigns, workers * 4) or 1
+    size, extra = divmod(campaigns, batches)
+    jobs, start = [], 0
+    for b in range(batches):
+        count = size + (b < extra)
+        jobs.append({"start": start, "count": count, "turns": turns, "seed": seed, "scripts": scripts or [],
+                     "mix": mix, "responder": responder})
+        start += count
+
+    total = new_stats()
+    wall = time.perf_counter()
+    if workers == 1:
+        parts = map(run_batch, jobs)
+    else:
+        pool = ProcessPoolExecutor(workers)
+        parts = pool.map(run_batch, jobs)
+    try:
+        for part in parts:
+            merge_stats(total, part)
+    finally:
+        if workers != 1:
+            pool.shutdown()
+    total.update(seed=seed, workers=workers, wall_seconds=time.perf_counter() - wall)
+    return total
+
+
+# === Report ===
+def expected_events(area: str) -> Dict[str, float]:
+    table = TABLES.get(area)
+    if table is None:
+        return {DEFAULT_EVENT.text: 1.0}
+    return {event.text: event.weight / table.total for event in table.events}
+
+
+def rates(counts: Counter) -> Dict[str, float]:
+    total = sum(counts.values()) or 1
+    return {key: count / total for key, count in counts.most_common()}
+
+
+def to_json(stats: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "seed": stats["seed"], "campaigns": stats["campaigns"], "turns": stats["turns"], "errors": stats["errors"],
+        "workers": stats["workers"], "wall_seconds": round(stats["wall_seconds"], 3),
+        "turns_per_second": round(stats["turns"] / stats["wall_seconds"]) if stats["wall_seconds"] else None,
+        "switch_rate": stats["switches"] / stats["turns"] if stats["turns"] else 0.0,
+        "routing": {"counts": dict(stats["routing"]), "rates": rates(stats["routing"])},
+        "combat": {"counts": dict(stats["combat"]), "rates": rates(stats["combat"])},
+        "events": {area: {"counts": dict(counts), "rates": rates(counts), "expected": expected_events(area)}
+                   for area, counts in sorted(stats["events"].items())},
+    }
+
+
+def format_report(stats: Dict[str, Any]) -> str:
+    turns = stats["turns"]
+    wall = stats["wall_seconds"]
+    lines = [f"🎲 {stats['campaigns']:,} campaigns, {turns:,} turns in {wall:.2f}s "
+             f"({turns / wall if wall else 0:,.0f} turns/s, {stats['workers']} workers, seed {stats['seed']})"]
+    if stats["errors"]:
+        lines.append(f"❌ {stats['errors']:,} turns failed")
+    routing = rates(stats["routing"])
+    lines.append("🧭 Routing: " + ", ".join(f"{name} {rate:.1%}" for name, rate in routing.items())
+                 + f" | agent switch on {stats['switches'] / turns if turns else 0:.1%} of turns")
+    combat = stats["combat"]
+    lines.append(f"⚔️ Combat ({sum(combat.values()):,} rolls): "
+                 + ", ".join(f"{name} {rate:.1%}" for name, rate in rates(combat).items()))
+    for area, counts in sorted(stats["events"].items()):
+        expected = expected_events(area)
+        lines.append(f"🎁 {area} ({sum(counts.values()):,} events):")
+        for text, rate in rates(counts).items():
+            lines.append(f"   {rate:6.1%} (expected {expected.get(text, 0):.1%})  {text}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Play many Game Master campaigns headlessly and report aggregate stats")
+    parser.add_argument("-n", "--campaigns", type=int, default=1000, help="Number of campaigns to simulate")
+    parser.add_argument("-t", "--turns", type=int, default=30, help="Turns per random campaign")
+    parser.add_argument("--seed", help="Seed for actions, dice and events (printed if not given)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--script", metavar="FILE", help="Replay actions from FILE instead of random ones")
+    parser.add_argument("--mix", metavar="KIND=WEIGHT", nargs="+",
+                        help=f"Weights of random action kinds (default: "
+                             f"{' '.join(f'{k}={v}' for k, v in DEFAULT_MIX.items())})")
+    parser.add_argument("--responder", metavar="MODULE:FUNC", help="Async (agent, messages) -> str used instead of the model")
+    parser.add_argument("--json", metavar="PATH", help="Also write the stats as JSON to PATH")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    mix = DEFAULT_MIX
+    if args.mix:
+        mix = {kind: float(weight) for kind, _, weight in (item.partition("=") for item in args.mix)}
+        unknown = set(mix) - set(ACTIONS)
+        if unknown:
+            sys.exit(f"Unknown action kinds: {', '.join(sorted(unknown))} (choose from {', '.join(ACTIONS)})")
+    scripts = load_script(args.script) if args.script else None
+    stats = simulate(args.campaigns, args.turns, args.seed, args.workers, scripts, mix, args.responder)
+    print(format_report(stats))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(to_json(stats), f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
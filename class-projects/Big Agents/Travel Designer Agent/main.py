@@ -1,33 +1,26 @@
-import os
+import sys
 import asyncio
-from dotenv import load_dotenv
-from typing import List, Dict
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, handoff
-from agents.run import RunConfig
+import argparse
+from pathlib import Path
 from colorama import init, Fore, Style
 
-init(autoreset=True)
-
-load_dotenv()
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    raise ValueError("GEMINI_API_KEY is not set in your .env file.")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.cache import cache_from_env
+from common.fanout import FanOut
+from common.history import HistoryStore
+from common.lazy import AgentGraph
+from common.metrics import format_summary, metrics_from_env
+from common.prompts import compile_prompt
+from common.provider import get_config
+from common.router import IntentRouter
+from common.sessions import restore_history, session_store_from_env
+from common.speculate import Speculator
+from common.streaming import stream_turn
+from common.tools import tool
 
-client = AsyncOpenAI(
-    api_key=api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
-)
-
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",
-    openai_client=client
-)
+init(autoreset=True)
 
-config = RunConfig(
-    model=model,
-    model_provider=client,
-    tracing_disabled=True
-)
+MODEL_NAME = "gemini-2.0-flash"
 
 # === Tools ===
 def get_flights(destination: str) -> str:
@@ -36,29 +29,6 @@ def get_flights(destination: str) -> str:
 def suggest_hotels(destination: str) -> str:
     return f"🏨 Hotels in {destination}:\n- GrandView Hotel: 4⭐ ($120/night)\n- CozyStay Inn: 3⭐ ($80/night)"
 
-# === Specialized Agents ===
-DestinationAgent = Agent(
-    name="DestinationAgent",
-    instructions="Suggest travel destinations based on user's mood or interests. Ask follow-up questions if unclear.",
-    model=model
-)
-
-BookingAgent = Agent(
-    name="BookingAgent",
-    instructions="Simulate booking flights and hotels using tools. Use get_flights() and suggest_hotels() when user wants to book.",
-    model=model,
-    tools={
-        "get_flights": get_flights,
-        "suggest_hotels": suggest_hotels
-    }
-)
-
-ExploreAgent = Agent(
-    name="ExploreAgent",
-    instructions="Suggest local attractions, foods, and experiences in the selected destination.",
-    model=model
-)
-
 # === Travel Agent Instructions ===
 TravelAgent_Instruction = """
 ## Advanced Travel Designer
@@ -117,48 +87,182 @@ Use the appropriate handoff function when the user's request aligns with the fol
 > Your goal is to ensure a smooth, intelligent, and engaging travel planning experience by guiding users through each step with the right expert help.
 """
 
-# === Main Travel Agent ===
-TravelAgent = Agent(
-    name="TravelAgent",
-    instructions=TravelAgent_Instruction,
-    model=model,
-    handoffs=[
-        handoff(DestinationAgent, tool_name_override="handoff_to_destination", tool_description_override="Handoff to DestinationAgent for destination suggestions"),
-        handoff(BookingAgent, tool_name_override="handoff_to_booking", tool_description_override="Handoff to BookingAgent for flight and hotel bookings"),
-        handoff(ExploreAgent, tool_name_override="handoff_to_explore", tool_description_override="Handoff to ExploreAgent for attractions and experiences"),
-    ]
-)
-
-async def main_cli():
+# === Agents ===
+# Built on first use rather than at import (see common/lazy.py), so the CLI
+# shows its prompt without waiting for the Agents SDK to load.
+def build_agents() -> dict:
+    from agents import Agent, handoff
+
+    # === Specialized Agents ===
+    DestinationAgent = Agent(
+        name="DestinationAgent",
+        instructions="Suggest travel destinations based on user's mood or interests. Ask follow-up questions if unclear."
+    )
+
+    BookingAgent = Agent(
+        name="BookingAgent",
+        instructions="Simulate booking flights and hotels using tools. Use get_flights() and suggest_hotels() when user wants to book.",
+        # Flight and hotel lookups only depend on the destination, so repeats are memoized.
+        tools=[tool(get_flights, ttl=600), tool(suggest_hotels, ttl=600)]
+    )
+
+    ExploreAgent = Agent(
+        name="ExploreAgent",
+        instructions="Suggest local attractions, foods, and experiences in the selected destination."
+    )
+
+    # === Main Travel Agent ===
+    TravelAgent = Agent(
+        name="TravelAgent",
+        instructions=compile_prompt("TravelAgent", TravelAgent_Instruction),
+        handoffs=[
+            handoff(DestinationAgent, tool_name_override="handoff_to_destination", tool_description_override="Handoff to DestinationAgent for destination suggestions"),
+            handoff(BookingAgent, tool_name_override="handoff_to_booking", tool_description_override="Handoff to BookingAgent for flight and hotel bookings"),
+            handoff(ExploreAgent, tool_name_override="handoff_to_explore", tool_description_override="Handoff to ExploreAgent for attractions and experiences"),
+        ]
+    )
+
+    agents = {agent.name: agent for agent in [TravelAgent, DestinationAgent, BookingAgent, ExploreAgent]}
+    return {**agents, "AGENTS": agents}
+
+graph = AgentGraph(build_agents)
+__getattr__ = graph.module_getattr
+
+# Unambiguous requests go straight to the specialist, skipping the TravelAgent triage call.
+intent_router = IntentRouter({
+    "BookingAgent": ["book", "booking", "flight", "hotel", "reservation", "accommodation", "ticket"],
+    "ExploreAgent": ["must-see", "attraction", "things to do", "sightseeing", "local food", "restaurant",
+                     "activities", "places to visit", "experiences"],
+    "DestinationAgent": ["where should i go", "where to go", "destination", "trip", "trip ideas", "vacation ideas",
+                         "holiday ideas", "recommend a place", "suggest a place", "plan a"],
+})
+
+def final_agent(result):
+    # Newer SDK releases expose the agent that produced the answer as last_agent.
+    return getattr(result, "final_agent", None) or getattr(result, "last_agent", None)
+
+FANOUT_TITLES = {
+    "DestinationAgent": "🗺️ Destination ideas",
+    "BookingAgent": "🧳 Flights & hotels",
+    "ExploreAgent": "🍜 Things to do",
+}
+
+def fanout_targets(user_input: str) -> list:
+    # Specialists worth asking in parallel: only when the turn mentions more than one.
+    targets = intent_router.matches(user_input)
+    return [graph.AGENTS[name] for name in targets] if len(targets) > 1 else []
+
+async def main_cli(stream: bool = False, session: str | None = None, fan_out: bool = False,
+                   fan_out_limit: int = 3, fan_out_timeout: float = 30.0, speculate: bool = False):
     print(Fore.CYAN + "🌍 Welcome to the AI Travel Designer!")
     print(Fore.CYAN + "Tell me what you like, and I'll design a dream trip for you.")
     print(Fore.YELLOW + "Type 'exit' to quit.\n")
 
-    history: List[Dict[str, str]] = []
-    agent = TravelAgent
+    # The SDK, agents and model client load in the background while the user types.
+    graph.prewarm(lambda: get_config(MODEL_NAME))
+    history = HistoryStore()
+    agent = config = run = cache = fanner = speculator = None
+    metrics = metrics_from_env()
+    store = session_store_from_env() if session else None
+    saved = store.load(session) if store else None
+    if saved:
+        restore_history(history, saved)
+        print(Fore.YELLOW + f"📂 Resumed '{session}': {len(saved.messages)} messages, "
+                            f"talking to {saved.agent or 'TravelAgent'}.\n")
 
     while True:
         user_input = input(Fore.GREEN + "👤 You: ")
         if user_input.lower() in ['exit', 'quit']:
             print(Fore.MAGENTA + "👋 Goodbye! Safe travels!")
+            if cache:
+                print(Fore.YELLOW + f"⚡ Cache: {cache.summary()}")
+            if metrics.exporting:
+                print(Fore.YELLOW + f"📈 Latency: {format_summary(metrics.summary('travel'))}")
+            if fanner:
+                print(Fore.YELLOW + f"🔀 Fan-out: {fanner.stats}")
+            if speculator:
+                print(Fore.YELLOW + f"🎯 Speculation: {speculator.summary()}")
+            if store:
+                store.close()
             break
 
+        if agent is None:
+            # First turn: waits for the prewarm if it is still running.
+            try:
+                from agents import Runner
+
+                config = get_config(MODEL_NAME)
+                agent = graph.AGENTS.get(saved.agent if saved else None, graph.TravelAgent)
+                cache = cache_from_env(graph.AGENTS.values(), cacheable=["DestinationAgent", "ExploreAgent"])
+                run = cache.run if cache else Runner.run
+                fanner = FanOut(run, fan_out_limit, fan_out_timeout) if fan_out else None
+                if speculate and not stream:
+                    speculator = Speculator(graph.TravelAgent, intent_router, graph.AGENTS, run)
+            except Exception as e:
+                print(Fore.RED + f"❌ Error: {e}")
+                continue
+
         history.append({"role": "user", "content": user_input})
         try:
-            result = await Runner.run(agent, history, run_config=config)
-            final = result.final_output
-
-            agent_name = result.final_agent.name if hasattr(result, 'final_agent') and result.final_agent else "Assistant"
-            print(Fore.BLUE + f"🤖 {agent_name}: " + Style.RESET_ALL + f"{final}")
+            with metrics.turn("travel") as turn:
+                start = agent
+                specialists = fanout_targets(user_input) if fanner and agent is graph.TravelAgent else []
+                if agent is graph.TravelAgent and not specialists and not speculator:
+                    start = graph.AGENTS.get(intent_router.confident(user_input), agent)
+                if specialists:
+                    replies = await fanner.run(specialists, history.window(), run_config=config, hooks=turn.hooks)
+                    for reply in replies:
+                        if reply.ok:
+                            turn.finish(reply.result)
+                    result = None
+                elif stream:
+                    result = await stream_turn(start, history.window(), config, cache, hooks=turn.hooks)
+                elif speculator:
+                    result = await speculator.run(agent, history.window(), user_input, run_config=config,
+                                                  hooks=turn.hooks)
+                else:
+                    result = await run(start, history.window(), run_config=config, hooks=turn.hooks)
+                if result is not None:
+                    turn.finish(result)
+
+            if specialists:
+                # One combined answer; the next turn is triaged again.
+                final = FanOut.merge(replies, FANOUT_TITLES)
+                answered_by = None
+                names = ", ".join(reply.agent.name for reply in replies)
+                print(Fore.BLUE + f"🤖 {names}:" + Style.RESET_ALL + f"\n{final}")
+            else:
+                final = result.final_output
+                answered_by = final_agent(result)
+                agent_name = answered_by.name if answered_by else "Assistant"
+                if not stream:
+                    print(Fore.BLUE + f"🤖 {agent_name}: " + Style.RESET_ALL + f"{final}")
             history.append({"role": "assistant", "content": final})
 
-            if hasattr(result, 'final_agent') and result.final_agent and result.final_agent != agent:
-                agent = result.final_agent
+            if answered_by and answered_by != agent:
+                agent = answered_by
                 print(Fore.LIGHTYELLOW_EX + f"🔁 Switched to {agent.name}\n")
+            if store:
+                store.save_turn(session, [{"role": "user", "content": user_input},
+                                          {"role": "assistant", "content": final}], agent=agent.name)
 
 
         except Exception as e:
             print(Fore.RED + f"❌ Error: {e}")
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="AI Travel Designer")
+    parser.add_argument("--stream", action="store_true", help="Print replies token by token as they are generated")
+    parser.add_argument("--session", metavar="NAME", help="Save the conversation under NAME and resume it next time")
+    parser.add_argument("--fan-out", action="store_true",
+                        help="Ask every specialist a request mentions at once and merge their answers")
+    parser.add_argument("--fan-out-limit", type=int, default=3, help="Specialists run at the same time")
+    parser.add_argument("--fan-out-timeout", type=float, default=30.0, help="Seconds each specialist may take")
+    parser.add_argument("--speculate", action="store_true",
+                        help="Answer with the predicted specialist while a short triage call checks it (not with --stream)")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    asyncio.run(main_cli())
\ No newline at end of file
+    args = parse_args()
+    asyncio.run(main_cli(args.stream, args.session, args.fan_out, args.fan_out_limit, args.fan_out_timeout,
+                          args.speculate))
\ No newline at end of file
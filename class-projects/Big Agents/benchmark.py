@@ -0,0 +1,344 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import datetime
+import platform
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+from common.apps import load_app
+from common.fake_server import FakeLLMServer
+from common.history import HistoryStore
+from common.metrics import Histogram
+
+# === Benchmark Suite ===
+# Runs every agent app against the local fake model server (so results only
+# depend on the configured latency and token rate, not on the network) and
+# the pure-Python helpers at scale. Each benchmark reports p50/p95/p99
+# latency, throughput and RSS. Results can be saved as a JSON baseline and
+# later runs compared against it:
+#   python benchmark.py --output baseline.json
+#   python benchmark.py --compare baseline.json
+
+# Scripted conversations; every session plays its app's script from the start.
+SCRIPTS = {
+    "travel": ["Where should I go in December?", "I like beaches and warm weather.",
+               "What are the must-see places there?"],
+    "career": ["What is the average salary of a data analyst?", "How should I prepare for the interview?",
+               "Which companies are hiring?"],
+    "game_master": ["I enter the dark forest.", "I attack the goblin!", "I open the chest in the dungeon.",
+                    "I walk to the village."],
+    "class01": ["What is PIAIC ?", "Tell me more."],
+}
+
+# With --speculate: every turn here leaves the keyword router unsure, so each
+# one is speculated, and the fake server's word-overlap router (--route)
+# confirms some predictions and overrides others. That exercises both the
+# confirm and the cancel-and-rerun paths; the accuracy it reports is against
+# the fake router, not a real model.
+SPECULATION_SCRIPTS = {
+    "travel": ["Can you book activities for kids in the old town?",
+               "I want a relaxing trip somewhere warm, maybe with a hotel on the beach.",
+               "Any ideas for a family holiday?"],
+    "career": ["What salary can I expect after learning machine learning?",
+               "Give me a learning path and tell me which job titles fit.",
+               "I'm thinking about a career in data science, where do I start?",
+               "Which courses help me prepare for a job in cloud engineering?"],
+}
+
+CAREER_FIELDS = ["software engineering", "data science", "medicine", "law", "Data Analytics", "software"]
+AREAS = ["forest", "dungeon", "village", "castle"]
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        try:
+            import resource
+        except ImportError:
+            return 0.0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def report(name: str, histogram: Histogram, elapsed: float, unit: str, errors: int = 0) -> Dict[str, Any]:
+    summary = histogram.summary()
+    return {
+        "name": name, "count": histogram.count, "errors": errors, "unit": unit,
+        "p50": summary["p50"], "p95": summary["p95"], "p99": summary["p99"], "mean": summary["mean"],
+        "max": summary["max"], "throughput": histogram.count / elapsed if elapsed else 0.0,
+        "seconds": elapsed, "rss_mb": rss_mb(),
+    }
+
+
+# === Agent Sessions ===
+# The same turn logic the CLIs use: history window, keyword prefilter and a
+# sticky current agent. Game Master sessions go through its Campaign class.
+class ChatSession:
+    def __init__(self, agent: Any, config: Any, pick: Optional[Callable[[Any, str], Any]] = None,
+                 speculator: Any = None):
+        self.agent = agent
+        self.config = config
+        self.pick = pick
+        self.speculator = speculator
+        self.history = HistoryStore()
+
+    async def turn(self, message: str) -> None:
+        from agents import Runner
+
+        self.history.append({"role": "user", "content": message})
+        if self.speculator:
+            result = await self.speculator.run(self.agent, self.history.window(), message, run_config=self.config)
+        else:
+            start = self.pick(self.agent, message) if self.pick else self.agent
+            result = await Runner.run(start, self.history.window(), run_config=self.config)
+        self.agent = getattr(result, "last_agent", None) or self.agent
+        self.history.append({"role": "assistant", "content": result.final_output})
+
+
+class GameSession:
+    def __init__(self, app: Any, config: Any, name: str):
+        self.campaign = app.Campaign(name, config)
+
+    async def turn(self, message: str) -> None:
+        for _, text in await self.campaign.play(message):
+            if text.startswith("❌"):
+                raise RuntimeError(text)
+
+
+def session_factory(name: str, speculator: Any = None) -> Callable[[int], Any]:
+    from common.provider import get_config
+
+    app = load_app(name)
+    if name == "travel":
+        pick = lambda agent, message: (app.AGENTS.get(app.intent_router.confident(message), agent)
+                                       if agent is app.TravelAgent else agent)
+        return lambda i: ChatSession(app.TravelAgent, get_config(app.MODEL_NAME), pick, speculator)
+    if name == "career":
+        return lambda i: ChatSession(app.career_agent, get_config(app.MODEL_NAME), app.start_agent, speculator)
+    if name == "game_master":
+        return lambda i: GameSession(app, get_config(app.MODEL_NAME), f"party-{i}")
+    return lambda i: ChatSession(app.agent, get_config())
+
+
+async def bench_agent(name: str, sessions: int, concurrency: int, speculate: bool = False) -> Dict[str, Any]:
+    speculator = None
+    if speculate and name in ("travel", "career"):
+        from common.speculate import Speculator
+
+        app = load_app(name)
+        triage = app.TravelAgent if name == "travel" else app.career_agent
+        speculator = Speculator(triage, app.intent_router, app.AGENTS)
+    make_session = session_factory(name, speculator)
+    script = SPECULATION_SCRIPTS[name] if speculator else SCRIPTS[name]
+    histogram = Histogram(1e6)
+    errors = 0
+    slots = asyncio.Semaphore(concurrency)
+
+    async def play(i: int) -> None:
+        nonlocal errors
+        async with slots:
+            session = make_session(i)
+            for message in script:
+                start = time.perf_counter()
+                try:
+                    await session.turn(message)
+                except Exception:
+                    errors += 1
+                    continue
+                histogram.record(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(play(i) for i in range(sessions)))
+    result = report(f"agent.{name}" + ("+speculate" if speculator else ""), histogram,
+                    time.perf_counter() - start, "turns/s", errors)
+    if speculator:
+        result["speculation"] = speculator.summary()
+    return result
+
+
+# === Pure-Python Paths ===
+def bench_calls(name: str, calls: Iterable[Callable[[], Any]], unit: str = "calls/s") -> Dict[str, Any]:
+    histogram = Histogram(1e6)
+    errors = 0
+    clock = time.perf_counter
+    start = clock()
+    for call in calls:
+        began = clock()
+        try:
+            call()
+        except Exception:
+            errors += 1
+            continue
+        histogram.record(clock() - began)
+    return report(name, histogram, clock() - start, unit, errors)
+
+
+def pure_benchmarks(scale: float) -> Dict[str, Callable[[], Dict[str, Any]]]:
+    def n(count: int) -> int:
+        return max(1, int(count * scale))
+
+    def schedule(topics: int, repeats: int) -> Callable[[], Dict[str, Any]]:
+        def run() -> Dict[str, Any]:
+            study = load_app("study")
+            names = [f"Topic {i}" for i in range(topics)]
+            deadline = (datetime.date.today() + datetime.timedelta(days=365)).isoformat()
+            return bench_calls(f"study.schedular_agent[{topics}]",
+                               (lambda: study.schedular_agent(names, deadline) for _ in range(n(repeats))))
+        return run
+
+    def research() -> Dict[str, Any]:
+        study = load_app("study")
+        topics = [f"topic number {i}" for i in range(n(20_000))]
+        return bench_calls("study.research_agent", (lambda t=t: study.research_agent(t) for t in topics))
+
+    def events() -> Dict[str, Any]:
+        game = load_app("game_master")
+        areas = [random.choice(AREAS) for _ in range(n(200_000))]
+        return bench_calls("game_master.generate_event", (lambda a=a: game.generate_event(a) for a in areas))
+
+    def roadmaps() -> Dict[str, Any]:
+        career = load_app("career")
+        fields = [random.choice(CAREER_FIELDS) for _ in range(n(200_000))]
+        return bench_calls("career.get_career_roadmap", (lambda f=f: career.get_career_roadmap(f) for f in fields))
+
+    return {
+        "study.schedular_agent[100]": schedule(100, 2_000),
+        "study.schedular_agent[10000]": schedule(10_000, 50),
+        "study.research_agent": research,
+        "game_master.generate_event": events,
+        "career.get_career_roadmap": roadmaps,
+    }
+
+
+async def run_suite(args) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+
+    def wanted(name: str) -> bool:
+        return not args.only or any(part in name for part in args.only)
+
+    def done(result: Dict[str, Any]) -> None:
+        results.append(result)
+        print(format_row(result), flush=True)
+
+    for name, bench in pure_benchmarks(args.scale).items():
+        if wanted(name):
+            random.seed(args.seed)
+            done(bench())
+
+    agents = [name for name in SCRIPTS if wanted(f"agent.{name}")]
+    if agents:
+        server = FakeLLMServer(latency=args.latency, token_delay=args.token_delay,
+                               reply_tokens=args.reply_tokens, rpm=args.rpm, error_rate=args.error_rate,
+                               route=args.speculate).start()
+        os.environ["GEMINI_BASE_URL"] = server.base_url
+        os.environ["GEMINI_API_KEY"] = "benchmark"
+        from common import provider
+
+        try:
+            for name in agents:
+                random.seed(args.seed)
+                done(await bench_agent(name, args.sessions, args.concurrency, args.speculate))
+        finally:
+            await provider.aclose()
+            server.shutdown()
+    return results
+
+
+# === Baselines ===
+def format_seconds(seconds: float) -> str:
+    return f"{seconds * 1e6:8.1f}µs" if seconds < 1e-3 else f"{seconds * 1000:8.1f}ms"
+
+
+def format_row(result: Dict[str, Any]) -> str:
+    errors = f"  errors {result['errors']}" if result["errors"] else ""
+    row = (f"{result['name']:<32} n={result['count']:<7} p50 {format_seconds(result['p50'])}  "
+           f"p95 {format_seconds(result['p95'])}  p99 {format_seconds(result['p99'])}  "
+           f"{result['throughput']:11.1f} {result['unit']:<8} rss {result['rss_mb']:7.1f}MB{errors}")
+    if "speculation" in result:
+        speculation = result["speculation"]
+        row += (f"\n    speculated {speculation['speculated']}/{speculation['turns']}  "
+                f"accuracy {speculation['accuracy']}  saved {speculation['saved_seconds']:.2f}s")
+    return row
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    # A benchmark regresses when any percentile is slower, or throughput
+    # lower, than the baseline by more than `tolerance`.
+    previous = {result["name"]: result for result in baseline.get("results", [])}
+    regressions = []
+    print(f"\nCompared with baseline from {baseline.get('meta', {}).get('timestamp', '?')} "
+          f"(tolerance {tolerance:.0%}):")
+    for result in results:
+        old = previous.get(result["name"])
+        if old is None:
+            print(f"  {result['name']:<32} new")
+            continue
+        changes = []
+        for key in ("p50", "p95", "p99"):
+            ratio = result[key] / old[key] if old[key] else 1.0
+            changes.append(f"{key} {ratio - 1:+7.1%}")
+            if ratio > 1 + tolerance:
+                regressions.append(f"{result['name']} {key} {format_seconds(old[key]).strip()} -> "
+                                   f"{format_seconds(result[key]).strip()}")
+        ratio = result["throughput"] / old["throughput"] if old["throughput"] else 1.0
+        changes.append(f"throughput {ratio - 1:+7.1%}")
+        if ratio < 1 / (1 + tolerance):
+            regressions.append(f"{result['name']} throughput {old['throughput']:.1f} -> {result['throughput']:.1f}")
+        print(f"  {result['name']:<32} " + "  ".join(changes))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the agent apps against a local fake model server")
+    parser.add_argument("--output", "-o", help="Write the results as a JSON baseline to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against a saved baseline; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before a regression (0.2 = 20%%)")
+    parser.add_argument("--only", nargs="*", help="Run only benchmarks whose name contains one of these")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply the pure-Python iteration counts")
+    parser.add_argument("--sessions", type=int, default=20, help="Scripted conversations per agent app")
+    parser.add_argument("--concurrency", type=int, default=10, help="Conversations run at the same time")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake model seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="Fake model seconds per token")
+    parser.add_argument("--reply-tokens", type=int, default=40, help="Words per fake model reply")
+    parser.add_argument("--rpm", type=int, default=0, help="Fake model requests per minute before it answers 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of fake model requests answered 429")
+    parser.add_argument("--speculate", action="store_true",
+                        help="Route Travel and Career turns through speculative triage (common/speculate.py)")
+    parser.add_argument("--seed", type=int, default=1234)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    os.environ.setdefault("AGENT_CACHE", "off")
+    results = asyncio.run(run_suite(args))
+
+    if args.output:
+        meta = {"timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(), "platform": platform.platform(),
+                "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare")}}
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+        print(f"\n💾 Saved baseline to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\n❌ Regressions:\n  " + "\n  ".join(regressions))
+            return 1
+        print("\n✅ No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
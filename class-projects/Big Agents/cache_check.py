@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+from common.apps import load_app
+from common.cache import ResponseCache
+
+# === Cache Check ===
+# Checks the response cache keys (common/cache.py) against the apps' real
+# agents: two conversations that end in the same follow-up must not share a
+# key, while the same opening question (up to case and punctuation) must, or
+# the FAQ cache would never hit:
+#   python cache_check.py
+# Exits 1 if a check fails.
+
+CASES = {  # app: (agent, first conversation, second conversation)
+    "travel": ("DestinationAgent",
+               ["I love beaches", "Try Bali", "Tell me more"],
+               ["I love skiing", "Try Zermatt", "tell me more!"]),
+    "career": ("JobAgent",
+               ["What does a data analyst do?", "They clean and analyse data.", "How should I prepare for the interview?"],
+               ["What does a nurse do?", "They care for patients.", "How should I prepare for the interview?"]),
+}
+
+
+def conversation(texts: List[str]) -> List[dict]:
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": text} for i, text in enumerate(texts)]
+
+
+def check(name: str) -> Tuple[str, List[str]]:
+    agent_name, first, second = CASES[name]
+    agents = load_app(name).graph.AGENTS
+    agent = agents[agent_name]
+    cache = ResponseCache(agents.values(), cacheable=[agent_name])
+    failures = []
+    if cache.key(agent, conversation(first)) == cache.key(agent, conversation(second)):
+        failures.append(f"{first!r} and {second!r} share a key")
+    if cache.key(agent, conversation(first[:1])) != cache.key(agent, conversation([first[0].upper() + "?"])):
+        failures.append(f"the opening question {first[0]!r} gets a new key when only its case and punctuation change")
+    return agent_name, failures
+
+
+def main() -> int:
+    failed = False
+    for name in CASES:
+        agent_name, failures = check(name)
+        print(f"{'❌' if failures else '✅'} {name:<8} {agent_name}")
+        for failure in failures:
+            print(f"     {failure}")
+        failed = failed or bool(failures)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+import sys
+import importlib.util
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+REPO = ROOT.parent.parent
+
+# === App Registry ===
+# Where each app's entry module lives. Every app is a main.py, so load_app()
+# imports each under its own module name ("app_travel", ...) with the app's
+# folder on sys.path for its local modules (engine, roadmaps, research, ...).
+APPS = {
+    "travel": ROOT / "Travel Designer Agent" / "main.py",
+    "career": ROOT / "Career Mentor Agent" / "main.py",
+    "game_master": ROOT / "Game Master Agent" / "main.py",
+    "class01": REPO / "class01" / "main.py",
+    "study": REPO / "class-projects" / "smart-student-agent-assistant" / "main.py",
+}
+
+
+def load_app(name: str) -> Any:
+    module_name = f"app_{name}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    path = APPS[name]
+    sys.path.insert(0, str(path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
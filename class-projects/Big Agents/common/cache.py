@@ -0,0 +1,214 @@
+import os
+import re
+import time
+import json
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+Message = Dict[str, str]
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    output: str
+    agent: str
+    latency: float  # seconds the original model round-trip took
+
+
+# Looks like a RunResult to the apps: final_output plus the answering agent.
+@dataclass
+class CachedResult:
+    final_output: str
+    last_agent: Any
+    cached: bool = True
+
+    @property
+    def final_agent(self) -> Any:
+        return self.last_agent
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+# === Memory Tier ===
+class MemoryTier:
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, CachedResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if item[0] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return item[1]
+
+    def put(self, key: str, value: CachedResponse, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# === Disk Tier ===
+# SQLite in WAL mode with a memory-mapped file, so several processes can
+# share one cache. Expired rows are skipped on read and least-recently-used
+# rows are trimmed once the table outgrows max_entries.
+class SQLiteTier:
+    def __init__(self, path: str, max_entries: int = 100_000, mmap_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(f"PRAGMA mmap_size={int(mmap_bytes)}")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, output TEXT NOT NULL, agent TEXT NOT NULL, latency REAL NOT NULL, "
+            "expires REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT output, agent, latency FROM responses WHERE key = ? AND expires > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        return CachedResponse(*row)
+
+    def put(self, key: str, value: CachedResponse, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value.output, value.agent, value.latency, now + ttl, now),
+            )
+            self._writes += 1
+            if self._writes % 256 == 0:
+                self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        self._db.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+        self._db.execute(
+            "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def close(self) -> None:
+        self._db.close()
+
+
+# === Response Cache ===
+# Opt-in cache in front of Runner.run. The key covers the starting agent's
+# name, a hash of its instructions, its tools and handoffs, and the messages
+# after normalization (case, punctuation, whitespace). By default that is the
+# whole conversation: an opening question is shared by every user who asks
+# it, but a follow-up such as "tell me more" only hits after the same earlier
+# turns, never another conversation's answer. Only answers given by an agent
+# in `cacheable` are stored.
+class ResponseCache:
+    def __init__(self, agents: Iterable[Any], cacheable: Iterable[str], ttl: float = 3600.0,
+                 max_entries: int = 1024, path: Optional[str] = None, context_messages: Optional[int] = None):
+        self.agents = {agent.name: agent for agent in agents}
+        self.cacheable = set(cacheable)
+        self.ttl = ttl
+        self.context_messages = context_messages
+        self.memory = MemoryTier(max_entries)
+        self.disk = SQLiteTier(path) if path else None
+        self._agent_keys: Dict[int, str] = {}
+        self.stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0,
+                      "saved_seconds": 0.0, "lookup_seconds": 0.0}
+
+    def _agent_key(self, agent: Any) -> str:
+        key = self._agent_keys.get(id(agent))
+        if key is None:
+            instructions = agent.instructions
+            if callable(instructions):
+                instructions = getattr(instructions, "__qualname__", repr(instructions))
+            tools = sorted(getattr(t, "name", str(t)) for t in (agent.tools or []))
+            handoffs = sorted(getattr(h, "tool_name", getattr(h, "name", str(h))) for h in (agent.handoffs or []))
+            key = json.dumps([agent.name, hashlib.sha256(str(instructions).encode()).hexdigest(), tools, handoffs])
+            self._agent_keys[id(agent)] = key
+        return key
+
+    def key(self, agent: Any, messages: List[Message]) -> str:
+        window = messages[-self.context_messages:] if self.context_messages else messages
+        recent = [(m["role"], _normalize(m["content"])) for m in window]
+        raw = self._agent_key(agent) + json.dumps(recent, ensure_ascii=False)
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        hit = self.memory.get(key)
+        if hit is not None:
+            self.stats["memory_hits"] += 1
+        elif self.disk is not None:
+            hit = self.disk.get(key)
+            if hit is not None:
+                self.stats["disk_hits"] += 1
+                self.memory.put(key, hit, self.ttl)
+        return hit
+
+    def put(self, key: str, value: CachedResponse) -> None:
+        self.memory.put(key, value, self.ttl)
+        if self.disk is not None:
+            self.disk.put(key, value, self.ttl)
+        self.stats["stores"] += 1
+
+    def lookup(self, agent: Any, messages: List[Message]) -> tuple[str, Optional[CachedResult]]:
+        start = time.perf_counter()
+        key = self.key(agent, messages)
+        hit = self.get(key)
+        self.stats["lookup_seconds"] += time.perf_counter() - start
+        if hit is None or hit.agent not in self.agents:
+            self.stats["misses"] += 1
+            return key, None
+        self.stats["hits"] += 1
+        self.stats["saved_seconds"] += hit.latency
+        return key, CachedResult(hit.output, self.agents[hit.agent])
+
+    def store(self, key: str, result: Any, latency: float) -> None:
+        answered_by = getattr(result, "last_agent", None) or getattr(result, "final_agent", None)
+        output = result.final_output
+        if answered_by is not None and answered_by.name in self.cacheable and isinstance(output, str):
+            self.put(key, CachedResponse(output, answered_by.name, latency))
+
+    async def run(self, agent: Any, messages: List[Message], **kwargs) -> Any:
+        from agents import Runner
+
+        key, hit = self.lookup(agent, messages)
+        if hit is not None:
+            return hit
+        start = time.perf_counter()
+        result = await Runner.run(agent, messages, **kwargs)
+        self.store(key, result, time.perf_counter() - start)
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {**self.stats, "hit_rate": self.stats["hits"] / lookups if lookups else 0.0}
+
+
+def cache_from_env(agents: Iterable[Any], cacheable: Iterable[str]) -> Optional[ResponseCache]:
+    # AGENT_CACHE=memory|disk turns the cache on; AGENT_CACHE_PATH picks the
+    # shared SQLite file and AGENT_CACHE_TTL the lifetime in seconds.
+    mode = os.getenv("AGENT_CACHE", "off").lower()
+    if mode not in ("memory", "disk"):
+        return None
+    path = os.getenv("AGENT_CACHE_PATH", "agent_cache.sqlite3") if mode == "disk" else None
+    return ResponseCache(agents, cacheable, ttl=float(os.getenv("AGENT_CACHE_TTL", 3600)), path=path)
@@ -0,0 +1,267 @@
+import os
+import json
+import mmap
+import zlib
+import atexit
+import struct
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+MAGIC = b"AGCAS1\n\0"
+INDEX_MAGIC = b"AGCASIX1"
+MODES = ("record", "replay", "auto")
+
+# Record: request key, occurrence, crc32 of meta + body, status, flags, meta
+# length, body length. Meta is the JSON of the response headers worth keeping;
+# the body is the raw response bytes (SSE streams included), zlib-compressed
+# when that pays.
+RECORD = struct.Struct("<16sIIHHII")
+COMPRESSED = 1
+# Index entry: request key, occurrence, record offset. The trailer closes the
+# file: index offset, entry count, magic.
+ENTRY = struct.Struct("<16sIQ")
+TRAILER = struct.Struct("<QI8s")
+KEPT_HEADERS = ("content-type", "content-encoding")
+
+
+class CassetteMiss(LookupError):
+    pass
+
+
+def request_key(method: str, path: str, body: bytes) -> bytes:
+    # JSON bodies are canonicalised (sorted keys, no whitespace) so the key
+    # only changes when the request does. Headers, the API key among them,
+    # never reach the cassette.
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+    except ValueError:
+        pass
+    return hashlib.blake2b(b"%s %s\n%s" % (method.encode(), path.encode(), body), digest_size=16).digest()
+
+
+# === Cassette ===
+# Model responses keyed by the request that produced them, in one file: an
+# append-only log of records followed, once the cassette is closed, by a
+# sorted index and a trailer. Opening a closed cassette reads only the index;
+# replay then serves bodies straight out of a read-only mmap of the log.
+#
+# The n-th identical request of a run gets the n-th recorded response, so a
+# conversation that asks the same thing twice replays both answers in order.
+# Past the last recording the last response is served again, which lets a
+# load run play one recorded transcript from any number of sessions.
+#
+# A record is flushed as soon as its response is complete. A cassette left
+# without its index (a crash, a kill) is re-indexed on open by scanning the
+# log, and a torn tail is cut off. One process records a cassette at a time.
+class Cassette:
+    def __init__(self, path: str, mode: str = "replay"):
+        if mode not in MODES:
+            raise ValueError(f"cassette mode must be one of {', '.join(MODES)}, not {mode!r}")
+        if mode == "replay" and not os.path.exists(path):
+            raise FileNotFoundError(f"no cassette at {path}; record one first (AGENT_CASSETTE_MODE=record)")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._index: Dict[Tuple[bytes, int], int] = {}
+        self._counts: Dict[bytes, int] = {}
+        self._seen: Dict[bytes, int] = {}
+        self._reader: Optional[mmap.mmap] = None
+        self._reader_size = 0
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0}
+
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "rb" if mode == "replay" else ("w+b" if new else "r+b"))
+        if new:
+            self._file.write(MAGIC)
+            self._file.flush()
+        self._end = self._open_index()
+        if mode != "replay":
+            # New records overwrite the old index; close() writes a fresh one.
+            self._file.truncate(self._end)
+            self._file.seek(self._end)
+        atexit.register(self.close)
+
+    # --- index ---
+    def _open_index(self) -> int:
+        size = os.fstat(self._file.fileno()).st_size
+        reader = self._map_reader(size)
+        if reader[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a cassette")
+        if size >= len(MAGIC) + TRAILER.size:
+            start, count, magic = TRAILER.unpack_from(reader, size - TRAILER.size)
+            if magic == INDEX_MAGIC and start + count * ENTRY.size + TRAILER.size == size:
+                for i in range(count):
+                    key, occurrence, offset = ENTRY.unpack_from(reader, start + i * ENTRY.size)
+                    self._add(key, occurrence, offset)
+                return start
+        return self._scan(reader, size)
+
+    def _scan(self, reader: mmap.mmap, size: int) -> int:
+        offset = len(MAGIC)
+        while offset + RECORD.size <= size:
+            key, occurrence, crc, _, _, meta_len, body_len = RECORD.unpack_from(reader, offset)
+            end = offset + RECORD.size + meta_len + body_len
+            if end > size or zlib.crc32(reader[offset + RECORD.size:end]) != crc:
+                break
+            self._add(key, occurrence, offset)
+            offset = end
+        return offset
+
+    def _add(self, key: bytes, occurrence: int, offset: int) -> None:
+        self._index[key, occurrence] = offset
+        self._counts[key] = max(self._counts.get(key, 0), occurrence + 1)
+
+    def _map_reader(self, size: int) -> mmap.mmap:
+        if self._reader is None or self._reader_size != size:
+            if self._reader is not None:
+                self._reader.close()
+            self._file.flush()
+            self._reader = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ)
+            self._reader_size = size
+        return self._reader
+
+    # --- records ---
+    def next_occurrence(self, key: bytes) -> int:
+        with self._lock:
+            occurrence = self._seen.get(key, 0)
+            self._seen[key] = occurrence + 1
+            return occurrence
+
+    def get(self, key: bytes, occurrence: int) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        # (status, headers, body) of the recorded response, or None.
+        with self._lock:
+            count = self._counts.get(key)
+            if count is None:
+                self.stats["misses"] += 1
+                return None
+            offset = self._index[key, min(occurrence, count - 1)]
+            reader = self._map_reader(self._end)
+            _, _, _, status, flags, meta_len, body_len = RECORD.unpack_from(reader, offset)
+            start = offset + RECORD.size
+            headers = json.loads(reader[start:start + meta_len])
+            body = reader[start + meta_len:start + meta_len + body_len]
+            self.stats["hits"] += 1
+        return status, headers, zlib.decompress(body) if flags & COMPRESSED else body
+
+    def put(self, key: bytes, occurrence: int, status: int, headers: Dict[str, str], body: bytes) -> None:
+        meta = json.dumps(headers, sort_keys=True).encode()
+        flags = 0
+        packed = zlib.compress(body, 6)
+        if len(packed) < len(body) * 7 // 8:
+            body, flags = packed, COMPRESSED
+        with self._lock:
+            if self.mode == "replay" or self._file.closed:
+                return
+            payload = meta + body
+            self._file.write(RECORD.pack(key, occurrence, zlib.crc32(payload), status, flags, len(meta), len(body)))
+            self._file.write(payload)
+            self._file.flush()
+            self._add(key, occurrence, self._end)
+            self._end += RECORD.size + len(payload)
+            self.stats["recorded"] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        return {"path": self.path, "mode": self.mode, "responses": len(self._index), **self.stats}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+            if self.mode != "replay":
+                self._file.seek(self._end)
+                for (key, occurrence), offset in sorted(self._index.items()):
+                    self._file.write(ENTRY.pack(key, occurrence, offset))
+                self._file.write(TRAILER.pack(self._end, len(self._index), INDEX_MAGIC))
+                self._file.truncate()
+            self._file.close()
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def format_cassette(summary: Dict[str, Any]) -> str:
+    return (f"{summary['mode']} {summary['path']}: {summary['hits']} replayed, {summary['recorded']} recorded, "
+            f"{summary['misses']} missed, {summary['responses']} responses on file")
+
+
+# === Cassette Transport ===
+# Sits under the shared httpx client (common/provider.py), so every model
+# call, streamed or not and whatever tool calls or handoffs it carries, goes
+# through the cassette without the SDK noticing:
+#   record - forward to the network and record every 2xx response
+#   replay - answer from the cassette only; a request it has not seen raises
+#            CassetteMiss instead of touching the network
+#   auto   - replay what the cassette has and record the rest
+# Requests are keyed on their path below the provider's base URL, so a
+# cassette recorded against one endpoint replays under any other.
+class _RecordingStream(httpx.AsyncByteStream):
+    # Passes the response through as it streams and records it once complete.
+    def __init__(self, stream: httpx.AsyncByteStream, done: Callable[[bytes], None]):
+        self.stream = stream
+        self.done = done
+
+    async def __aiter__(self):
+        chunks: List[bytes] = []
+        async for chunk in self.stream:
+            chunks.append(chunk)
+            yield chunk
+        self.done(b"".join(chunks))
+
+    async def aclose(self) -> None:
+        await self.stream.aclose()
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    def __init__(self, cassette: Cassette, inner: Optional[httpx.AsyncBaseTransport] = None, base_url: str = ""):
+        self.cassette = cassette
+        self.inner = inner or httpx.AsyncHTTPTransport()
+        self.base_path = urlparse(base_url).path.rstrip("/")
+
+    def _path(self, request: httpx.Request) -> str:
+        path = request.url.path
+        return path[len(self.base_path):] if self.base_path and path.startswith(self.base_path) else path
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        key = request_key(request.method, self._path(request), body)
+        occurrence = self.cassette.next_occurrence(key)
+        if self.cassette.mode != "record":
+            hit = self.cassette.get(key, occurrence)
+            if hit is not None:
+                status, headers, content = hit
+                return httpx.Response(status, headers=headers, content=content, request=request)
+            if self.cassette.mode == "replay":
+                raise CassetteMiss(f"{request.method} {self._path(request)} is not on the cassette {self.cassette.path}; "
+                                   f"record it first (AGENT_CASSETTE_MODE=record or auto)")
+
+        response = await self.inner.handle_async_request(request)
+        if not 200 <= response.status_code < 300:
+            return response
+        headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+        record = lambda content: self.cassette.put(key, occurrence, response.status_code, headers, content)
+        return httpx.Response(response.status_code, headers=response.headers,
+                              stream=_RecordingStream(response.stream, record), extensions=response.extensions)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+        self.cassette.close()
+
+
+def cassette_from_env() -> Optional[Cassette]:
+    # AGENT_CASSETTE is the cassette file; AGENT_CASSETTE_MODE picks record,
+    # replay or auto (the default: replay what is there, record the rest).
+    path = os.getenv("AGENT_CASSETTE")
+    if not path:
+        return None
+    return Cassette(path, os.getenv("AGENT_CASSETTE_MODE", "auto").lower())
@@ -0,0 +1,269 @@
+import re
+import json
+import time
+import random
+import argparse
+import itertools
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# === Fake OpenAI-Compatible Server ===
+# A local stand-in for the Gemini OpenAI endpoint, for tests and demos:
+#   GEMINI_BASE_URL=http://127.0.0.1:8000/v1/ GEMINI_API_KEY=fake uv run main.py
+# It answers /v1/chat/completions (plain or streamed) with a canned reply.
+# If the last user message contains "@<tool name>" and that tool (e.g. a
+# handoff_to_* function) was offered, it first answers with a call to it.
+# Several "@tools" give one response with parallel calls, and "@tool(value)"
+# passes value as every required argument.
+#
+# With --route it also hands off on its own: when handoffs to agents in
+# routing_cases.json are offered for a user message, it calls the one whose
+# examples there share the most words with the message, and answers itself
+# if none do. This crude word-overlap router only exists so the speculation
+# benchmark has a triage that sometimes disagrees with the apps' keyword
+# routers; it says nothing about how a real model routes. Off by default, so
+# plain runs and recordings never hand off unless a message asks.
+#
+# To exercise retries and rate limiting it can enforce a requests-per-minute
+# quota (--rpm) and answer a random share of requests with 429 (--error-rate),
+# both with a Retry-After header, the way Gemini reports exhausted quota.
+
+WORDS = ("the quick adventure continues as our guide shares another helpful idea about your plan "
+         "with a few more details worth knowing before the next step").split()
+
+ROUTING_CASES = Path(__file__).resolve().parent.parent / "routing_cases.json"
+STOPWORDS = set("the and for you your with what which how can should are some any there this that from into "
+                "give help find need want like about next our their them they its does doing".split())
+
+_ids = itertools.count(1)
+
+
+def reply_text(messages: List[Dict[str, Any]], tokens: int) -> str:
+    last = next((m for m in reversed(messages) if m.get("role") == "user"), {})
+    content = last.get("content", "")
+    if isinstance(content, list):
+        content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    words = [f"You said: {content.strip()[:80]}."]
+    words.extend(itertools.islice(itertools.cycle(WORDS), max(0, tokens - len(words[0].split()))))
+    return " ".join(words)
+
+
+def requested_tools(body: Dict[str, Any]) -> List[Tuple[str, str]]:
+    # (name, JSON arguments) for every offered tool the last user message asks for.
+    messages = body.get("messages", [])
+    if messages and messages[-1].get("role") == "tool":
+        return []
+    last = next((m for m in reversed(messages) if m.get("role") == "user"), {})
+    content = last.get("content", "")
+    if not isinstance(content, str):
+        return []
+    calls = []
+    for tool in body.get("tools", []):
+        function = tool.get("function", {})
+        name = function.get("name", "")
+        match = re.search(rf"@{re.escape(name)}(?:\(([^)]*)\))?(?!\w)", content) if name else None
+        if match:
+            required = function.get("parameters", {}).get("required", [])
+            calls.append((name, json.dumps({param: match.group(1) or "" for param in required})))
+    return calls
+
+
+def _words(text: str) -> Set[str]:
+    return {word for word in re.findall(r"[a-z]+", text.lower()) if len(word) > 2 and word not in STOPWORDS}
+
+
+def load_routes(path: Path = ROUTING_CASES) -> Dict[str, Set[str]]:
+    # Agent name -> the words of that agent's example messages.
+    with open(path, encoding="utf-8") as f:
+        cases = json.load(f)
+    routes: Dict[str, Set[str]] = {}
+    for case in (case for app_cases in cases.values() for case in app_cases):
+        routes.setdefault(case["agent"], set()).update(_words(case["message"]))
+    return routes
+
+
+def _handoff_target(function: Dict[str, Any], routes: Dict[str, Set[str]]) -> Optional[str]:
+    # Handoff tools are named by the app (handoff_to_job) or the SDK
+    # (transfer_to_jobagent); both describe the agent by name.
+    name, description = function.get("name", ""), function.get("description", "")
+    return next((agent for agent in routes if name == f"transfer_to_{agent.lower()}" or agent in description), None)
+
+
+def routed_handoff(body: Dict[str, Any], routes: Dict[str, Set[str]]) -> List[Tuple[str, str]]:
+    # The offered handoff that best matches the user's message; ties go to
+    # the first one offered.
+    messages = body.get("messages", [])
+    content = messages[-1].get("content") if messages and messages[-1].get("role") == "user" else None
+    if not isinstance(content, str):
+        return []
+    words = _words(content)
+    best, best_score = None, 0
+    for tool in body.get("tools", []):
+        function = tool.get("function", {})
+        target = _handoff_target(function, routes)
+        score = len(words & routes[target]) if target else 0
+        if score > best_score:
+            best, best_score = function.get("name"), score
+    return [(best, "{}")] if best else []
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "FakeLLMServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        retry_after = self.server.admit()
+        if retry_after is not None:
+            self._send_json(429, {"error": {"message": "Resource has been exhausted (e.g. check quota).",
+                                            "code": 429, "status": "RESOURCE_EXHAUSTED"}},
+                            {"Retry-After": f"{retry_after:.3f}"})
+            return
+        self.server.requests += 1
+
+        time.sleep(self.server.latency)
+        tools = requested_tools(body) or (routed_handoff(body, self.server.routes) if self.server.routes else [])
+        text = "" if tools else reply_text(body.get("messages", []), self.server.reply_tokens)
+        if body.get("stream"):
+            self._stream(body, text, tools)
+        else:
+            self._complete(body, text, tools)
+
+    def _base(self, body: Dict[str, Any], kind: str) -> Dict[str, Any]:
+        return {"id": f"chatcmpl-{next(_ids)}", "object": kind, "created": int(time.time()),
+                "model": body.get("model", "fake-model")}
+
+    def _usage(self, body: Dict[str, Any], text: str) -> Dict[str, int]:
+        prompt = sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+        completion = max(1, len(text.split()))
+        return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+    def _tool_call(self, tool: Tuple[str, str]) -> Dict[str, Any]:
+        name, arguments = tool
+        return {"id": f"call_{next(_ids)}", "type": "function", "function": {"name": name, "arguments": arguments}}
+
+    def _complete(self, body: Dict[str, Any], text: str, tools: List[Tuple[str, str]]) -> None:
+        time.sleep(self.server.token_delay * len(text.split()))
+        message: Dict[str, Any] = {"role": "assistant", "content": text or None}
+        if tools:
+            message["tool_calls"] = [self._tool_call(tool) for tool in tools]
+        payload = self._base(body, "chat.completion")
+        payload["choices"] = [{"index": 0, "message": message, "finish_reason": "tool_calls" if tools else "stop"}]
+        payload["usage"] = self._usage(body, text)
+        self._send_json(200, payload)
+
+    def _stream(self, body: Dict[str, Any], text: str, tools: List[Tuple[str, str]]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        base = self._base(body, "chat.completion.chunk")
+
+        def send(delta: Dict[str, Any], finish: Optional[str] = None, **extra: Any) -> None:
+            chunk = {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish}], **extra}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+
+        if tools:
+            for index, tool in enumerate(tools):
+                send({"role": "assistant", "tool_calls": [{"index": index, **self._tool_call(tool)}]})
+            send({}, "tool_calls")
+        else:
+            for i, word in enumerate(text.split()):
+                send({"role": "assistant", "content": word if i == 0 else " " + word})
+                time.sleep(self.server.token_delay)
+            send({}, "stop")
+        if body.get("stream_options", {}).get("include_usage"):
+            self.wfile.write(f"data: {json.dumps({**base, 'choices': [], 'usage': self._usage(body, text)})}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 token_delay: float = 0.0, reply_tokens: int = 40, rpm: int = 0, error_rate: float = 0.0,
+                 retry_after: float = 1.0, route: bool = False):
+        super().__init__((host, port), FakeLLMHandler)
+        self.routes = load_routes() if route else {}
+        self.latency = latency
+        self.token_delay = token_delay
+        self.reply_tokens = reply_tokens
+        self.rpm = rpm
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.requests = 0
+        self.rejected = 0
+        self._admitted: deque = deque()
+        self._quota_lock = threading.Lock()
+
+    def admit(self) -> Optional[float]:
+        # None if the request may proceed, else the Retry-After in seconds.
+        with self._quota_lock:
+            now = time.monotonic()
+            if self.error_rate and random.random() < self.error_rate:
+                self.rejected += 1
+                return self.retry_after
+            if self.rpm:
+                while self._admitted and now - self._admitted[0] >= 60:
+                    self._admitted.popleft()
+                if len(self._admitted) >= self.rpm:
+                    self.rejected += 1
+                    return 60 - (now - self._admitted[0])
+                self._admitted.append(now)
+            return None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1/"
+
+    def start(self) -> "FakeLLMServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local fake OpenAI-compatible chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.03, help="Seconds between streamed tokens")
+    parser.add_argument("--reply-tokens", type=int, default=60, help="Words per reply")
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per rolling minute before answering 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds for --error-rate 429s")
+    parser.add_argument("--route", action="store_true",
+                        help="Hand off on its own using the examples in routing_cases.json")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = FakeLLMServer(args.host, args.port, args.latency, args.token_delay, args.reply_tokens, args.rpm,
+                           args.error_rate, args.retry_after, args.route)
+    print(f"🧪 Fake LLM listening on {server.base_url}")
+    server.serve_forever()
@@ -0,0 +1,71 @@
+import time
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+
+Message = dict
+
+
+@dataclass
+class SpecialistReply:
+    agent: Any
+    output: Optional[str]
+    seconds: float
+    error: Optional[str] = None
+    result: Any = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# === Specialist Fan-Out ===
+# Runs several specialists on the same conversation at once instead of one
+# triage call followed by one handoff at a time. Each run gets its own
+# timeout and at most max_concurrency run together, so a turn takes about as
+# long as its slowest specialist. A specialist that fails or times out is
+# reported in its section; the others still answer.
+class FanOut:
+    def __init__(self, run: Optional[Callable[..., Awaitable[Any]]] = None, max_concurrency: int = 4,
+                 timeout: float = 30.0):
+        self._run = run
+        self.timeout = timeout
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.stats = {"fanouts": 0, "runs": 0, "timeouts": 0, "errors": 0, "saved_seconds": 0.0}
+
+    async def _one(self, agent: Any, messages: List[Message], kwargs: dict) -> SpecialistReply:
+        if self._run is None:
+            from agents import Runner
+
+            self._run = Runner.run
+        async with self.slots:
+            start = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(self._run(agent, messages, **kwargs), self.timeout)
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                return SpecialistReply(agent, None, time.perf_counter() - start, f"timed out after {self.timeout:g}s")
+            except Exception as e:
+                self.stats["errors"] += 1
+                return SpecialistReply(agent, None, time.perf_counter() - start, str(e))
+            return SpecialistReply(agent, str(result.final_output), time.perf_counter() - start, result=result)
+
+    async def run(self, agents: Iterable[Any], messages: List[Message], **kwargs) -> List[SpecialistReply]:
+        # Replies come back in the order the agents were given.
+        agents = list(agents)
+        start = time.perf_counter()
+        replies = await asyncio.gather(*(self._one(agent, messages, kwargs) for agent in agents))
+        self.stats["fanouts"] += 1
+        self.stats["runs"] += len(agents)
+        self.stats["saved_seconds"] += max(0.0, sum(r.seconds for r in replies) - (time.perf_counter() - start))
+        return replies
+
+    @staticmethod
+    def merge(replies: List[SpecialistReply], titles: Optional[dict] = None) -> str:
+        sections = []
+        for reply in replies:
+            name = reply.agent.name
+            title = (titles or {}).get(name, name)
+            body = reply.output if reply.ok else f"⚠️ {name} could not answer ({reply.error})."
+            sections.append(f"### {title}\n{body.strip()}")
+        return "\n\n".join(sections)
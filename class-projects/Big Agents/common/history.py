@@ -0,0 +1,120 @@
+import os
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+Message = Dict[str, str]
+Summarizer = Callable[[str, List[Message]], str]
+
+DEFAULT_MAX_TOKENS = int(os.getenv("HISTORY_MAX_TOKENS", 6000))
+DEFAULT_MAX_MESSAGES = int(os.getenv("HISTORY_MAX_MESSAGES", 200))
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token plus per-message framing; close enough for budgeting.
+    return len(text) // 4 + 4
+
+
+def rolling_summary(previous: str, evicted: List[Message], max_chars: int = 1200) -> str:
+    # Cheap local summary: the first sentence of every evicted message, keeping
+    # the most recent ones when it outgrows max_chars.
+    notes = [previous] if previous else []
+    for message in evicted:
+        first = message["content"].strip().split("\n", 1)[0].split(". ", 1)[0][:160]
+        if first:
+            notes.append(f"{message['role']}: {first}")
+    summary = " | ".join(notes)
+    if len(summary) > max_chars:
+        cut = summary.find(" | ", len(summary) - max_chars)
+        summary = summary[cut + 3:] if cut != -1 else summary[-max_chars:]
+    return summary
+
+
+# === Token-Budgeted History ===
+# Pinned messages are always sent first, followed by a rolling summary of
+# evicted turns (if a summarizer is set) and then the newest turns that fit
+# in max_tokens. Turns live in a bounded deque of (role, content, tokens)
+# tuples, so the window is rebuilt without re-counting tokens.
+class HistoryStore:
+    def __init__(self, max_tokens: int = DEFAULT_MAX_TOKENS, max_messages: int = DEFAULT_MAX_MESSAGES,
+                 pinned: Optional[List[Message]] = None, pin_first: int = 0,
+                 summarizer: Optional[Summarizer] = rolling_summary,
+                 token_counter: Callable[[str], int] = estimate_tokens):
+        self.max_tokens = max_tokens
+        self.summarizer = summarizer
+        self.count_tokens = token_counter
+        self.pin_first = pin_first
+        self._auto_pinned = 0
+        self.pinned: List[Tuple[str, str, int]] = []
+        self.summary = ""
+        self._summary_tokens = 0
+        self._turns: Deque[Tuple[str, str, int]] = deque()
+        self._max_messages = max_messages
+        self._turn_tokens = 0
+        self.metrics = {"windows": 0, "last_tokens": 0, "peak_tokens": 0, "total_tokens": 0,
+                        "messages": 0, "evicted": 0}
+        for message in pinned or []:
+            self.pin(message)
+
+    def __len__(self) -> int:
+        return len(self.pinned) + len(self._turns)
+
+    def pin(self, message: Message) -> None:
+        self.pinned.append((message["role"], message["content"], self.count_tokens(message["content"])))
+        self._evict()
+
+    def append(self, message: Message) -> None:
+        self.metrics["messages"] += 1
+        if self.pin_first:
+            self.pin_first -= 1
+            self._auto_pinned += 1
+            self.pin(message)
+            return
+        entry = (message["role"], message["content"], self.count_tokens(message["content"]))
+        self._turns.append(entry)
+        self._turn_tokens += entry[2]
+        self._evict()
+
+    def pop(self) -> Message:
+        if not self._turns and self._auto_pinned:
+            # Undo an append() that was pinned through pin_first.
+            self._auto_pinned -= 1
+            self.pin_first += 1
+            role, content, _ = self.pinned.pop()
+            return {"role": role, "content": content}
+        role, content, tokens = self._turns.pop()
+        self._turn_tokens -= tokens
+        return {"role": role, "content": content}
+
+    def _budget(self) -> int:
+        return self.max_tokens - sum(t for _, _, t in self.pinned) - self._summary_tokens
+
+    def _evict(self) -> None:
+        # Always keep the newest turn, even if it alone is over budget. The
+        # loop repeats because a longer summary shrinks the budget again.
+        while True:
+            evicted: List[Message] = []
+            while len(self._turns) > 1 and (self._turn_tokens > self._budget() or len(self._turns) > self._max_messages):
+                role, content, tokens = self._turns.popleft()
+                self._turn_tokens -= tokens
+                evicted.append({"role": role, "content": content})
+            if not evicted:
+                return
+            self.metrics["evicted"] += len(evicted)
+            if self.summarizer is None:
+                return
+            self.summary = self.summarizer(self.summary, evicted)
+            self._summary_tokens = self.count_tokens(self.summary) if self.summary else 0
+
+    def window(self) -> List[Message]:
+        messages = [{"role": role, "content": content} for role, content, _ in self.pinned]
+        if self.summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation: {self.summary}"})
+        messages.extend({"role": role, "content": content} for role, content, _ in self._turns)
+
+        tokens = self._turn_tokens + self._summary_tokens + sum(t for _, _, t in self.pinned)
+        metrics = self.metrics
+        metrics["windows"] += 1
+        metrics["last_tokens"] = tokens
+        metrics["peak_tokens"] = max(metrics["peak_tokens"], tokens)
+        metrics["total_tokens"] += tokens
+        return messages
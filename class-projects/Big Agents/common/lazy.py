@@ -0,0 +1,59 @@
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+# === Lazy Agent Graph ===
+# Importing the Agents SDK takes most of a second, far longer than the rest
+# of an app's startup. An AgentGraph builds an app's agents (and so imports
+# the SDK) on first use instead, once per process. prewarm() starts that
+# work in a background thread so it overlaps with the user typing their
+# first message. Setting a module's __getattr__ to graph.module_getattr
+# keeps `main.BookingAgent` and `from main import BookingAgent` working for
+# other scripts.
+class AgentGraph:
+    def __init__(self, build: Callable[[], Dict[str, Any]]):
+        self._build = build
+        self._agents: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._prewarm: Optional[threading.Thread] = None
+
+    @property
+    def built(self) -> bool:
+        return self._agents is not None
+
+    def get(self) -> Dict[str, Any]:
+        if self._agents is None:
+            with self._lock:
+                if self._agents is None:
+                    self._agents = self._build()
+        return self._agents
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self.get()[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def module_getattr(self, name: str) -> Any:
+        # Dunder lookups (from pickle, inspect, ...) must not build the graph.
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self, name)
+
+    def prewarm(self, *extra: Callable[[], Any]) -> threading.Thread:
+        # Builds the graph, then runs extra (e.g. get_config) in a daemon
+        # thread. Errors are ignored here; the first real use raises them.
+        def warm() -> None:
+            try:
+                self.get()
+                for step in extra:
+                    step()
+            except Exception:
+                pass
+
+        if self._prewarm is None:
+            self._prewarm = threading.Thread(target=warm, name="agent-prewarm", daemon=True)
+            self._prewarm.start()
+        return self._prewarm
@@ -0,0 +1,396 @@
+import os
+import json
+import asyncio
+import time
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+# === Log-Linear Histogram ===
+# HDR-style buckets: values below 2**bits are exact, above that every power
+# of two is split into 2**(bits-1) equal buckets, so any recorded value is
+# off by less than 1 / 2**(bits-1) (1.6% with the default 7 bits). Recording
+# is an integer shift and a dict increment; nothing is sorted until a
+# percentile is asked for. Values are stored as integers of value * scale.
+class Histogram:
+    def __init__(self, scale: float = 1.0, bits: int = 7):
+        self.scale = scale
+        self.bits = bits
+        self._exact = 1 << bits
+        self._half = bits - 1
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _index(self, v: int) -> int:
+        if v < self._exact:
+            return v
+        shift = v.bit_length() - self.bits
+        return (shift << self._half) + (v >> shift)
+
+    def _value(self, index: int) -> int:
+        # Middle of the bucket, in scaled units.
+        if index < self._exact:
+            return index
+        shift = (index >> self._half) - 1
+        low = (index - (shift << self._half)) << shift
+        return low + ((1 << shift) >> 1)
+
+    def record(self, value: float) -> None:
+        index = self._index(max(0, int(value * self.scale)))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(max(self._value(index) / self.scale, self.min), self.max)
+        return self.max
+
+    def merge(self, other: "Histogram") -> None:
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.sum += other.sum
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def summary(self) -> Dict[str, float]:
+        result = {"count": self.count, "mean": self.sum / self.count if self.count else 0.0,
+                  "min": self.min or 0.0, "max": self.max or 0.0}
+        result.update({f"p{int(q * 100)}": self.percentile(q) for q in QUANTILES})
+        return result
+
+
+# Histograms in seconds keep microsecond resolution; token counts are exact.
+HISTOGRAMS = {
+    "agent_turn_seconds": ("Wall time of one agent turn", 1e6),
+    "agent_model_seconds": ("Time spent waiting on the model within a turn", 1e6),
+    "agent_tool_seconds": ("Time spent running tools within a turn", 1e6),
+    "agent_queue_wait_seconds": ("Time a turn waited before it started", 1e6),
+    "agent_first_token_seconds": ("Time to the first streamed token", 1e6),
+    "agent_triage_seconds": ("Time spent on the speculative triage call within a turn", 1e6),
+    "agent_model_wait_seconds": ("Time a model call waited for the rate limiter", 1e6),
+    "agent_prompt_tokens": ("Prompt tokens sent per turn", 1.0),
+    "agent_completion_tokens": ("Completion tokens received per turn", 1.0),
+}
+COUNTERS = {
+    "agent_turns_total": "Agent turns by outcome",
+    "agent_handoffs_total": "Handoffs between agents",
+    "agent_cache_hits_total": "Turns answered from the response cache",
+    "agent_model_requests_total": "Model API requests",
+    "agent_model_retries_total": "Model API calls retried, by status",
+    "agent_model_coalesced_total": "Model calls answered by an identical call already in flight",
+}
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels, **extra: str) -> str:
+    pairs = list(labels) + sorted(extra.items())
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+# === Turn Hooks ===
+# Passed to Runner.run(hooks=...). The SDK only calls these five coroutines,
+# so this stays duck-typed and importing metrics never imports the SDK. The
+# streaming printer and the speculative triage call the plain methods below.
+# Tool time is the wall time during which at least one tool was running,
+# so parallel tool calls are not counted twice.
+class TurnHooks:
+    def __init__(self, turn: "Turn"):
+        self.turn = turn
+
+    async def on_agent_start(self, context, agent) -> None:
+        pass
+
+    async def on_agent_end(self, context, agent, output) -> None:
+        pass
+
+    async def on_handoff(self, context, from_agent, to_agent) -> None:
+        self.turn.handoffs += 1
+
+    async def on_tool_start(self, context, agent, tool) -> None:
+        self.turn.tool_started()
+
+    async def on_tool_end(self, context, agent, tool, result) -> None:
+        self.turn.tool_ended()
+
+    def on_first_token(self) -> None:
+        self.turn.first_token()
+
+    def on_triage(self, response, seconds: float) -> None:
+        self.turn.triage(response, seconds)
+
+
+# === Turn ===
+# Collects one turn's numbers; Metrics.turn() records them when it exits.
+class Turn:
+    def __init__(self, metrics: "Metrics", app: str, queue_wait: float = 0.0):
+        self.metrics = metrics
+        self.app = app
+        self.queue_wait = queue_wait
+        self.started = time.perf_counter()
+        self.hooks = TurnHooks(self)
+        self.agent: Optional[str] = None
+        self.handoffs = 0
+        self.tool_seconds = 0.0
+        self.first_token_seconds: Optional[float] = None
+        self.triage_seconds = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.requests = 0
+        self.cache_hit = False
+        self.model_ran = False
+        self._tools_running = 0
+        self._tools_since = 0.0
+
+    def tool_started(self) -> None:
+        if self._tools_running == 0:
+            self._tools_since = time.perf_counter()
+        self._tools_running += 1
+
+    def tool_ended(self) -> None:
+        self._tools_running -= 1
+        if self._tools_running == 0:
+            self.tool_seconds += time.perf_counter() - self._tools_since
+
+    @contextmanager
+    def tool(self) -> Iterator[None]:
+        # For tools an app calls itself rather than through the model.
+        self.tool_started()
+        try:
+            yield
+        finally:
+            self.tool_ended()
+
+    def first_token(self) -> None:
+        if self.first_token_seconds is None:
+            self.first_token_seconds = time.perf_counter() - self.started
+
+    def triage(self, response: Any, seconds: float) -> None:
+        # A model call made beside Runner.run (speculative triage), which the
+        # run's raw responses don't include.
+        self.triage_seconds += seconds
+        self.model_ran = True
+        self._add_usage(response)
+
+    def finish(self, result: Any) -> None:
+        # Token usage comes from the raw model responses; cached answers have none.
+        self.cache_hit = bool(getattr(result, "cached", False))
+        self.model_ran = self.model_ran or not self.cache_hit
+        answered_by = getattr(result, "last_agent", None)
+        self.agent = getattr(answered_by, "name", self.agent)
+        for response in getattr(result, "raw_responses", None) or []:
+            self._add_usage(response)
+
+    def _add_usage(self, response: Any) -> None:
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.prompt_tokens += usage.input_tokens or 0
+            self.completion_tokens += usage.output_tokens or 0
+            self.requests += usage.requests or 0
+
+
+# === Metrics Registry ===
+# Thread-safe counters and histograms keyed by metric name and labels.
+# Every finished turn is recorded under an "app" label, written to the JSONL
+# file if one is set, and served in Prometheus text format if an endpoint
+# is running.
+class Metrics:
+    def __init__(self, jsonl_path: Optional[str] = None):
+        self._lock = threading.Lock()
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self._jsonl = open(jsonl_path, "a", buffering=1, encoding="utf-8") if jsonl_path else None
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(HISTOGRAMS.get(name, ("", 1e6))[1])
+            histogram.record(value)
+
+    def inc(self, name: str, amount: float = 1.0, **labels: Any) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0.0) + amount
+
+    @contextmanager
+    def turn(self, app: str, queue_wait: float = 0.0, agent: Optional[str] = None) -> Iterator[Turn]:
+        turn = Turn(self, app, queue_wait)
+        turn.agent = agent
+        status = "ok"
+        try:
+            yield turn
+        except BaseException as e:
+            status = "cancelled" if isinstance(e, (asyncio.CancelledError, KeyboardInterrupt)) else "error"
+            raise
+        finally:
+            self.record(turn, time.perf_counter() - turn.started, status)
+
+    def record(self, turn: Turn, wall: float, status: str = "ok") -> None:
+        app = turn.app
+        self.inc("agent_turns_total", app=app, status=status)
+        if status != "ok":
+            self._write(turn, wall, status)
+            return
+        # Hooks see tool calls but not model calls, so model time is the rest of the turn.
+        model = max(0.0, wall - turn.tool_seconds) if turn.model_ran else 0.0
+        self.observe("agent_turn_seconds", wall, app=app)
+        if turn.model_ran:
+            self.observe("agent_model_seconds", model, app=app)
+        self.observe("agent_tool_seconds", turn.tool_seconds, app=app)
+        self.observe("agent_queue_wait_seconds", turn.queue_wait, app=app)
+        if turn.first_token_seconds is not None:
+            self.observe("agent_first_token_seconds", turn.first_token_seconds, app=app)
+        if turn.triage_seconds:
+            self.observe("agent_triage_seconds", turn.triage_seconds, app=app)
+        if turn.model_ran:
+            self.observe("agent_prompt_tokens", turn.prompt_tokens, app=app)
+            self.observe("agent_completion_tokens", turn.completion_tokens, app=app)
+        if turn.handoffs:
+            self.inc("agent_handoffs_total", turn.handoffs, app=app)
+        if turn.cache_hit:
+            self.inc("agent_cache_hits_total", app=app)
+        if turn.requests:
+            self.inc("agent_model_requests_total", turn.requests, app=app)
+        self._write(turn, wall, status, model)
+
+    def _write(self, turn: Turn, wall: float, status: str, model: float = 0.0) -> None:
+        if self._jsonl is None:
+            return
+        line = json.dumps({
+            "ts": round(time.time(), 3), "app": turn.app, "agent": turn.agent, "status": status,
+            "wall": round(wall, 6), "model": round(model, 6), "tool": round(turn.tool_seconds, 6),
+            "queue_wait": round(turn.queue_wait, 6), "first_token": turn.first_token_seconds,
+            "triage": round(turn.triage_seconds, 6),
+            "handoffs": turn.handoffs, "prompt_tokens": turn.prompt_tokens,
+            "completion_tokens": turn.completion_tokens, "cache_hit": turn.cache_hit,
+        })
+        with self._lock:
+            self._jsonl.write(line + "\n")
+
+    def summary(self, app: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        merged: Dict[str, Histogram] = {}
+        with self._lock:
+            for (name, labels), histogram in self.histograms.items():
+                if app is None or ("app", app) in labels:
+                    merged.setdefault(name, Histogram(histogram.scale)).merge(histogram)
+        return {name: histogram.summary() for name, histogram in sorted(merged.items())}
+
+    def prometheus_text(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+            seen = set()
+            for (name, labels), value in counters:
+                if name not in seen:
+                    seen.add(name)
+                    lines.append(f"# HELP {name} {COUNTERS.get(name, name)}")
+                    lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+            for (name, labels), histogram in histograms:
+                if name not in seen:
+                    seen.add(name)
+                    lines.append(f"# HELP {name} {HISTOGRAMS.get(name, (name,))[0]}")
+                    lines.append(f"# TYPE {name} summary")
+                for q in QUANTILES:
+                    lines.append(f"{name}{_format_labels(labels, quantile=str(q))} {histogram.percentile(q):.6g}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:.6g}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.server
+
+    @property
+    def exporting(self) -> bool:
+        return self._jsonl is not None or self.server is not None
+
+    def close(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+
+
+_registry: Optional[Metrics] = None
+_registry_lock = threading.Lock()
+
+
+def metrics_from_env() -> Metrics:
+    # One registry per process, shared by every app in it. AGENT_METRICS_FILE
+    # appends one JSON line per turn; AGENT_METRICS_PORT serves /metrics in
+    # Prometheus text format on 127.0.0.1.
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = Metrics(os.getenv("AGENT_METRICS_FILE") or None)
+            port = os.getenv("AGENT_METRICS_PORT")
+            if port:
+                _registry.serve(int(port))
+        return _registry
+
+
+def format_summary(summary: Dict[str, Dict[str, float]]) -> str:
+    turn = summary.get("agent_turn_seconds")
+    if not turn:
+        return "no turns recorded"
+    parts = [f"{turn['count']} turns", f"p50 {turn['p50'] * 1000:.0f}ms", f"p95 {turn['p95'] * 1000:.0f}ms",
+             f"p99 {turn['p99'] * 1000:.0f}ms"]
+    for name, label in (("agent_model_seconds", "model"), ("agent_tool_seconds", "tools")):
+        if name in summary:
+            parts.append(f"{label} p50 {summary[name]['p50'] * 1000:.0f}ms")
+    if "agent_first_token_seconds" in summary:
+        parts.append(f"first token p50 {summary['agent_first_token_seconds']['p50'] * 1000:.0f}ms")
+    return ", ".join(parts)
@@ -0,0 +1,119 @@
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from common.history import estimate_tokens
+
+EMOJI = re.compile("[\U0001F000-\U0001FAFF\u2190-\u21FF\u2300-\u23FF\u2600-\u27BF\u2B00-\u2BFF\uFE0F\u200D\u20E3]")
+PUNCTUATION = str.maketrans({"\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"', "\u2013": "-", "\u2014": "-"})
+EXAMPLE = re.compile(r'(?:User|Player)\s*:\s*"?(.*?)"?$')
+ACTION = re.compile(r"Action\s*:\s*(\S+)$")
+
+
+# === Prompt Compaction ===
+# The orchestrator prompts are markdown written for people: emoji, bold and
+# italics, padded tables, rules and one example per four lines. The model
+# routes just as well from the plain text, so each prompt is compiled once
+# into a compact canonical form:
+#   - emoji, markdown emphasis, backticks, rules and quote markers go
+#   - headings become "Heading:" and tables lose their padding and separator
+#   - "Purpose:" lines join the list item they describe
+#   - examples become one `- "message" -> action` line each, deduplicated
+#     and capped per action, in the place of the first example
+# The same input always compiles to the same bytes, so every call starts with
+# an identical system prompt and tool list, the prefix provider-side prompt
+# caching matches on.
+def _inline(line: str) -> str:
+    line = re.sub(r"^(\s*)\*\s+", r"\1- ", line)
+    line = line.replace("**", "").replace("__", "").replace("`", "").replace("*", "")
+    line = re.sub(r"(?<!\w)_([^_]+)_(?!\w)", r"\1", line)
+    line = re.sub(r"^\s*>\s?", "", line)
+    return " ".join(line.split())
+
+
+def compact_instructions(text: str, max_examples_per_action: int = 2) -> str:
+    text = EMOJI.sub("", text).translate(PUNCTUATION)
+    lines: List[str] = []
+    examples: List[Tuple[str, str]] = []
+    examples_at: Optional[int] = None
+    pending: Optional[str] = None
+    for raw in text.splitlines():
+        line = _inline(raw)
+        if not line or re.fullmatch(r"[-_=]{3,}", line):
+            continue
+        if line.startswith("|"):
+            cells = [cell.strip() for cell in line.strip("|").split("|")]
+            if not all(re.fullmatch(r":?-+:?", cell) for cell in cells):
+                lines.append(" | ".join(cells))
+            continue
+        heading = re.match(r"#+\s*(.*)", line)
+        if heading:
+            lines.append(heading.group(1).rstrip(":") + ":")
+            continue
+        example = EXAMPLE.match(line)
+        if example:
+            pending = example.group(1).strip()
+            if examples_at is None:
+                examples_at = len(lines)
+            continue
+        action = ACTION.match(line)
+        if action and pending is not None:
+            examples.append((pending, action.group(1)))
+            pending = None
+            continue
+        if line.startswith("Purpose:") and lines and re.match(r"(\d+\.|-)\s", lines[-1]):
+            lines[-1] += ": " + line[len("Purpose:"):].strip()
+            continue
+        lines.append(line)
+
+    if examples_at is not None:
+        seen, per_action, kept = set(), {}, []
+        for message, action in examples:
+            key = re.sub(r"\W+", " ", message.lower()).strip()
+            if key in seen or per_action.get(action, 0) >= max_examples_per_action:
+                continue
+            seen.add(key)
+            per_action[action] = per_action.get(action, 0) + 1
+            kept.append(f'- "{message}" -> {action}')
+        lines[examples_at:examples_at] = kept
+    return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    name: str
+    original: str
+    text: str
+
+    def sizes(self) -> Dict[str, float]:
+        before, after = len(self.original.encode()), len(self.text.encode())
+        tokens_before, tokens_after = estimate_tokens(self.original), estimate_tokens(self.text)
+        return {"bytes_before": before, "bytes_after": after, "tokens_before": tokens_before,
+                "tokens_after": tokens_after, "saved": 1 - after / before if before else 0.0}
+
+
+_compiled: Dict[str, CompiledPrompt] = {}
+_compiled_lock = threading.Lock()
+
+
+def compile_prompt(name: str, text: str) -> str:
+    # The instructions to give agent `name`; compiled once per process.
+    # AGENT_COMPACT_PROMPTS=0 sends the original markdown instead.
+    with _compiled_lock:
+        prompt = _compiled.get(name)
+        if prompt is None or prompt.original != text:
+            compact = os.getenv("AGENT_COMPACT_PROMPTS", "1") != "0"
+            prompt = _compiled[name] = CompiledPrompt(name, text, compact_instructions(text) if compact else text)
+    return prompt.text
+
+
+def prompt_report() -> List[Dict[str, object]]:
+    return [{"agent": name, **prompt.sizes()} for name, prompt in _compiled.items()]
+
+
+def format_prompt_report(rows: List[Dict[str, object]]) -> str:
+    return "\n".join(f"{row['agent']:<18} {row['bytes_before']:6,} -> {row['bytes_after']:6,} bytes  "
+                     f"~{row['tokens_before']:5,} -> {row['tokens_after']:5,} tokens  ({row['saved']:.0%} smaller)"
+                     for row in rows)
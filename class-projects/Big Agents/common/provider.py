@@ -0,0 +1,135 @@
+import os
+import threading
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from agents import AsyncOpenAI
+    from agents.run import RunConfig
+
+    from common.cassette import Cassette
+    from common.scheduler import ScheduledModel
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+# === Provider Settings ===
+# Read from the environment (or .env) when the client is first needed.
+@dataclass
+class ProviderSettings:
+    api_key_env: str = "GEMINI_API_KEY"
+    base_url: str = field(default_factory=lambda: os.getenv("GEMINI_BASE_URL", GEMINI_BASE_URL))
+    max_connections: int = field(default_factory=lambda: _env_int("AGENTS_MAX_CONNECTIONS", 100))
+    max_keepalive_connections: int = field(default_factory=lambda: _env_int("AGENTS_MAX_KEEPALIVE", 20))
+    keepalive_expiry: float = field(default_factory=lambda: _env_float("AGENTS_KEEPALIVE_EXPIRY", 60.0))
+    timeout: float = field(default_factory=lambda: _env_float("AGENTS_TIMEOUT", 60.0))
+
+
+# === Shared Client Pool ===
+# One keep-alive AsyncOpenAI client, and one model / RunConfig per model name,
+# shared by every agent in the process. Nothing (not even the SDK import) is
+# paid until the first get_*() call, so importing an app stays cheap.
+_lock = threading.Lock()
+_settings: Optional[ProviderSettings] = None
+_client: Optional["AsyncOpenAI"] = None
+_cassette: Optional["Cassette"] = None
+_models: Dict[str, "ScheduledModel"] = {}
+_configs: Dict[str, "RunConfig"] = {}
+
+
+def configure(**overrides) -> ProviderSettings:
+    global _settings
+    with _lock:
+        if _client is not None:
+            raise RuntimeError("The model client is already created; configure() must run before first use.")
+        _settings = replace(_settings or ProviderSettings(), **overrides)
+        return _settings
+
+
+def get_client() -> "AsyncOpenAI":
+    global _client, _settings, _cassette
+    if _client is not None:
+        return _client
+    with _lock:
+        if _client is None:
+            import httpx
+            from agents import AsyncOpenAI
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            settings = _settings = _settings or ProviderSettings()
+            from common.cassette import CassetteTransport, cassette_from_env
+
+            cassette = _cassette = cassette_from_env()
+            api_key = os.getenv(settings.api_key_env)
+            if not api_key and cassette is not None and cassette.mode == "replay":
+                api_key = "replay"  # never sent anywhere
+            if not api_key:
+                raise ValueError(f"{settings.api_key_env} is not set in your .env file.")
+
+            limits = httpx.Limits(
+                max_connections=settings.max_connections,
+                max_keepalive_connections=settings.max_keepalive_connections,
+                keepalive_expiry=settings.keepalive_expiry,
+            )
+            if cassette is None:
+                http_client = httpx.AsyncClient(limits=limits, timeout=settings.timeout)
+            else:
+                # Record / replay model calls (common/cassette.py).
+                transport = CassetteTransport(cassette, httpx.AsyncHTTPTransport(limits=limits), settings.base_url)
+                http_client = httpx.AsyncClient(transport=transport, timeout=settings.timeout)
+            # Retries are left to the model scheduler, which paces them against the quota.
+            _client = AsyncOpenAI(api_key=api_key, base_url=settings.base_url, http_client=http_client, max_retries=0)
+    return _client
+
+
+def get_model(name: str = DEFAULT_MODEL) -> "ScheduledModel":
+    # Every call goes through the process-wide scheduler (rate limits,
+    # priorities, retries, single flight); see common/scheduler.py.
+    model = _models.get(name)
+    if model is None:
+        from agents import OpenAIChatCompletionsModel
+
+        from common.scheduler import ScheduledModel, scheduler_from_env
+
+        chat_model = OpenAIChatCompletionsModel(model=name, openai_client=get_client())
+        model = _models.setdefault(name, ScheduledModel(chat_model, scheduler_from_env(), name))
+    return model
+
+
+def get_config(name: str = DEFAULT_MODEL) -> "RunConfig":
+    config = _configs.get(name)
+    if config is None:
+        from agents import ModelSettings
+        from agents.run import RunConfig
+
+        # include_usage asks for token counts on streamed replies too (the SDK
+        # only requests them by default from api.openai.com).
+        config = _configs.setdefault(name, RunConfig(model=get_model(name), model_settings=ModelSettings(include_usage=True),
+                                                     tracing_disabled=True))
+    return config
+
+
+def get_cassette() -> Optional["Cassette"]:
+    # The cassette the shared client records to or replays from, if any.
+    get_client()
+    return _cassette
+
+
+async def aclose() -> None:
+    global _client, _cassette
+    with _lock:
+        client, _client, _cassette = _client, None, None
+        _models.clear()
+        _configs.clear()
+    if client is not None:
+        await client.close()
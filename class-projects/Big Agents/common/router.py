@@ -0,0 +1,86 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Union
+
+Keywords = Union[Iterable[str], Mapping[str, float]]
+
+
+@dataclass(frozen=True)
+class Route:
+    target: Optional[str]
+    confidence: float
+    scores: Dict[str, float] = field(default_factory=dict)
+    matched: List[str] = field(default_factory=list)
+
+    @property
+    def matched_any(self) -> bool:
+        return self.target is not None
+
+
+# === Intent Router ===
+# All keywords of all intents are compiled into one case-insensitive regex
+# with word boundaries, so a turn is classified in a single scan. Keywords
+# may be phrases ("things to do") and also match simple inflections
+# ("attacks", "booking"). Each intent scores the weights of its matches;
+# confidence is the top score's share of the total. Ties go to the intent
+# listed first in the table.
+class IntentRouter:
+    def __init__(self, table: Mapping[str, Keywords], default: Optional[str] = None,
+                 min_confidence: float = 0.75, min_score: float = 1.0):
+        self.default = default
+        self.min_confidence = min_confidence
+        self.min_score = min_score
+        self.order = {target: i for i, target in enumerate(table)}
+        self._keywords: Dict[str, tuple[str, float]] = {}
+        for target, keywords in table.items():
+            weights = keywords if isinstance(keywords, Mapping) else dict.fromkeys(keywords, 1.0)
+            for keyword, weight in weights.items():
+                self._keywords[" ".join(keyword.lower().split())] = (target, float(weight))
+
+        # Longest first, so "book a hotel" wins over "book".
+        alternatives = sorted(self._keywords, key=len, reverse=True)
+        body = "|".join(r"\s+".join(map(re.escape, k.split())) for k in alternatives)
+        self._pattern = re.compile(rf"\b(?:{body})(?:s|es|ed|ing)?\b", re.IGNORECASE)
+        self.stats = {"routed": 0, "confident": 0, "fallback": 0}
+
+    def _lookup(self, text: str) -> Optional[tuple[str, float]]:
+        key = " ".join(text.lower().split())
+        hit = self._keywords.get(key)
+        if hit is None:
+            # Strip the inflection the pattern allowed ("battles" -> "battle").
+            for suffix in ("ing", "es", "ed", "s"):
+                if key.endswith(suffix) and (hit := self._keywords.get(key[: -len(suffix)])):
+                    break
+        return hit
+
+    def route(self, text: str) -> Route:
+        scores: Dict[str, float] = {}
+        matched: List[str] = []
+        for match in self._pattern.finditer(text):
+            hit = self._lookup(match.group(0))
+            if hit is None:
+                continue
+            target, weight = hit
+            scores[target] = scores.get(target, 0.0) + weight
+            matched.append(match.group(0))
+
+        self.stats["routed"] += 1
+        if not scores:
+            self.stats["fallback"] += 1
+            return Route(self.default, 0.0)
+        target = min(scores, key=lambda t: (-scores[t], self.order[t]))
+        return Route(target, scores[target] / sum(scores.values()), scores, matched)
+
+    def matches(self, text: str) -> List[str]:
+        # Every intent the turn mentions, strongest first (for fanning out).
+        route = self.route(text)
+        return sorted(route.scores, key=lambda t: (-route.scores[t], self.order[t]))
+
+    def confident(self, text: str) -> Optional[str]:
+        # The target when the turn is unambiguous enough to skip LLM triage.
+        route = self.route(text)
+        if route.target is not None and route.confidence >= self.min_confidence \
+                and route.scores.get(route.target, 0.0) >= self.min_score:
+            self.stats["confident"] += 1
+            return route.target
+        return None
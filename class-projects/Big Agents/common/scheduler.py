@@ -0,0 +1,302 @@
+import os
+import json
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from agents.models.interface import Model
+
+from common.history import estimate_tokens
+
+INTERACTIVE, BATCH = 0, 10
+
+_priority: ContextVar[int] = ContextVar("model_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def priority(level: int) -> Iterator[None]:
+    # Model calls made inside (including by Runner) queue at this priority;
+    # lower goes first. Batch jobs use BATCH so users' turns overtake them.
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+# === Token Bucket ===
+# Refills continuously at per_minute / 60 per second up to burst. take() may
+# drive the level negative (a call that used more tokens than estimated),
+# which simply delays the next caller.
+class TokenBucket:
+    def __init__(self, per_minute: float, burst: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1.0, per_minute / 10)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        # Seconds until amount is available (a request larger than the
+        # bucket only waits for a full bucket).
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount
+
+
+# === Model Scheduler ===
+# Sits between the Agents SDK and the model client for the whole process:
+#   - requests and tokens per minute are held to the quota by token buckets,
+#     and callers are admitted strictly by priority, then arrival
+#   - a 429 pauses everyone until its Retry-After, so the quota recovers
+#     instead of each caller hammering it; retries use jittered exponential
+#     backoff and go back through the queue
+#   - identical requests already in flight share one call (single flight)
+class ModelScheduler:
+    def __init__(self, rpm: float = 0, tpm: float = 0, max_retries: int = 4, backoff: float = 0.5,
+                 max_backoff: float = 20.0, coalesce: bool = True, completion_tokens: int = 512,
+                 metrics: Any = None):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm, burst=max(1.0, tpm / 10)) if tpm else None
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.coalesce = coalesce
+        self.completion_tokens = completion_tokens
+        self.metrics = metrics
+        self.paused_until = 0.0
+        self._waiters: List[Tuple[int, int, float, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._changed: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"calls": 0, "requests": 0, "retries": 0, "rate_limited": 0, "coalesced": 0, "errors": 0,
+                      "wait_seconds": 0.0}
+
+    # --- admission ---
+    async def acquire(self, tokens: float, level: Optional[int] = None) -> None:
+        if self.requests is None and self.tokens is None and self.paused_until <= time.monotonic():
+            return
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (_priority.get() if level is None else level, next(self._seq), tokens, future))
+        if self._dispatcher is None or self._dispatcher.done() or self._dispatcher.get_loop() is not loop:
+            self._changed = asyncio.Event()
+            self._dispatcher = loop.create_task(self._dispatch())
+        self._changed.set()
+        start = time.perf_counter()
+        try:
+            await future
+        finally:
+            waited = time.perf_counter() - start
+            self.stats["wait_seconds"] += waited
+            if self.metrics is not None:
+                self.metrics.observe("agent_model_wait_seconds", waited)
+
+    def _delay(self, tokens: float) -> float:
+        delay = max(0.0, self.paused_until - time.monotonic())
+        if self.requests is not None:
+            delay = max(delay, self.requests.delay(1))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.delay(tokens))
+        return delay
+
+    async def _dispatch(self) -> None:
+        # Grants the head of the queue once the buckets allow it. A new
+        # arrival wakes the dispatcher, since it may now be the head.
+        while self._waiters:
+            _, _, tokens, future = self._waiters[0]
+            if future.done():  # the caller was cancelled
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._delay(tokens)
+            if delay > 0:
+                self._changed.clear()
+                try:
+                    await asyncio.wait_for(self._changed.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._waiters)
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(tokens)
+            future.set_result(None)
+
+    def settle(self, estimated: float, usage: Any) -> None:
+        # Charges the token bucket for what the call really used.
+        if self.tokens is None or usage is None:
+            return
+        actual = (getattr(usage, "input_tokens", 0) or 0) + (getattr(usage, "output_tokens", 0) or 0)
+        if actual:
+            self.tokens.take(actual - estimated)
+
+    # --- retries ---
+    def retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        # Seconds to wait before retrying, or None if the error is final.
+        status = getattr(error, "status_code", None)
+        name = type(error).__name__
+        retryable = status in (408, 409, 429) or (status or 0) >= 500 or name in ("APIConnectionError",
+                                                                                   "APITimeoutError")
+        # A request missing from a replayed cassette will not appear on retry.
+        if type(error.__cause__).__name__ == "CassetteMiss":
+            retryable = False
+        if not retryable or attempt >= self.max_retries:
+            return None
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        retry_after = _retry_after(error)
+        if status == 429:
+            self.stats["rate_limited"] += 1
+            # Everyone waits out the server's cool-down, not just this caller.
+            pause = retry_after if retry_after is not None else delay
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+        if retry_after is not None:
+            delay = retry_after + random.uniform(0, self.backoff)
+        self.stats["retries"] += 1
+        if self.metrics is not None:
+            self.metrics.inc("agent_model_retries_total", status=str(status or name))
+        return delay
+
+    async def call(self, make: Any, tokens: float) -> Any:
+        for attempt in itertools.count():
+            await self.acquire(tokens)
+            self.stats["requests"] += 1
+            try:
+                return await make()
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    self.stats["errors"] += 1
+                    raise
+                await asyncio.sleep(delay)
+
+    # --- single flight ---
+    async def single_flight(self, key: Optional[str], run: Any) -> Any:
+        self.stats["calls"] += 1
+        if key is None or not self.coalesce:
+            return await run()
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            # Shielded, so one caller giving up doesn't cancel it for the others.
+            task = asyncio.ensure_future(run())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _, key=key: self._inflight.pop(key, None))
+        else:
+            self.stats["coalesced"] += 1
+            if self.metrics is not None:
+                self.metrics.inc("agent_model_coalesced_total")
+        return await asyncio.shield(task)
+
+    def estimate(self, system_instructions: Optional[str], input: Any, model_settings: Any) -> float:
+        prompt = (system_instructions or "") + (input if isinstance(input, str) else _dumps(input))
+        return estimate_tokens(prompt) + (getattr(model_settings, "max_tokens", None) or self.completion_tokens)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value) * scale
+            except ValueError:
+                pass
+    return None
+
+
+def _dumps(value: Any) -> str:
+    def default(item: Any) -> Any:
+        dump = getattr(item, "model_dump", None)
+        return dump() if dump else repr(item)
+
+    return json.dumps(value, sort_keys=True, default=default)
+
+
+# === Scheduled Model ===
+# A Model for RunConfig that sends every call through the scheduler. Only
+# whole responses are coalesced; a stream is retried only if it failed before
+# its first event, since the caller may already have shown part of it.
+class ScheduledModel(Model):
+    def __init__(self, model: Model, scheduler: ModelScheduler, name: str = ""):
+        self.model = model
+        self.scheduler = scheduler
+        self.name = name
+
+    def _key(self, system_instructions, input, model_settings, tools, output_schema, handoffs) -> str:
+        return _dumps([self.name, system_instructions, input, repr(model_settings), [t.name for t in tools],
+                       repr(output_schema), [h.tool_name for h in handoffs]])
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                           tracing, *, previous_response_id=None, prompt=None):
+        tokens = self.scheduler.estimate(system_instructions, input, model_settings)
+
+        async def run() -> Any:
+            response = await self.scheduler.call(lambda: self.model.get_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+                previous_response_id=previous_response_id, prompt=prompt), tokens)
+            self.scheduler.settle(tokens, response.usage)
+            return response
+
+        key = None if previous_response_id else self._key(system_instructions, input, model_settings, tools,
+                                                          output_schema, handoffs)
+        return await self.scheduler.single_flight(key, run)
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                              tracing, *, previous_response_id=None, prompt=None) -> AsyncIterator[Any]:
+        scheduler = self.scheduler
+        tokens = scheduler.estimate(system_instructions, input, model_settings)
+        scheduler.stats["calls"] += 1
+        for attempt in itertools.count():
+            await scheduler.acquire(tokens)
+            scheduler.stats["requests"] += 1
+            started = False
+            try:
+                async for event in self.model.stream_response(
+                        system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+                        previous_response_id=previous_response_id, prompt=prompt):
+                    started = True
+                    if getattr(event, "type", "") == "response.completed":
+                        scheduler.settle(tokens, getattr(event.response, "usage", None))
+                    yield event
+                return
+            except Exception as e:
+                delay = None if started else scheduler.retry_delay(e, attempt)
+                if delay is None:
+                    scheduler.stats["errors"] += 1
+                    raise
+                await asyncio.sleep(delay)
+
+
+_scheduler: Optional[ModelScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def scheduler_from_env() -> ModelScheduler:
+    # One scheduler per process, since the quota belongs to the API key.
+    # AGENT_RPM / AGENT_TPM set the quota (0 = unlimited), AGENT_MAX_RETRIES
+    # the retries per call, AGENT_COALESCE=0 turns single flight off.
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            from common.metrics import metrics_from_env
+
+            _scheduler = ModelScheduler(rpm=float(os.getenv("AGENT_RPM", 0)), tpm=float(os.getenv("AGENT_TPM", 0)),
+                                        max_retries=int(os.getenv("AGENT_MAX_RETRIES", 4)),
+                                        coalesce=os.getenv("AGENT_COALESCE", "1") != "0",
+                                        metrics=metrics_from_env())
+        return _scheduler
@@ -0,0 +1,181 @@
+import sys
+import json
+import time
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+# === Line-Delimited JSON Serving ===
+# Shared by the session servers: one JSON object per line in each direction,
+# over stdio, a Unix socket or TCP.
+class Connection:
+    def __init__(self, writer: Any):
+        self.writer = writer
+        self._lock = asyncio.Lock()
+
+    async def send(self, payload: Dict[str, Any]) -> None:
+        data = (json.dumps(payload, ensure_ascii=False) + "\n").encode()
+        async with self._lock:
+            self.writer.write(data)
+            await self.writer.drain()
+
+
+# Blocking stdio wrapped with the reader/writer methods the servers use, so
+# it also works when stdin/stdout are regular files rather than pipes.
+class StdinReader:
+    async def readline(self) -> bytes:
+        return await asyncio.to_thread(sys.stdin.buffer.readline)
+
+
+class StdoutWriter:
+    def write(self, data: bytes) -> None:
+        sys.stdout.buffer.write(data)
+
+    async def drain(self) -> None:
+        sys.stdout.buffer.flush()
+
+
+Handler = Callable[[Dict[str, Any], Connection], Awaitable[None]]
+
+
+async def serve_stream(reader: Any, writer: Any, handle: Handler) -> None:
+    # Hands every request line of one connection to `handle`.
+    conn = Connection(writer)
+    while line := await reader.readline():
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            await conn.send({"error": "Invalid JSON line."})
+            continue
+        await handle(request, conn)
+
+
+# === Session Inboxes ===
+# Every session owns its state and a bounded inbox drained by one worker
+# task, so turns within a session stay ordered while sessions run
+# concurrently. A full inbox rejects the message instead of blocking the
+# connection. What a session holds and how a turn runs are up to the server:
+#   open_session(key) -> state          called for the first message of a session
+#   turn(session, message, queued_at)   awaited by the worker; returns the reply
+#   label(key) -> fields                identifies the session in error replies
+# A turn that raises is answered with an error, and a reply to a client that
+# has gone away is dropped; either way the worker carries on with the next
+# message, so one failure never wedges the session. Clients that go away
+# never close their sessions, so at the session limit any session that has
+# had nothing queued or running for idle_timeout seconds is evicted before a
+# new one is turned away.
+@dataclass
+class Session:
+    key: Hashable
+    state: Any
+    inbox: asyncio.Queue
+    worker: Optional[asyncio.Task] = None
+    busy: int = 0  # messages queued or running
+    last_active: float = 0.0
+
+
+class SessionInboxes:
+    def __init__(self, open_session: Callable[[Hashable], Any],
+                 turn: Callable[[Session, str, float], Awaitable[Dict[str, Any]]],
+                 max_pending: int = 4, max_sessions: int = 1000,
+                 full: str = "Server is at its session limit, try again later.",
+                 label: Callable[[Hashable], Dict[str, Any]] = lambda key: {"session": key},
+                 idle_timeout: float = 600.0):
+        self.open_session = open_session
+        self.turn = turn
+        self.label = label
+        self.max_pending = max_pending
+        self.max_sessions = max_sessions
+        self.full = full
+        self.idle_timeout = idle_timeout
+        self.sessions: Dict[Hashable, Session] = {}
+        self.pending = 0
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def _session(self, key: Hashable) -> Session:
+        session = self.sessions.get(key)
+        if session is None:
+            if len(self.sessions) >= self.max_sessions:
+                self._evict_idle()
+            if len(self.sessions) >= self.max_sessions:
+                raise RuntimeError(self.full)
+            session = Session(key, self.open_session(key), asyncio.Queue(self.max_pending))
+            session.worker = asyncio.create_task(self._drain(session))
+            self.sessions[key] = session
+        return session
+
+    def _evict_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_timeout
+        for key, session in list(self.sessions.items()):
+            if not session.busy and session.last_active <= cutoff:
+                del self.sessions[key]
+                session.worker.cancel()
+
+    async def _drain(self, session: Session) -> None:
+        while True:
+            message, conn, queued_at = await session.inbox.get()
+            try:
+                try:
+                    reply = await self.turn(session, message, queued_at)
+                except Exception as e:
+                    reply = {**self.label(session.key), "error": f"Turn failed: {e}"}
+                await conn.send(reply)
+            except Exception as e:
+                print(f"⚠️ Dropped the reply to {session.key}: {type(e).__name__}: {e}", file=sys.stderr, flush=True)
+            finally:
+                self.pending -= 1
+                session.busy -= 1
+                session.last_active = time.monotonic()
+
+    def submit(self, key: Hashable, message: str, conn: Connection) -> Optional[str]:
+        # Queues the message; returns why it was rejected, or None.
+        try:
+            session = self._session(key)
+            session.inbox.put_nowait((message, conn, time.perf_counter()))
+        except asyncio.QueueFull:
+            return "Session is busy, wait for the pending replies."
+        except RuntimeError as e:
+            return str(e)
+        self.pending += 1
+        session.busy += 1
+        session.last_active = time.monotonic()
+        return None
+
+    async def close(self, key: Hashable) -> bool:
+        session = self.sessions.pop(key, None)
+        if session is None:
+            return False
+        self.pending -= session.inbox.qsize()
+        session.worker.cancel()
+        return True
+
+    async def wait_idle(self) -> None:
+        while self.pending:
+            await asyncio.sleep(0.05)
+
+    async def shutdown(self) -> None:
+        for key in list(self.sessions):
+            await self.close(key)
+
+
+async def listen(handle: Handler, inboxes: SessionInboxes, args: Any, banner: str) -> None:
+    # Serves `handle` on stdio (--stdio), a Unix socket (--unix) or TCP
+    # (--host/--port). `banner` is printed with "{where}" filled in.
+    if args.stdio:
+        await serve_stream(StdinReader(), StdoutWriter(), handle)
+        # Let queued turns finish before exiting on EOF.
+        await inboxes.wait_idle()
+        return
+    stream = lambda reader, writer: serve_stream(reader, writer, handle)
+    if args.unix:
+        listener = await asyncio.start_unix_server(stream, path=args.unix)
+    else:
+        listener = await asyncio.start_server(stream, args.host, args.port)
+    print(banner.format(where=args.unix or f"{args.host}:{args.port}"), file=sys.stderr, flush=True)
+    async with listener:
+        await listener.serve_forever()
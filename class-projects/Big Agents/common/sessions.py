@@ -0,0 +1,308 @@
+import os
+import json
+import mmap
+import zlib
+import struct
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+Message = Dict[str, str]
+
+LOG_MAGIC = b"AGSLOG1\n"
+INDEX_MAGIC = b"AGSIDX1\n"
+NONE = 0  # offset 0 is the log magic, so no record ever starts there
+
+# Record: payload length, crc32 of the payload, offset of the session's
+# previous record of the same kind, kind. The payload is a list of
+# length-prefixed UTF-8 strings.
+RECORD = struct.Struct("<IIQB")
+TURN, STATE, CLEAR = 1, 2, 3
+
+# Index header: magic, capacity, used slots, log size covered by the index.
+HEADER = struct.Struct("<8sIIQ")
+# Slot: session hash, last turn record, last state record, turn count.
+SLOT = struct.Struct("<QQQQ")
+
+
+def _hash(session_id: str) -> int:
+    # Never 0, which marks an empty slot.
+    return int.from_bytes(hashlib.blake2b(session_id.encode(), digest_size=8).digest(), "little") | 1
+
+
+def _pack(kind: int, prev: int, fields: List[str]) -> bytes:
+    payload = b"".join(struct.pack("<I", len(data)) + data for data in (f.encode() for f in fields))
+    return RECORD.pack(len(payload), zlib.crc32(payload), prev, kind) + payload
+
+
+def _unpack_fields(buffer: Any, start: int, end: int) -> List[str]:
+    fields = []
+    while start < end:
+        (size,) = struct.unpack_from("<I", buffer, start)
+        start += 4
+        fields.append(bytes(buffer[start:start + size]).decode())
+        start += size
+    return fields
+
+
+@dataclass
+class SavedSession:
+    session_id: str
+    messages: List[Message] = field(default_factory=list)
+    agent: Optional[str] = None
+    state: Dict[str, Any] = field(default_factory=dict)
+
+
+# === Session Store ===
+# Conversations are kept in an append-only log of small binary records. Each
+# record points back to the previous record of the same session, and an
+# mmap-backed open-addressing hash table maps every session id to its newest
+# turn and state records. Resuming a session walks its own chain only, so it
+# costs the same whether the log holds ten sessions or ten thousand.
+#
+# A crash between the log write and the index update is repaired on open by
+# replaying the log tail the index has not seen; a missing or damaged index
+# is rebuilt from the log. One process writes a store at a time.
+class SessionStore:
+    def __init__(self, path: str, capacity: int = 1024, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._log_path = f"{path}.log"
+        self._index_path = f"{path}.idx"
+        new_log = not os.path.exists(self._log_path) or os.path.getsize(self._log_path) == 0
+        self._log = open(self._log_path, "a+b")
+        if new_log:
+            self._log.write(LOG_MAGIC)
+            self._log.flush()
+        self._log_end = os.path.getsize(self._log_path)
+        self._reader: Optional[mmap.mmap] = None
+        self._reader_size = 0
+        self._index_file = None
+        self._index: Optional[mmap.mmap] = None
+        self._open_index(capacity)
+
+    # --- index ---
+    def _open_index(self, capacity: int) -> None:
+        try:
+            self._map_index()
+            magic, capacity, _, covered = HEADER.unpack_from(self._index)
+            if magic != INDEX_MAGIC or covered > self._log_end:
+                raise ValueError("index does not match the log")
+        except (OSError, ValueError, struct.error):
+            self._create_index(capacity)
+            covered = len(LOG_MAGIC)
+        if covered < self._log_end:
+            self._replay(covered)
+
+    def _map_index(self) -> None:
+        if self._index is not None:
+            self._index.close()
+            self._index_file.close()
+        self._index_file = open(self._index_path, "r+b")
+        self._index = mmap.mmap(self._index_file.fileno(), 0)
+
+    def _create_index(self, capacity: int, slots: Tuple[Tuple[int, int, int, int], ...] = ()) -> None:
+        capacity = 1 << max(4, (capacity - 1).bit_length())
+        tmp = f"{self._index_path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(INDEX_MAGIC, capacity, 0, len(LOG_MAGIC)))
+            f.write(bytes(SLOT.size * capacity))
+        if self._index is not None:
+            self._index.close()
+            self._index_file.close()
+            self._index = None
+        os.replace(tmp, self._index_path)
+        self._map_index()
+        for slot in slots:
+            self._put_slot(*slot)
+
+    def _header(self) -> Tuple[int, int, int]:
+        _, capacity, used, covered = HEADER.unpack_from(self._index)
+        return capacity, used, covered
+
+    def _find(self, key: int) -> Tuple[int, Optional[Tuple[int, int, int, int]]]:
+        # Linear probing; returns the slot position and its entry (None if empty).
+        capacity, _, _ = self._header()
+        position = key & (capacity - 1)
+        while True:
+            offset = HEADER.size + position * SLOT.size
+            entry = SLOT.unpack_from(self._index, offset)
+            if entry[0] == key:
+                return offset, entry
+            if entry[0] == 0:
+                return offset, None
+            position = (position + 1) & (capacity - 1)
+
+    def _put_slot(self, key: int, last_turn: int, last_state: int, turns: int) -> None:
+        offset, entry = self._find(key)
+        SLOT.pack_into(self._index, offset, key, last_turn, last_state, turns)
+        if entry is None:
+            capacity, used, covered = self._header()
+            HEADER.pack_into(self._index, 0, INDEX_MAGIC, capacity, used + 1, covered)
+            if (used + 1) * 2 > capacity:
+                self._grow(capacity * 2)
+
+    def _grow(self, capacity: int) -> None:
+        _, _, covered = self._header()
+        slots = tuple(entry for entry in self._slots() if entry[0])
+        self._create_index(capacity, slots)
+        self._set_covered(covered)
+
+    def _slots(self) -> Iterator[Tuple[int, int, int, int]]:
+        capacity, _, _ = self._header()
+        for position in range(capacity):
+            yield SLOT.unpack_from(self._index, HEADER.size + position * SLOT.size)
+
+    def _set_covered(self, covered: int) -> None:
+        capacity, used, _ = self._header()
+        HEADER.pack_into(self._index, 0, INDEX_MAGIC, capacity, used, covered)
+
+    def _apply(self, kind: int, key: int, offset: int, turns: int = 1) -> None:
+        _, entry = self._find(key)
+        _, last_turn, last_state, count = entry or (key, NONE, NONE, 0)
+        if kind == TURN:
+            last_turn, count = offset, count + turns
+        elif kind == STATE:
+            last_state = offset
+        elif kind == CLEAR:
+            last_turn, last_state, count = NONE, NONE, 0
+        self._put_slot(key, last_turn, last_state, count)
+
+    def _replay(self, start: int) -> None:
+        # Index every complete record from `start`; a torn tail is cut off.
+        reader = self._map_reader()
+        offset = start
+        while offset + RECORD.size <= self._log_end:
+            size, crc, _, kind = RECORD.unpack_from(reader, offset)
+            body = offset + RECORD.size
+            if body + size > self._log_end or zlib.crc32(reader[body:body + size]) != crc:
+                break
+            session_id = _unpack_fields(reader, body, body + size)[0]
+            self._apply(kind, _hash(session_id), offset)
+            offset = body + size
+        if offset < self._log_end:
+            self._close_reader()
+            self._log.truncate(offset)
+            self._log_end = offset
+        self._set_covered(offset)
+
+    # --- log ---
+    def _map_reader(self) -> mmap.mmap:
+        if self._reader is None or self._reader_size != self._log_end:
+            self._close_reader()
+            self._log.flush()
+            self._reader = mmap.mmap(self._log.fileno(), self._log_end, access=mmap.ACCESS_READ)
+            self._reader_size = self._log_end
+        return self._reader
+
+    def _close_reader(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def _write(self, data: bytes) -> None:
+        self._log.write(data)
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        self._log_end += len(data)
+
+    def _read(self, offset: int) -> Tuple[int, int, List[str]]:
+        reader = self._map_reader()
+        size, _, prev, kind = RECORD.unpack_from(reader, offset)
+        body = offset + RECORD.size
+        return kind, prev, _unpack_fields(reader, body, body + size)
+
+    # --- public API ---
+    def save_turn(self, session_id: str, messages: List[Message], agent: Optional[str] = None,
+                  state: Optional[Dict[str, Any]] = None) -> None:
+        # Appends the turn's messages and, if given, the current agent and state.
+        key = _hash(session_id)
+        with self._lock:
+            _, entry = self._find(key)
+            _, last_turn, last_state, turns = entry or (key, NONE, NONE, 0)
+            chunks = []
+            offset = self._log_end
+            for message in messages:
+                record = _pack(TURN, last_turn, [session_id, message["role"], message["content"]])
+                chunks.append(record)
+                last_turn, offset = offset, offset + len(record)
+            if agent is not None or state is not None:
+                record = _pack(STATE, last_state, [session_id, agent or "", json.dumps(state or {})])
+                chunks.append(record)
+                last_state = offset
+            self._write(b"".join(chunks))
+            self._put_slot(key, last_turn, last_state, turns + len(messages))
+            self._set_covered(self._log_end)
+
+    def load(self, session_id: str) -> Optional[SavedSession]:
+        with self._lock:
+            _, entry = self._find(_hash(session_id))
+            if entry is None or (entry[1] == NONE and entry[2] == NONE):
+                return None
+            _, last_turn, last_state, turns = entry
+            saved = SavedSession(session_id)
+            messages = []
+            offset = last_turn
+            while offset != NONE:
+                _, offset, (owner, role, content) = self._read(offset)
+                if owner != session_id:
+                    return None  # hash collision with another session
+                messages.append({"role": role, "content": content})
+            messages.reverse()
+            saved.messages = messages
+            if last_state != NONE:
+                _, _, (owner, agent, state) = self._read(last_state)
+                saved.agent = agent or None
+                saved.state = json.loads(state)
+            return saved
+
+    def turns(self, session_id: str) -> int:
+        with self._lock:
+            _, entry = self._find(_hash(session_id))
+            return entry[3] if entry else 0
+
+    def clear(self, session_id: str) -> None:
+        with self._lock:
+            offset = self._log_end
+            self._write(_pack(CLEAR, NONE, [session_id]))
+            self._apply(CLEAR, _hash(session_id), offset)
+            self._set_covered(self._log_end)
+
+    def sessions(self) -> List[str]:
+        with self._lock:
+            names = []
+            for key, last_turn, last_state, _ in self._slots():
+                if key and (last_turn != NONE or last_state != NONE):
+                    names.append(self._read(last_turn if last_turn != NONE else last_state)[2][0])
+            return sorted(names)
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_reader()
+            if self._index is not None:
+                self._index.flush()
+                self._index.close()
+                self._index_file.close()
+                self._index = None
+            self._log.close()
+
+    def __enter__(self) -> "SessionStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def restore_history(history: Any, saved: Optional[SavedSession]) -> None:
+    # Replays saved messages through a HistoryStore so pinning, the token
+    # window and the rolling summary come out as if the turns just happened.
+    for message in saved.messages if saved else []:
+        history.append(message)
+
+
+def session_store_from_env() -> SessionStore:
+    # AGENT_SESSION_STORE is the path prefix of the .log/.idx pair.
+    return SessionStore(os.getenv("AGENT_SESSION_STORE", "agent_sessions"))
@@ -0,0 +1,126 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional
+
+from common.router import IntentRouter
+
+Message = dict
+
+ROUTE_INSTRUCTIONS = ("Route the user's latest message to the one specialist that should answer it by calling "
+                      "its handoff function. Do not answer the message yourself.")
+
+
+async def pick_handoff(model: Any, instructions: str, messages: List[Message], handoffs: List[Any]) -> tuple:
+    # One model call with only the handoff tools: (the agent it hands off
+    # to or None, the raw ModelResponse).
+    from agents import ModelSettings
+    from agents.models.interface import ModelTracing
+
+    response = await model.get_response(instructions, messages, ModelSettings(temperature=0), [], None, handoffs,
+                                        ModelTracing.DISABLED, previous_response_id=None, prompt=None)
+    targets = {h.tool_name: h.agent_name for h in handoffs}
+    for item in response.output:
+        if getattr(item, "type", None) == "function_call" and item.name in targets:
+            return targets[item.name], response
+    return None, response
+
+
+# === Speculative Triage ===
+# A triage agent with a multi-kilobyte prompt costs a full model round trip
+# before the specialist even starts. Instead, each turn goes to a predicted
+# specialist (the current sticky agent, or the keyword router's best guess)
+# while a trimmed triage call - one line of instructions, the handoff tools
+# and only the last few messages - checks the choice at the same time:
+#   - confident keyword match: the specialist runs alone, as before
+#   - triage agrees (or doesn't pick anyone): the speculative answer is kept,
+#     so the turn costs one round trip
+#   - triage picks someone else: the speculative run is cancelled and that
+#     specialist answers instead
+#   - no prediction at all: the full triage agent runs as before
+class Speculator:
+    def __init__(self, triage: Any, router: IntentRouter, agents: Mapping[str, Any],
+                 run: Optional[Callable[..., Awaitable[Any]]] = None, context_messages: int = 2):
+        self.triage = triage
+        self.router = router
+        self.agents = agents
+        self._run = run
+        self.context_messages = context_messages
+        self._handoffs: Optional[List[Any]] = None
+        self.stats = {"turns": 0, "direct": 0, "triage": 0, "speculated": 0, "hits": 0, "misses": 0,
+                      "unconfirmed": 0, "route_errors": 0, "saved_seconds": 0.0}
+
+    def predict(self, current: Any, text: str) -> Optional[Any]:
+        if current is not self.triage:
+            return current
+        return self.agents.get(self.router.route(text).target)
+
+    def handoffs(self) -> List[Any]:
+        if self._handoffs is None:
+            from agents import Handoff, handoff
+
+            self._handoffs = [h if isinstance(h, Handoff) else handoff(h) for h in self.triage.handoffs]
+        return self._handoffs
+
+    async def route(self, messages: List[Message], config: Any, hooks: Any = None) -> Optional[str]:
+        # The specialist the trimmed triage call hands off to, or None if it
+        # answered on its own. The call runs outside Runner.run, so its time
+        # and tokens are reported to the turn's hooks directly.
+        start = time.perf_counter()
+        choice, response = await pick_handoff(config.model, ROUTE_INSTRUCTIONS, messages[-self.context_messages:],
+                                              self.handoffs())
+        on_triage = getattr(hooks, "on_triage", None)
+        if on_triage is not None:
+            on_triage(response, time.perf_counter() - start)
+        return choice
+
+    async def run(self, current: Any, messages: List[Message], text: str, run_config: Any, **kwargs) -> Any:
+        # Answers one turn; the result's last_agent is the specialist that
+        # answered, so the caller can make it the sticky agent.
+        if self._run is None:
+            from agents import Runner
+
+            self._run = Runner.run
+        self.stats["turns"] += 1
+        confident = self.agents.get(self.router.confident(text))
+        if confident is not None:
+            self.stats["direct"] += 1
+            return await self._run(confident, messages, run_config=run_config, **kwargs)
+        predicted = self.predict(current, text)
+        if predicted is None:
+            self.stats["triage"] += 1
+            return await self._run(self.triage, messages, run_config=run_config, **kwargs)
+
+        self.stats["speculated"] += 1
+        start = time.perf_counter()
+        answer = asyncio.ensure_future(self._timed(self._run(predicted, messages, run_config=run_config, **kwargs)))
+        answer.add_done_callback(lambda task: task.cancelled() or task.exception())
+        try:
+            choice, routed = await self._timed(self.route(messages, run_config, kwargs.get("hooks")))
+        except asyncio.CancelledError:
+            answer.cancel()
+            raise
+        except Exception:
+            self.stats["route_errors"] += 1
+            choice, routed = None, 0.0
+
+        if choice is None or choice == predicted.name:
+            self.stats["hits" if choice else "unconfirmed"] += 1
+            result, answered = await answer
+            if current is self.triage:
+                # Versus triage then specialist, one after the other.
+                self.stats["saved_seconds"] += max(0.0, routed + answered - (time.perf_counter() - start))
+            return result
+
+        self.stats["misses"] += 1
+        answer.cancel()
+        return await self._run(self.agents[choice], messages, run_config=run_config, **kwargs)
+
+    @staticmethod
+    async def _timed(awaitable: Awaitable[Any]) -> tuple:
+        start = time.perf_counter()
+        return await awaitable, time.perf_counter() - start
+
+    def summary(self) -> Dict[str, Any]:
+        checked = self.stats["hits"] + self.stats["misses"]
+        return {**self.stats, "accuracy": round(self.stats["hits"] / checked, 3) if checked else None,
+                "saved_seconds": round(self.stats["saved_seconds"], 3)}
@@ -0,0 +1,107 @@
+import time
+import asyncio
+from typing import Any, Callable, List, Optional
+
+from colorama import Fore, Style
+
+Message = dict
+
+
+# === Streaming Turn ===
+# Runs a turn with Runner.run_streamed and renders text deltas as they
+# arrive, in the same colours the CLIs use for whole replies. A handoff shows
+# up mid-stream as a switch notice followed by the new agent's header. The
+# finished result is returned so callers can record final_output in history.
+class StreamPrinter:
+    def __init__(self, prefix: str = "", write: Optional[Callable[[str], Any]] = None):
+        self.prefix = prefix
+        self._write = write
+        self.agent_name: Optional[str] = None
+        self.first_token_at: Optional[float] = None
+        self.handoffs: List[str] = []
+
+    def write(self, text: str) -> None:
+        if self._write is not None:
+            self._write(text)
+        else:
+            print(text, end="", flush=True)
+
+    def header(self, agent_name: str) -> None:
+        if self.agent_name is not None:
+            self.write("\n")
+        self.agent_name = agent_name
+        self.write(Fore.BLUE + f"{self.prefix}🤖 {agent_name}: " + Style.RESET_ALL)
+
+    def switch(self, agent_name: str) -> None:
+        self.handoffs.append(agent_name)
+        self.write(("\n" if self.agent_name else "") + Fore.LIGHTYELLOW_EX + f"{self.prefix}🔁 Handing off to {agent_name}..." + Style.RESET_ALL)
+        self.agent_name = None
+
+    def delta(self, agent_name: str, text: str) -> None:
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        if self.agent_name != agent_name:
+            self.header(agent_name)
+        self.write(text)
+
+    def finish(self) -> None:
+        if self.agent_name is not None:
+            self.write("\n")
+
+
+def _complete_on_crash(result: Any) -> None:
+    # The SDK only marks a streamed run complete for errors raised inside a
+    # model turn. One raised before it (an agent with a malformed tool list,
+    # say) leaves stream_events() waiting forever, so post the completion
+    # marker ourselves; stream_events() then raises the run's exception.
+    from agents._run_impl import QueueCompleteSentinel
+
+    task = getattr(result, "_run_impl_task", None)
+
+    def finished(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            result._event_queue.put_nowait(QueueCompleteSentinel())
+
+    if task is not None:
+        task.add_done_callback(finished)
+
+
+async def stream_turn(agent: Any, messages: List[Message], run_config: Any, cache: Any = None,
+                      printer: Optional[StreamPrinter] = None, hooks: Any = None) -> Any:
+    from agents import Runner
+
+    printer = printer or StreamPrinter()
+    key = None
+    if cache is not None:
+        key, hit = cache.lookup(agent, messages)
+        if hit is not None:
+            printer.delta(hit.last_agent.name, hit.final_output)
+            printer.finish()
+            return hit
+
+    start = time.perf_counter()
+    result = Runner.run_streamed(agent, messages, run_config=run_config, hooks=hooks)
+    _complete_on_crash(result)
+    on_first_token = getattr(hooks, "on_first_token", None)
+    current = agent.name
+    try:
+        async for event in result.stream_events():
+            if event.type == "agent_updated_stream_event":
+                if event.new_agent.name != current:
+                    current = event.new_agent.name
+                    printer.switch(current)
+            elif event.type == "raw_response_event":
+                text = getattr(event.data, "delta", None)
+                if getattr(event.data, "type", "") == "response.output_text.delta" and text:
+                    if on_first_token is not None and printer.first_token_at is None:
+                        on_first_token()
+                    printer.delta(current, text)
+    except asyncio.CancelledError:
+        result.cancel()
+        raise
+    finally:
+        printer.finish()
+
+    if cache is not None:
+        cache.store(key, result, time.perf_counter() - start)
+    return result
@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import asyncio
+import inspect
+import functools
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+# === Tool Memo ===
+# Remembers the results of a pure tool by its arguments for ttl seconds.
+# Identical calls that arrive while the first is still running wait for it
+# instead of running the tool again. Failures are never remembered.
+class ToolMemo:
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return False, None
+            if item[0] < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, item[1]
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def call(self, key: str, run: Callable[[], Awaitable[Any]], stats: Dict[str, int]) -> Any:
+        hit, value = self.get(key)
+        if hit:
+            stats["cache_hits"] += 1
+            return value
+        task = self._inflight.get(key)
+        if task is None:
+            # Shielded, so a cancelled caller doesn't cancel it for the others.
+            task = asyncio.ensure_future(run())
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._finished, key))
+        else:
+            stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Future) -> None:
+        del self._inflight[key]
+        if not task.cancelled() and task.exception() is None:
+            self.put(key, task.result())
+
+
+# === Tool Executor ===
+# The Agents SDK calls a sync tool straight on the event loop, so a slow tool
+# stalls every other session. Here sync tools run in a bounded thread pool
+# (with the caller's context variables) and async tools are awaited as they
+# are. The SDK already runs all tool calls from one model response together,
+# so once no tool blocks the loop, a turn that needs two tools waits for the
+# slower one rather than both in turn.
+class ToolExecutor:
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "offloaded": 0, "cache_hits": 0, "coalesced": 0, "errors": 0}
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="agent-tool")
+        return self._pool
+
+    async def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if inspect.iscoroutinefunction(func):
+            return await func(*args, **kwargs)
+        self.stats["offloaded"] += 1
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self.pool, context.run, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_executor: Optional[ToolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def tool_executor_from_env() -> ToolExecutor:
+    # One pool per process, shared by every app in it; AGENT_TOOL_WORKERS sizes it.
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ToolExecutor(int(os.getenv("AGENT_TOOL_WORKERS", 8)))
+        return _executor
+
+
+def tool(func: Callable[..., Any], ttl: Optional[float] = None, name: Optional[str] = None,
+         description: Optional[str] = None, executor: Optional[ToolExecutor] = None,
+         max_entries: int = 1024) -> Any:
+    # Turns a plain function into an SDK FunctionTool that runs through the
+    # executor. ttl memoizes results per argument set and is only meant for
+    # pure tools such as lookups. The function itself is left unchanged, so
+    # apps can keep calling it directly.
+    from agents import FunctionTool
+    from agents.function_schema import function_schema
+    from agents.tool import default_tool_error_function
+
+    schema = function_schema(func, name_override=name, description_override=description)
+    memo = ToolMemo(ttl, max_entries) if ttl else None
+    if memo and schema.takes_context:
+        raise ValueError(f"Tool {schema.name} takes the run context, so its results cannot be memoized")
+
+    async def invoke(ctx: Any, arguments: str) -> Any:
+        runner = executor or tool_executor_from_env()
+        runner.stats["calls"] += 1
+        try:
+            data = json.loads(arguments) if arguments else {}
+            args, kwargs = schema.to_call_args(schema.params_pydantic_model(**data))
+            if schema.takes_context:
+                args = (ctx, *args)
+            if memo is None:
+                return await runner.call(func, *args, **kwargs)
+            key = json.dumps(data, sort_keys=True)
+            return await memo.call(key, lambda: runner.call(func, *args, **kwargs), runner.stats)
+        except Exception as e:
+            # Like the SDK's own tools: the model sees the error and can retry.
+            runner.stats["errors"] += 1
+            return default_tool_error_function(ctx, e)
+
+    return FunctionTool(name=schema.name, description=schema.description or "",
+                        params_json_schema=schema.params_json_schema, on_invoke_tool=invoke,
+                        strict_json_schema=schema.strict_json_schema)
@@ -0,0 +1,130 @@
+import sys
+import json
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List
+
+from common.apps import load_app
+from common.history import estimate_tokens
+from common.prompts import compile_prompt
+from common.speculate import pick_handoff
+
+CASES = Path(__file__).resolve().parent / "routing_cases.json"
+
+# === Prompt Check ===
+# Compiles each app's orchestrator prompt (common/prompts.py), reports the
+# bytes and estimated tokens saved, and checks that the compact form still
+# names every specialist and handoff function. With --model it also replays
+# routing_cases.json through the orchestrator twice per case, with the
+# original and the compact instructions. Each replay is one model call with
+# only the handoff tools. It compares the routing, the input tokens the
+# provider reports and the latency:
+#   python prompt_check.py
+#   GEMINI_API_KEY=... python prompt_check.py --model --json prompts.json
+# Exits 1 if a check fails or the compact prompt routes fewer cases right.
+
+ORCHESTRATORS = {  # app: (graph attribute, instructions constant, agent name)
+    "travel": ("TravelAgent", "TravelAgent_Instruction", "TravelAgent"),
+    "career": ("career_agent", "Career_Agent_Instrucution", "CareerAgent"),
+    "game_master": ("GameMasterAgent", "Game_Master_Agent_Instructions", "GameMasterAgent"),
+}
+
+
+async def replay(model: Any, instructions: str, handoffs: List[Any], cases: List[Dict[str, str]]) -> Dict[str, Any]:
+    picks, tokens, seconds = [], 0, 0.0
+    for case in cases:
+        start = time.perf_counter()
+        choice, response = await pick_handoff(model, instructions, [{"role": "user", "content": case["message"]}],
+                                              handoffs)
+        seconds += time.perf_counter() - start
+        tokens += getattr(response.usage, "input_tokens", 0) or 0
+        picks.append(choice)
+    return {"picks": picks, "correct": sum(p == c["agent"] for p, c in zip(picks, cases)),
+            "input_tokens": tokens / len(cases), "seconds": seconds / len(cases)}
+
+
+async def check(name: str, cases: List[Dict[str, str]], use_model: bool) -> Dict[str, Any]:
+    app = load_app(name)
+    attribute, constant, agent_name = ORCHESTRATORS[name]
+    agent = getattr(app.graph, attribute)
+    original = getattr(app, constant)
+    compact = compile_prompt(agent_name, original)
+    handoffs = list(agent.handoffs)
+    names = [n for h in handoffs for n in (h.tool_name, h.agent_name)]
+    failures = [f"compact prompt no longer mentions {n}" for n in names if n in original and n not in compact]
+    result = {"app": name, "agent": agent_name, "bytes_before": len(original.encode()),
+              "bytes_after": len(compact.encode()), "tokens_before": estimate_tokens(original),
+              "tokens_after": estimate_tokens(compact), "failures": failures}
+
+    if use_model:
+        from common.provider import get_config
+
+        model = get_config(app.MODEL_NAME).model
+        result["original"] = await replay(model, original, handoffs, cases)
+        result["compact"] = await replay(model, compact, handoffs, cases)
+        result["changed"] = [
+            {"message": case["message"], "expected": case["agent"], "original": before, "compact": after}
+            for case, before, after in zip(cases, result["original"]["picks"], result["compact"]["picks"])
+            if before != after]
+        if result["compact"]["correct"] < result["original"]["correct"]:
+            failures.append(f"compact prompt routed {result['compact']['correct']}/{len(cases)} cases right, "
+                            f"original {result['original']['correct']}/{len(cases)}")
+    return result
+
+
+def format_result(result: Dict[str, Any], cases: int) -> str:
+    status = "❌" if result["failures"] else "✅"
+    before, after = result["bytes_before"], result["bytes_after"]
+    lines = [f"{status} {result['app']:<12} {result['agent']:<16} {before:6,} -> {after:6,} bytes  "
+             f"~{result['tokens_before']:5,} -> {result['tokens_after']:5,} tokens  ({1 - after / before:.0%} smaller)"]
+    if "compact" in result:
+        old, new = result["original"], result["compact"]
+        lines.append(f"     routing {old['correct']}/{cases} -> {new['correct']}/{cases} correct  "
+                     f"input tokens {old['input_tokens']:.0f} -> {new['input_tokens']:.0f} per call  "
+                     f"latency {old['seconds'] * 1000:.0f}ms -> {new['seconds'] * 1000:.0f}ms")
+        lines.extend(f"     changed: {c['message']!r} {c['original']} -> {c['compact']} (expected {c['expected']})"
+                     for c in result["changed"])
+    lines.extend(f"     {failure}" for failure in result["failures"])
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check the compact orchestrator prompts for size and routing")
+    parser.add_argument("--only", nargs="+", choices=list(ORCHESTRATORS), help="Apps to check")
+    parser.add_argument("--model", action="store_true",
+                        help="Replay the routing regression set against the model (needs GEMINI_API_KEY)")
+    parser.add_argument("--cases", default=str(CASES), help="Routing regression set (JSON)")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON to PATH")
+    return parser.parse_args(argv)
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    with open(args.cases, encoding="utf-8") as f:
+        cases = json.load(f)
+    results = []
+    try:
+        for name in args.only or ORCHESTRATORS:
+            result = await check(name, cases[name], args.model)
+            print(format_result(result, len(cases[name])), flush=True)
+            results.append(result)
+    finally:
+        if args.model:
+            from common import provider
+
+            await provider.aclose()
+    return results
+
+
+def main():
+    args = parse_args()
+    results = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if any(result["failures"] for result in results) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+from benchmark import SCRIPTS, format_seconds, session_factory
+from common.apps import load_app
+
+# === Transcript Replay ===
+# Plays full conversation transcripts through the apps with every model call
+# going through a cassette (common/cassette.py). Record once against the
+# model (or, with --fake, the local fake server), then replay with no network:
+#   python replay.py record --cassette runs.cas
+#   python replay.py replay --cassette runs.cas
+#   python replay.py replay --cassette runs.cas --sessions 200
+# Transcripts are JSON, {"app": [["message", ...], ...]}, one list per
+# conversation; without --transcripts the benchmark scripts are played.
+# Recording writes every reply to <cassette>.replies.json; a replay must
+# reproduce them byte for byte and exits 1 if any reply differs.
+
+
+class GameTranscript:
+    # A seeded campaign, so dice and events (and so the tool outputs sent
+    # back to the model) come out the same on every run.
+    def __init__(self, app: Any, config: Any, name: str):
+        self.campaign = app.Campaign(name, config, seed=f"replay/{name}")
+
+    async def turn(self, message: str) -> str:
+        return "\n".join(text for _, text in await self.campaign.play(message))
+
+
+class ChatTranscript:
+    def __init__(self, session: Any):
+        self.session = session
+
+    async def turn(self, message: str) -> str:
+        await self.session.turn(message)
+        return self.session.history.window()[-1]["content"]
+
+
+def transcript_factory(name: str):
+    if name == "game_master":
+        from common.provider import get_config
+
+        app = load_app(name)
+        return lambda i: GameTranscript(app, get_config(app.MODEL_NAME), f"party-{i}")
+    make_session = session_factory(name)
+    return lambda i: ChatTranscript(make_session(i))
+
+
+async def play(transcripts: Dict[str, List[List[str]]], sessions: int, concurrency: int) -> Dict[str, Any]:
+    # Each conversation is played `sessions` times, every play as its own
+    # session. Replies are keyed "app/conversation/play".
+    jobs = [(name, c, n, conversation) for n in range(sessions)
+            for name, conversations in transcripts.items() for c, conversation in enumerate(conversations)]
+    factories = {name: transcript_factory(name) for name in transcripts}
+    replies: Dict[str, List[str]] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    for make in factories.values():
+        make(0)  # build the agents (and import the SDK) before the clock starts
+
+    async def run(name: str, c: int, n: int, conversation: List[str]) -> None:
+        async with semaphore:
+            transcript = factories[name](c)
+            replies[f"{name}/{c}/{n}"] = [await transcript.turn(message) for message in conversation]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(*job) for job in jobs))
+    elapsed = time.perf_counter() - start
+    return {"replies": {f"{name}/{c}/{n}": replies[f"{name}/{c}/{n}"] for name, c, n, _ in jobs},
+            "turns": sum(len(conversation) for *_, conversation in jobs), "seconds": elapsed}
+
+
+def digest(replies: Dict[str, List[str]]) -> str:
+    return hashlib.sha256(json.dumps(replies, sort_keys=True, ensure_ascii=False).encode()).hexdigest()[:16]
+
+
+def compare(recorded: Dict[str, List[str]], replayed: Dict[str, List[str]]) -> List[str]:
+    # Every play of a conversation must match its first recorded play.
+    return [key for key, replies in replayed.items()
+            if recorded.get(key.rsplit("/", 1)[0] + "/0") != replies]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Record conversation transcripts to a cassette or replay them offline")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--cassette", default="agent_cassette.cas", help="Cassette file")
+    parser.add_argument("--transcripts", help="Transcripts JSON (default: the benchmark scripts)")
+    parser.add_argument("--only", nargs="+", choices=list(SCRIPTS), help="Apps to play")
+    parser.add_argument("--sessions", type=int, default=1, help="Times each conversation is played")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Conversations played at once (more than 1 makes recordings order-dependent)")
+    parser.add_argument("--fake", action="store_true", help="Record against the local fake model server")
+    return parser.parse_args(argv)
+
+
+async def main_async(args, transcripts: Dict[str, List[List[str]]]) -> Dict[str, Any]:
+    from common import provider
+
+    server = None
+    if args.fake:
+        from common.fake_server import FakeLLMServer
+
+        server = FakeLLMServer().start()
+        os.environ["GEMINI_BASE_URL"] = server.base_url
+        os.environ["GEMINI_API_KEY"] = "fake"
+    try:
+        result = await play(transcripts, args.sessions, args.concurrency)
+        result["cassette"] = provider.get_cassette().summary()
+    finally:
+        await provider.aclose()
+        if server is not None:
+            server.shutdown()
+    return result
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    os.environ["AGENT_CASSETTE"] = args.cassette
+    os.environ["AGENT_CASSETTE_MODE"] = args.mode
+    os.environ.setdefault("AGENT_CACHE", "off")
+    if args.mode == "record" and os.path.exists(args.cassette):
+        os.remove(args.cassette)
+    if args.transcripts:
+        with open(args.transcripts, encoding="utf-8") as f:
+            transcripts = json.load(f)
+    else:
+        transcripts = {name: [script] for name, script in SCRIPTS.items()}
+    transcripts = {name: c for name, c in transcripts.items() if not args.only or name in args.only}
+
+    from common.cassette import format_cassette
+
+    result = asyncio.run(main_async(args, transcripts))
+    replies = result["replies"]
+    print(f"{args.mode}: {result['turns']} turns in {format_seconds(result['seconds'])} "
+          f"({format_seconds(result['seconds'] / max(result['turns'], 1))}/turn)  digest {digest(replies)}")
+    print(f"📼 {format_cassette(result['cassette'])}")
+
+    golden = f"{args.cassette}.replies.json"
+    if args.mode == "record":
+        with open(golden, "w", encoding="utf-8") as f:
+            json.dump(replies, f, indent=2, ensure_ascii=False)
+        return 0
+    with open(golden, encoding="utf-8") as f:
+        differences = compare(json.load(f), replies)
+    if differences:
+        print(f"❌ Replies differ from the recording: {', '.join(differences)}")
+        return 1
+    print(f"✅ All {len(replies)} conversations match the recording.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import sys
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+from common.serving import SessionInboxes
+
+# === Serving Check ===
+# Drives the session inboxes (common/serving.py) with a stand-in turn and
+# connections, no model needed: a client that disconnects mid-turn, or a turn
+# that raises, must not wedge the session or leave replies pending, and at
+# the session limit quiet sessions must make way for new ones:
+#   python serving_check.py
+# Exits 1 if a check fails.
+
+
+class Client:
+    def __init__(self, connected: bool = True):
+        self.connected = connected
+        self.replies: List[Dict[str, Any]] = []
+
+    async def send(self, payload: Dict[str, Any]) -> None:
+        if not self.connected:
+            raise ConnectionResetError("client went away")
+        self.replies.append(payload)
+
+
+async def turn(session: Any, message: str, queued_at: float) -> Dict[str, Any]:
+    await asyncio.sleep(0.01)
+    if message == "fail":
+        raise OSError("disk full")
+    return {"session": session.key, "reply": message}
+
+
+async def settle(inboxes: SessionInboxes) -> bool:
+    try:
+        await asyncio.wait_for(inboxes.wait_idle(), 2)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+async def disconnect() -> List[str]:
+    inboxes = SessionInboxes(lambda key: None, turn)
+    gone, back = Client(connected=False), Client()
+    inboxes.submit("s", "hello", gone)
+    inboxes.submit("s", "again", back)
+    failures = []
+    if not await settle(inboxes):
+        failures.append(f"{inboxes.pending} replies still pending after the client disconnected")
+    if back.replies != [{"session": "s", "reply": "again"}]:
+        failures.append(f"the next message got {back.replies} instead of its reply")
+    await inboxes.shutdown()
+    return failures
+
+
+async def failed_turn() -> List[str]:
+    inboxes = SessionInboxes(lambda key: None, turn)
+    client = Client()
+    inboxes.submit("s", "fail", client)
+    inboxes.submit("s", "again", client)
+    failures = []
+    if not await settle(inboxes):
+        failures.append(f"{inboxes.pending} replies still pending after a turn raised")
+    if [reply.get("error", reply.get("reply")) for reply in client.replies] != ["Turn failed: disk full", "again"]:
+        failures.append(f"got {client.replies} instead of an error then the next reply")
+    await inboxes.shutdown()
+    return failures
+
+
+async def idle_eviction() -> List[str]:
+    inboxes = SessionInboxes(lambda key: None, turn, max_sessions=2, idle_timeout=0.05)
+    client = Client()
+    failures = []
+    inboxes.submit("quiet", "hello", client)
+    await settle(inboxes)
+    inboxes.submit("busy", "hello", client)
+    if inboxes.submit("new", "hello", client) is None:
+        failures.append("a new session got in before the others went quiet")
+    await asyncio.sleep(0.1)
+    inboxes.submit("busy", "again", client)
+    if (rejected := inboxes.submit("new", "hello", client)) is not None:
+        failures.append(f"a new session was turned away with a quiet one open: {rejected}")
+    if set(inboxes.sessions) != {"busy", "new"}:
+        failures.append(f"open sessions are {sorted(inboxes.sessions)}, expected busy and new")
+    await settle(inboxes)
+    await inboxes.shutdown()
+    return failures
+
+
+CHECKS = {"disconnect mid-turn": disconnect, "turn raises": failed_turn, "idle eviction": idle_eviction}
+
+
+def main() -> int:
+    failed = False
+    for name, check in CHECKS.items():
+        failures = asyncio.run(check())
+        print(f"{'❌' if failures else '✅'} {name}")
+        for failure in failures:
+            print(f"     {failure}")
+        failed = failed or bool(failures)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from common.apps import APPS
+
+# === Startup Budget ===
+# The CLIs are spawned once per user connection, so cold start is user
+# latency. For each app this measures, in fresh interpreters:
+#   import - `python -X importtime -c "import main"`: the app module's own
+#            import time and any heavy module it pulls in (the Agents SDK,
+#            OpenAI client and NumPy must only load on first use)
+#   exit   - wall time of `python main.py` answering "exit" at the first prompt
+# Each figure is the best of --repeat runs, so a busy machine doesn't fail
+# the check. Exits 1 if any app is over budget:
+#   python startup_check.py
+#   python startup_check.py --json startup.json
+
+BUDGETS: Dict[str, Dict[str, float]] = {  # milliseconds
+    "travel": {"import_ms": 250, "exit_ms": 600},
+    "career": {"import_ms": 250, "exit_ms": 600},
+    "game_master": {"import_ms": 250, "exit_ms": 600},
+    "class01": {"import_ms": 150},
+}
+
+HEAVY_MODULES = ("agents", "openai", "httpx", "pydantic", "numpy")
+
+
+def parse_importtime(stderr: str) -> Tuple[Optional[float], List[Tuple[str, float]], set]:
+    # Returns the cumulative ms of the "main" import, its heaviest direct
+    # imports, and every module name that was imported.
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        rows.append((len(name) - len(name.lstrip()), name.strip(), int(cumulative_us) / 1000))
+    modules = {name for _, name, _ in rows}
+    main_ms = None
+    children = []
+    # importtime prints children before their parent, one level deeper.
+    for i, (depth, name, ms) in enumerate(rows):
+        if name == "main":
+            main_ms = ms
+            j = i - 1
+            while j >= 0 and rows[j][0] > depth:
+                if rows[j][0] == depth + 2:
+                    children.append((rows[j][1], rows[j][2]))
+                j -= 1
+    children.sort(key=lambda child: -child[1])
+    return main_ms, children[:5], modules
+
+
+def measure_import(path: Path) -> Dict[str, Any]:
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=path.parent,
+                          capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(f"importing {path} failed:\n{proc.stderr[-2000:]}")
+    main_ms, heaviest, modules = parse_importtime(proc.stderr)
+    return {"import_ms": main_ms, "heaviest": heaviest,
+            "heavy_modules": sorted(m for m in HEAVY_MODULES if m in modules)}
+
+
+def measure_exit(path: Path) -> float:
+    env = {**os.environ, "PYTHONIOENCODING": "utf-8"}
+    start = time.perf_counter()
+    subprocess.run([sys.executable, path.name], cwd=path.parent, input="exit\n", capture_output=True,
+                   text=True, env=env, timeout=60)
+    return (time.perf_counter() - start) * 1000
+
+
+def check(name: str, repeat: int) -> Dict[str, Any]:
+    path = APPS[name]
+    budget = BUDGETS[name]
+    runs = [measure_import(path) for _ in range(repeat)]
+    result = min(runs, key=lambda run: run["import_ms"])
+    if "exit_ms" in budget:
+        result["exit_ms"] = min(measure_exit(path) for _ in range(repeat))
+    failures = [f"{key} {result[key]:.0f}ms > {limit:.0f}ms" for key, limit in budget.items() if result[key] > limit]
+    if result["heavy_modules"]:
+        failures.append(f"imports {', '.join(result['heavy_modules'])} at startup")
+    result.update(app=name, budget=budget, failures=failures)
+    return result
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    status = "❌" if result["failures"] else "✅"
+    parts = [f"import {result['import_ms']:6.1f}ms / {result['budget']['import_ms']:.0f}"]
+    if "exit_ms" in result:
+        parts.append(f"exit {result['exit_ms']:6.1f}ms / {result['budget']['exit_ms']:.0f}")
+    lines = [f"{status} {result['app']:<12} " + "  ".join(parts)]
+    lines.append("     heaviest: " + ", ".join(f"{name} {ms:.1f}ms" for name, ms in result["heaviest"]))
+    lines.extend(f"     over budget: {failure}" for failure in result["failures"])
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check each agent CLI's cold start against its budget")
+    parser.add_argument("--only", nargs="+", choices=list(BUDGETS), help="Apps to check")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the best one counts")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON to PATH")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    results = [check(name, args.repeat) for name in args.only or BUDGETS]
+    for result in results:
+        print(format_result(result))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if any(result["failures"] for result in results) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import datetime
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent / "Big Agents"))
+from benchmark import SCRIPTS, format_seconds
+from common.apps import APPS
+from common.fake_server import FakeLLMServer
+from common.metrics import Histogram
+
+# === Host Benchmark ===
+# Plays the same scripted sessions against the apps deployed two ways, both
+# backed by the local fake model server:
+#   separate - one host.py process per app, as if each app were its own deployment
+#   shared   - one host.py process serving every app
+# It reports the total RSS of the host processes, requests per second and
+# reply latency:
+#   python bench.py
+#   python bench.py --sessions 50 --latency 0.2 --json host_bench.json
+
+DEADLINE = (datetime.date.today() + datetime.timedelta(days=365)).isoformat()
+HOST_SCRIPTS = {**SCRIPTS, "study": [f"Python, SQL, Statistics | {DEADLINE}", f"Linear algebra, Calculus | {DEADLINE}"]}
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def start_host(apps: List[str], port: int, env: Dict[str, str]) -> subprocess.Popen:
+    proc = subprocess.Popen([sys.executable, str(HERE / "host.py"), "--port", str(port), "--apps", *apps],
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return proc
+        except OSError:
+            if proc.poll() is not None or time.monotonic() > deadline:
+                proc.kill()
+                raise RuntimeError(f"host for {', '.join(apps)} did not start")
+            await asyncio.sleep(0.05)
+
+
+async def play(app: str, session: str, port: int, histogram: Histogram, errors: List[int]) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for message in HOST_SCRIPTS[app]:
+            start = time.perf_counter()
+            writer.write((json.dumps({"app": app, "session": session, "message": message}) + "\n").encode())
+            await writer.drain()
+            reply = json.loads(await reader.readline())
+            if "error" in reply:
+                errors[0] += 1
+                continue
+            histogram.record(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def run_mode(mode: str, apps: List[str], sessions: int, base_port: int, env: Dict[str, str]) -> Dict[str, Any]:
+    groups = [[app] for app in apps] if mode == "separate" else [apps]
+    procs = [await start_host(group, base_port + i, env) for i, group in enumerate(groups)]
+    ports = {app: base_port + i for i, group in enumerate(groups) for app in group}
+    histogram = Histogram(1e6)
+    errors = [0]
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(play(app, f"{app}-{i}", ports[app], histogram, errors)
+                               for app in apps for i in range(sessions)))
+        elapsed = time.perf_counter() - start
+        rss = sum(rss_mb(proc.pid) for proc in procs)
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait()
+    summary = histogram.summary()
+    return {"mode": mode, "processes": len(procs), "rss_mb": rss, "requests": histogram.count, "errors": errors[0],
+            "requests_per_second": histogram.count / elapsed, "p50": summary["p50"], "p95": summary["p95"],
+            "seconds": elapsed}
+
+
+def format_row(result: Dict[str, Any]) -> str:
+    errors = f"  errors {result['errors']}" if result["errors"] else ""
+    return (f"{result['mode']:<9} {result['processes']} process(es)  rss {result['rss_mb']:7.1f}MB  "
+            f"{result['requests_per_second']:8.1f} req/s  p50 {format_seconds(result['p50'])}  "
+            f"p95 {format_seconds(result['p95'])}{errors}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare one shared agent host with one process per app")
+    parser.add_argument("--apps", nargs="+", choices=list(APPS), default=list(APPS), help="Apps to load")
+    parser.add_argument("--sessions", type=int, default=20, help="Scripted sessions per app, all run at once")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake model seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="Fake model seconds per token")
+    parser.add_argument("--port", type=int, default=8800, help="First port used by the host processes")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON to PATH")
+    return parser.parse_args(argv)
+
+
+async def main_async(args) -> List[Dict[str, Any]]:
+    server = FakeLLMServer(latency=args.latency, token_delay=args.token_delay).start()
+    env = {**os.environ, "GEMINI_BASE_URL": server.base_url, "GEMINI_API_KEY": "benchmark"}
+    results = []
+    try:
+        for mode in ("separate", "shared"):
+            results.append(await run_mode(mode, args.apps, args.sessions, args.port, env))
+            print(format_row(results[-1]), flush=True)
+    finally:
+        server.shutdown()
+    return results
+
+
+def main():
+    args = parse_args()
+    results = asyncio.run(main_async(args))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
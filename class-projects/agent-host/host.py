@@ -0,0 +1,353 @@
+import sys
+import json
+import time
+import asyncio
+import argparse
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Big Agents"))
+from common.apps import APPS, load_app
+from common.cache import cache_from_env
+from common.history import HistoryStore
+from common.metrics import metrics_from_env
+from common.serving import Connection, Session, SessionInboxes, listen
+from common.tools import tool_executor_from_env
+
+# === Protocol ===
+# One JSON object per line in each direction, like the Career Mentor server,
+# with an "app" naming which agent app answers:
+#   -> {"app": "travel", "session": "alice", "message": "Where should I go in December?"}
+#   <- {"app": "travel", "session": "alice", "agent": "DestinationAgent", "switched": true, "reply": "..."}
+#   -> {"app": "study", "session": "bob", "message": "Python, SQL | 2030-01-31"}
+#   -> {"app": "travel", "session": "alice", "type": "close"}   ends the conversation
+#   -> {"type": "apps"}                                          the hosted apps
+#   -> {"type": "stats"}                                         per-app counters, cache and latency
+# Errors come back as {"app": ..., "session": ..., "error": "..."}.
+
+
+# === Fair Worker Pools ===
+# Each app may run up to its own number of turns at once, and all apps
+# share `total` slots. When a slot frees up, the apps with waiting turns take
+# it in round-robin order. A burst on one app then queues behind that app's
+# own pool instead of starving the others.
+class FairSlots:
+    def __init__(self, total: int, workers: Dict[str, int]):
+        self.free = total
+        self.workers = workers
+        self.running = dict.fromkeys(workers, 0)
+        self.waiting: Dict[str, Deque[asyncio.Future]] = {app: deque() for app in workers}
+        self._order = deque(workers)
+
+    async def acquire(self, app: str) -> None:
+        if self.free > 0 and self.running[app] < self.workers[app] and not self.waiting[app]:
+            self._take(app)
+            return
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[app].append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted just before the cancellation landed: hand the slot on.
+            if future.done() and not future.cancelled():
+                self.release(app)
+            raise
+
+    def release(self, app: str) -> None:
+        self.free += 1
+        self.running[app] -= 1
+        self._grant()
+
+    def _take(self, app: str) -> None:
+        self.free -= 1
+        self.running[app] += 1
+
+    def _grant(self) -> None:
+        while self.free > 0:
+            for _ in range(len(self._order)):
+                app = self._order[0]
+                self._order.rotate(-1)
+                queue = self.waiting[app]
+                while queue and queue[0].done():  # cancelled while waiting
+                    queue.popleft()
+                if queue and self.running[app] < self.workers[app]:
+                    self._take(app)
+                    queue.popleft().set_result(None)
+                    break
+            else:
+                return
+
+    @asynccontextmanager
+    async def slot(self, app: str) -> AsyncIterator[None]:
+        await self.acquire(app)
+        try:
+            yield
+        finally:
+            self.release(app)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"free": self.free, "running": dict(self.running),
+                "waiting": {app: sum(not f.done() for f in queue) for app, queue in self.waiting.items()}}
+
+
+# === Hosted Apps ===
+# The conversation state of one session, one class per kind of app. turn()
+# returns (reply, name of the agent that answered).
+class ChatSession:
+    # Travel, Career Mentor and class01: a sticky current agent and a
+    # token-budgeted history, like their CLIs.
+    def __init__(self, app: "HostedApp", host: "AgentHost", session_id: str):
+        self.app = app
+        self.host = host
+        self.agent = app.entry()
+        self.history = HistoryStore()
+
+    async def turn(self, message: str, queue_wait: float) -> Tuple[str, str]:
+        self.history.append({"role": "user", "content": message})
+        try:
+            with self.host.metrics.turn(self.app.name, queue_wait) as turn:
+                start = self.app.pick(self.agent, message) if self.app.pick else self.agent
+                result = await self.host.run(start, self.history.window(), run_config=self.app.config(),
+                                             hooks=turn.hooks)
+                turn.finish(result)
+        except BaseException:
+            self.history.pop()
+            raise
+        self.agent = getattr(result, "last_agent", None) or self.agent
+        self.history.append({"role": "assistant", "content": result.final_output})
+        return result.final_output, self.agent.name
+
+
+class GameSession:
+    # One Game Master party; the Campaign records its own turn metrics.
+    def __init__(self, app: "HostedApp", host: "AgentHost", session_id: str):
+        self.campaign = app.module.Campaign(session_id, app.config())
+
+    @property
+    def agent(self) -> Any:
+        return self.campaign.agent
+
+    async def turn(self, message: str, queue_wait: float) -> Tuple[str, str]:
+        output = await self.campaign.play(message)
+        if self.campaign.last_reply is None:
+            raise RuntimeError(next((text for _, text in output if text.startswith("❌")), "Turn failed."))
+        return self.campaign.last_reply, self.agent.name
+
+
+class StudySession:
+    # The Smart Student pipeline (schedule, research, summarize) is plain
+    # Python, so it runs in the shared tool thread pool. A message is
+    # "topic one, topic two | YYYY-MM-DD" or a JSON job like batch.py reads.
+    def __init__(self, app: "HostedApp", host: "AgentHost", session_id: str):
+        self.app = app
+        self.host = host
+
+    async def turn(self, message: str, queue_wait: float) -> Tuple[str, str]:
+        if message.startswith("{"):
+            job = json.loads(message)
+        else:
+            topics, _, deadline = message.rpartition("|")
+            job = {"topics": topics, "deadline": deadline.strip()}
+        topics = job.get("topics", [])
+        topics = [t.strip() for t in (topics.split(",") if isinstance(topics, str) else topics) if t.strip()]
+        if not topics:
+            raise ValueError("No study topics given.")
+        options = {key: job[key] for key in ("weights", "exclude_weekdays", "holidays") if key in job}
+        with self.host.metrics.turn(self.app.name, queue_wait) as turn, turn.tool():
+            plan = await tool_executor_from_env().call(self.app.module.build_study_plan, topics,
+                                                       job.get("deadline", ""), **options)
+        return json.dumps(plan, ensure_ascii=False), "StudyPlanner"
+
+
+@dataclass
+class HostedApp:
+    name: str
+    module: Any
+    session_type: type
+    entry: Optional[Callable[[], Any]] = None
+    pick: Optional[Callable[[Any, str], Any]] = None
+    cacheable: List[str] = field(default_factory=list)
+
+    def config(self) -> Any:
+        from common.provider import get_config
+
+        model = getattr(self.module, "MODEL_NAME", None)
+        return get_config(model) if model else get_config()
+
+    def agents(self) -> Iterable[Any]:
+        graph = getattr(self.module, "graph", None)
+        if graph is None:
+            return []
+        agents = graph.get()
+        return agents["AGENTS"].values() if "AGENTS" in agents else agents.values()
+
+    def warm(self) -> None:
+        # Builds the agent graph and model config now, so no first turn pays for it.
+        if hasattr(self.module, "graph"):
+            list(self.agents())
+            self.config()
+
+
+def hosted_app(name: str) -> HostedApp:
+    module = load_app(name)
+    if name == "travel":
+        graph = module.graph
+        pick = lambda agent, message: (graph.AGENTS.get(module.intent_router.confident(message), agent)
+                                       if agent is graph.TravelAgent else agent)
+        return HostedApp(name, module, ChatSession, lambda: graph.TravelAgent, pick,
+                         ["DestinationAgent", "ExploreAgent"])
+    if name == "career":
+        return HostedApp(name, module, ChatSession, lambda: module.graph.career_agent, module.start_agent,
+                         ["JobAgent"])
+    if name == "class01":
+        return HostedApp(name, module, ChatSession, lambda: module.graph.agent)
+    if name == "game_master":
+        return HostedApp(name, module, GameSession)
+    if name == "study":
+        return HostedApp(name, module, StudySession)
+    raise KeyError(name)
+
+
+# === Agent Host ===
+# Every app runs in this one process. They share the Agents SDK import, the
+# model client and its connection pool, the model scheduler, the response
+# cache, the tool thread pool and the metrics. Sessions are keyed by (app,
+# session) and queued like the Career Mentor server's (common/serving.py), so
+# a session's turns stay in order while sessions run concurrently. FairSlots
+# decides which app's turn runs next.
+class AgentHost:
+    def __init__(self, apps: Dict[str, HostedApp], workers: Dict[str, int], total_workers: int,
+                 max_pending: int = 4, max_sessions: int = 10_000, idle_timeout: float = 600.0):
+        self.apps = apps
+        self.slots = FairSlots(total_workers, workers)
+        self.inboxes = SessionInboxes(self.open_session, self.turn, max_pending, max_sessions,
+                                      "Host is at its session limit, try again later.",
+                                      lambda key: {"app": key[0], "session": key[1]}, idle_timeout)
+        self.metrics = metrics_from_env()
+        self.stats = {name: {"turns": 0, "errors": 0, "rejected": 0} for name in apps}
+        self.cache = None
+        self._run = None
+
+    def start(self) -> "AgentHost":
+        for app in self.apps.values():
+            app.warm()
+        agents = [agent for app in self.apps.values() for agent in app.agents()]
+        self.cache = cache_from_env(agents, cacheable=[n for app in self.apps.values() for n in app.cacheable])
+        if self.cache:
+            self._run = self.cache.run
+        elif agents:
+            from agents import Runner
+
+            self._run = Runner.run
+        return self
+
+    async def run(self, agent: Any, messages: List[Dict[str, str]], **kwargs) -> Any:
+        return await self._run(agent, messages, **kwargs)
+
+    def open_session(self, key: Tuple[str, str]) -> Any:
+        app_name, session_id = key
+        app = self.apps[app_name]
+        return app.session_type(app, self, session_id)
+
+    async def turn(self, session: Session, message: str, queued_at: float) -> Dict[str, Any]:
+        app_name, session_id = session.key
+        stats = self.stats[app_name]
+        reply = {"app": app_name, "session": session_id}
+        try:
+            async with self.slots.slot(app_name):
+                previous = getattr(getattr(session.state, "agent", None), "name", None)
+                answer, agent = await session.state.turn(message, time.perf_counter() - queued_at)
+        except Exception as e:
+            stats["errors"] += 1
+            return {**reply, "error": str(e)}
+        stats["turns"] += 1
+        switched = previous is not None and previous != agent
+        return {**reply, "agent": agent, "switched": switched, "reply": answer}
+
+    async def handle(self, request: Dict[str, Any], conn: Connection) -> None:
+        kind = request.get("type", "message")
+        if kind == "apps":
+            await conn.send({"type": "apps", "apps": list(self.apps)})
+            return
+        if kind == "stats":
+            stats = {"type": "stats", "sessions": len(self.inboxes), "pending": self.inboxes.pending,
+                     "apps": self.stats, "slots": self.slots.summary(),
+                     "latency": {name: self.metrics.summary(name) for name in self.apps}}
+            if self.cache:
+                stats["cache"] = self.cache.summary()
+            await conn.send(stats)
+            return
+
+        app_name = str(request.get("app", ""))
+        session_id = str(request.get("session", ""))
+        if app_name not in self.apps:
+            await conn.send({"app": app_name, "session": session_id,
+                             "error": f"Unknown app, choose from {', '.join(self.apps)}."})
+            return
+        if not session_id:
+            await conn.send({"app": app_name, "error": "Missing 'session'."})
+            return
+        if kind == "close":
+            await conn.send({"app": app_name, "session": session_id,
+                             "closed": await self.inboxes.close((app_name, session_id))})
+            return
+
+        message = str(request.get("message", "")).strip()
+        if not message:
+            await conn.send({"app": app_name, "session": session_id, "error": "Missing 'message'."})
+            return
+        rejected = self.inboxes.submit((app_name, session_id), message, conn)
+        if rejected:
+            self.stats[app_name]["rejected"] += 1
+            await conn.send({"app": app_name, "session": session_id, "error": rejected})
+
+
+def parse_workers(items: Optional[List[str]], apps: Iterable[str], default: int) -> Dict[str, int]:
+    # "travel=4 study=2" overrides the per-app default.
+    workers = dict.fromkeys(apps, default)
+    for item in items or []:
+        name, _, count = item.partition("=")
+        if name not in workers:
+            raise SystemExit(f"Unknown app '{name}' in --app-workers, choose from {', '.join(workers)}")
+        workers[name] = int(count)
+    return workers
+
+
+async def serve(args) -> None:
+    names = args.apps or list(APPS)
+    workers = parse_workers(args.app_workers, names, args.workers)
+    host = AgentHost({name: hosted_app(name) for name in names}, workers, args.total_workers or sum(workers.values()),
+                     args.max_pending, args.max_sessions, args.idle_timeout).start()
+    try:
+        await listen(host.handle, host.inboxes, args, f"🧩 Agent host serving {', '.join(names)} on {{where}}")
+    finally:
+        await host.inboxes.shutdown()
+        from common import provider
+
+        await provider.aclose()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve every agent app from one process over line-delimited JSON")
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument("--stdio", action="store_true", help="Read requests from stdin, write replies to stdout")
+    transport.add_argument("--unix", metavar="PATH", help="Listen on a Unix socket")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8766, help="TCP port (default: 8766)")
+    parser.add_argument("--apps", nargs="+", choices=list(APPS), help="Apps to host (default: all)")
+    parser.add_argument("--workers", type=int, default=16, help="Turns each app may run at once")
+    parser.add_argument("--app-workers", metavar="APP=N", nargs="+", help="Per-app overrides of --workers")
+    parser.add_argument("--total-workers", type=int, default=0,
+                        help="Turns all apps may run at once (default: the sum of the per-app workers)")
+    parser.add_argument("--max-pending", type=int, default=4, help="Queued messages allowed per session")
+    parser.add_argument("--max-sessions", type=int, default=10_000, help="Cap on open sessions across apps")
+    parser.add_argument("--idle-timeout", type=float, default=600.0,
+                        help="Seconds a quiet session is kept once the session cap is reached (default: 600)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(serve(parse_args()))
@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from main import build_study_plan
+from output_writer import FORMATS, open_writer
+
+
+# === Job Input ===
+# One job per line, either JSON ({"id": ..., "topics": [...] or "a, b", "deadline": "YYYY-MM-DD"},
+# optionally with "weights", "exclude_weekdays" and "holidays") or plain text
+# "topic one, topic two | YYYY-MM-DD". A line that is not valid JSON becomes
+# an error job, so it is reported like any other failed job and the rest of
+# the file still runs.
+SCHEDULE_OPTIONS = ("weights", "exclude_weekdays", "holidays")
+
+
+def parse_job(line: str, line_no: int) -> Optional[Dict]:
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        try:
+            job = json.loads(line)
+        except ValueError as e:
+            return {"id": str(line_no), "error": f"Invalid JSON on line {line_no}: {e}"}
+        if not isinstance(job, dict):
+            return {"id": str(line_no), "error": f"Line {line_no} is not a JSON object."}
+    else:
+        topics, _, deadline = line.rpartition("|")
+        job = {"topics": topics, "deadline": deadline.strip()}
+    topics = job.get("topics", [])
+    if isinstance(topics, str):
+        topics = topics.split(",")
+    return {
+        "id": str(job.get("id", line_no)),
+        "topics": [t.strip() for t in topics if t and t.strip()],
+        "deadline": job.get("deadline", ""),
+        "options": {key: job[key] for key in SCHEDULE_OPTIONS if key in job},
+    }
+
+
+def read_jobs(stream: TextIO) -> Iterator[Dict]:
+    for line_no, line in enumerate(stream, 1):
+        job = parse_job(line, line_no)
+        if job is not None:
+            yield job
+
+
+# === Pipeline ===
+def run_job(job: Dict) -> Dict:
+    if "error" in job:
+        return job
+    if not job["topics"]:
+        return {"id": job["id"], "error": "No valid topics provided."}
+    try:
+        plan = build_study_plan(job["topics"], job["deadline"], **job.get("options", {}))
+        return {"id": job["id"], "deadline": job["deadline"], "plan": plan}
+    except Exception as e:
+        return {"id": job["id"], "error": str(e)}
+
+
+def _run_chunk(jobs: List[Dict]) -> List[Dict]:
+    return [run_job(job) for job in jobs]
+
+
+def _chunked(jobs: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    it = iter(jobs)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def iter_results(jobs: Iterable[Dict], workers: int = 0, chunk_size: int = 64) -> Iterator[Dict]:
+    # Results are yielded as chunks complete (not in input order). Only
+    # 2 * workers chunks are in flight, so arbitrarily long job streams run
+    # in constant memory.
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(run_job, jobs)
+        return
+
+    chunks = _chunked(jobs, chunk_size)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_run_chunk, chunk) for chunk in islice(chunks, workers * 2)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+                for chunk in islice(chunks, 1):
+                    pending.add(pool.submit(_run_chunk, chunk))
+
+
+def run_batch(jobs: Iterable[Dict], output_path: str, fmt: Optional[str] = None, workers: int = 0,
+              chunk_size: int = 64, flush_every: int = 500, resume: bool = False) -> Dict[str, int]:
+    stats = {"written": 0, "errors": 0, "skipped": 0}
+    # Failed jobs are dropped from a resumed output and run again.
+    with open_writer(output_path, fmt, flush_every=flush_every, resume=resume,
+                     keep=lambda record: "error" not in record) as writer:
+        done = {record.get("id") for record in writer.existing}
+
+        def pending_jobs() -> Iterator[Dict]:
+            for job in jobs:
+                if job["id"] in done:
+                    stats["skipped"] += 1
+                else:
+                    yield job
+
+        for result in iter_results(pending_jobs(), workers, chunk_size):
+            writer.write(result)
+            stats["written"] += 1
+            stats["errors"] += "error" in result
+    return stats
+
+
+# === CLI ===
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate study plans for many (topics, deadline) jobs")
+    parser.add_argument("jobs", nargs="?", default="-", help="Jobs file (JSON Lines or 'topics | deadline' lines); '-' for stdin")
+    parser.add_argument("-o", "--output", default="study_plans.jsonl", help="Output file path")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="Output format; inferred from --output by default")
+    parser.add_argument("-w", "--workers", type=int, default=0, help="Worker processes (default: CPU count, 1 = in-process)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Jobs sent to a worker at a time")
+    parser.add_argument("--flush-every", type=int, default=500, help="Flush to disk every N results")
+    parser.add_argument("--resume", action="store_true", help="Skip job ids already in the output; failed ones run again")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    source = sys.stdin if args.jobs == "-" else open(args.jobs, encoding="utf-8")
+    with source:
+        stats = run_batch(read_jobs(source), args.output, args.format, args.workers,
+                          args.chunk_size, args.flush_every, args.resume)
+    print(f"✅ {stats['written']} plan(s) written to {args.output} "
+          f"({stats['errors']} error(s), {stats['skipped']} skipped)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,18 @@
+import argparse
 import datetime
-import json
-from typing import Dict, List
+from typing import Dict, List, Sequence
+
+from output_writer import FORMATS, open_writer
+from research import default_registry
+from scheduler import StudyPlan, build_schedule
 
 #Schedular Agent
-def schedular_agent(topics: list[str], deadline: str) -> List[Dict]:
+def schedular_agent(topics: list[str], deadline: str, weights: list[float] | None = None,
+                    exclude_weekdays: Sequence[int] = (), holidays: Sequence[str] = ()) -> List[Dict]:
+    return schedule_topics(topics, deadline, weights, exclude_weekdays, holidays).to_records()
+
+def schedule_topics(topics: list[str], deadline: str, weights: list[float] | None = None,
+                    exclude_weekdays: Sequence[int] = (), holidays: Sequence[str] = ()) -> StudyPlan:
     try:
         deadline_date = datetime.datetime.strptime(deadline, "%Y-%m-%d").date()
     except ValueError:
@@ -14,34 +23,30 @@ def schedular_agent(topics: list[str], deadline: str) -> List[Dict]:
     if days_remaining <= 0:
         raise ValueError("The deadline must be a future date.")
 
-    study_days = max(1, days_remaining // len(topics)) 
-    study_plan = []
-    current_day = today
-
-    for topic in topics:
-        end_day = current_day + datetime.timedelta(days=study_days - 1)
-        study_plan.append({
-            "topic": topic,
-            "start_date": str(current_day),
-            "end_date": str(end_day)
-        })
-        current_day = end_day + datetime.timedelta(days=1)
-        return study_plan
+    return build_schedule(topics, deadline_date, today, weights, exclude_weekdays, holidays)
     
 #Research Agent
 def research_agent(topic: str) -> list[str]:
-    return [ 
-        f"What is {topic}? - https://www.wikipedia.org/wiki{topic.replace(' ', '_')}",
-        f"Youtube Intro to {topic} - https://www.youtube.com/results?search_query=introduction+to+{topic.replace(' ', '+')}",
-        f"Benefits and Risks of {topic} - https://medium.com/tag/{topic.replace(' ', '-')}",
-        f"Research papers on {topic} - https://scholar.google.com/scholar?q={topic.replace(' ', '+')}",
-    ]
+    return list(default_registry.links(topic))
 
 #Summarizer Agent
 def summarizer_agent(snippets: List[str]) -> str:
     return " | ".join(snippets)
 
-def run_study_assistant():
+def build_study_plan(topics: List[str], deadline: str, **schedule_options) -> List[Dict]:
+    plan = []
+    for item in schedular_agent(topics, deadline, **schedule_options):
+        research = research_agent(item["topic"])
+        plan.append({
+            "topic": item["topic"],
+            "start_date": item["start_date"],
+            "end_date": item["end_date"],
+            "summary": summarizer_agent(research)
+        })
+    return plan
+
+def run_study_assistant(output_path: str = "study_assistant_output.json", fmt: str | None = None,
+                        flush_every: int = 50, resume: bool = False):
     topics_input = input("Enter the study topics , separated by commas: ")
     deadline = input("Enter the deadline (YYYY-MM-DD): ")
     topics = [t.strip() for t in topics_input.split(",") if t.strip()]
@@ -55,26 +60,40 @@ def run_study_assistant():
     except Exception as e:
         print(f"Error : {e}")
         return
-    full_output = []
 
-    for item in study_plan:
-        topics = item["topic"]
-        print(f"Researching {topics}...")
-        research = research_agent(topics)
-        summary = summarizer_agent(research)
+    with open_writer(output_path, fmt, flush_every=flush_every, resume=resume) as writer:
+        done = {record.get("topic") for record in writer.existing}
+        if done:
+            print(f"Resuming: {len(done)} topic(s) already saved in {output_path}")
 
-        item_output = {
-            "topic": item["topic"],
-            "start_date": item["start_date"],
-            "end_date": item["end_date"],
-            "summary": summary
-        }
-        full_output.append(item_output)
-        print(f"Summary for {topics} : \n {summary}")
+        for item in study_plan:
+            topics = item["topic"]
+            if topics in done:
+                continue
+            print(f"Researching {topics}...")
+            research = research_agent(topics)
+            summary = summarizer_agent(research)
+
+            item_output = {
+                "topic": item["topic"],
+                "start_date": item["start_date"],
+                "end_date": item["end_date"],
+                "summary": summary
+            }
+            writer.write(item_output)
+            print(f"Summary for {topics} : \n {summary}")
+
+    print(f"\n study plan and summaries as saved in your {output_path} file")
 
-        with open("study_assistant_output.json", "w") as f:
-            json.dump(full_output, f, indent=4)
-            print("\n study plan and summaries as saved in your study_assistant_output.json file")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Smart Student Agent Assistant")
+    parser.add_argument("--output", default="study_assistant_output.json", help="Output file path")
+    parser.add_argument("--format", choices=FORMATS, default=None,
+                        help="'array' (JSON array) or 'jsonl' (JSON Lines); inferred from --output by default")
+    parser.add_argument("--flush-every", type=int, default=50, help="Flush to disk every N topic records")
+    parser.add_argument("--resume", action="store_true", help="Continue from a partial output file")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    run_study_assistant()
\ No newline at end of file
+    args = parse_args()
+    run_study_assistant(args.output, args.format, args.flush_every, args.resume)
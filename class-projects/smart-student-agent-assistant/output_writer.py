@@ -0,0 +1,140 @@
+import json
+import os
+from typing import Callable, Dict, Iterator, List, Optional
+
+FORMATS = ("array", "jsonl")
+
+
+# === Streaming Output Writer ===
+# Records are appended once to "<path>.partial" (one record per line) and
+# flushed in batches. close() finalizes by atomically renaming the partial
+# file over the target, so a crash never leaves a half-written output file
+# and every flushed record survives for --resume. On resume, records that
+# fail `keep` are dropped so their jobs can be written again.
+class StreamingJSONWriter:
+    def __init__(self, path: str, fmt: str = "array", flush_every: int = 50,
+                 resume: bool = False, fsync: bool = True, keep: Optional[Callable[[Dict], bool]] = None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format '{fmt}'. Use one of: {', '.join(FORMATS)}.")
+        self.path = path
+        self.partial_path = path + ".partial"
+        self.fmt = fmt
+        self.flush_every = max(1, flush_every)
+        self.fsync = fsync
+        self.count = 0
+        self.existing: List[Dict] = []
+        self._buffer: List[str] = []
+
+        if resume:
+            self.existing = self._recover()
+            if keep is not None and not all(map(keep, self.existing)):
+                self.existing = [record for record in self.existing if keep(record)]
+                self._rewrite(self.existing)
+            self.count = len(self.existing)
+            self._file = open(self.partial_path, "a", encoding="utf-8")
+        else:
+            self._file = open(self.partial_path, "w", encoding="utf-8")
+            if fmt == "array":
+                self._file.write("[\n")
+
+    def __enter__(self) -> "StreamingJSONWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # Keep the partial file for --resume, but make sure it is on disk.
+            self.flush()
+            self._file.close()
+
+    def write(self, record: Dict) -> None:
+        line = json.dumps(record, ensure_ascii=False)
+        if self.fmt == "array" and self.count:
+            line = ",\n" + line
+        elif self.fmt == "jsonl":
+            line += "\n"
+        self._buffer.append(line)
+        self.count += 1
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._file.write("".join(self._buffer))
+            self._buffer.clear()
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        if self.fmt == "array":
+            self._buffer.append("\n]\n" if self.count else "]\n")
+        self.flush()
+        self._file.close()
+        os.replace(self.partial_path, self.path)
+
+    # === Resume ===
+    def _recover(self) -> List[Dict]:
+        if os.path.exists(self.partial_path):
+            records, good_offset = _scan_partial(self.partial_path)
+            with open(self.partial_path, "r+b") as f:
+                f.truncate(good_offset)
+                f.seek(good_offset)
+                if good_offset == 0 and self.fmt == "array":
+                    f.write(b"[\n")
+                elif records and self.fmt == "jsonl":
+                    f.write(b"\n")
+            return records
+
+        records = list(read_records(self.path)) if os.path.exists(self.path) else []
+        self._rewrite(records)
+        return records
+
+    def _rewrite(self, records: List[Dict]) -> None:
+        with open(self.partial_path, "w", encoding="utf-8") as f:
+            if self.fmt == "array":
+                f.write("[\n" + ",\n".join(json.dumps(r, ensure_ascii=False) for r in records))
+            else:
+                f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+
+
+def _scan_partial(path: str) -> tuple[List[Dict], int]:
+    # Returns the intact records and the byte offset just past the last one,
+    # dropping a torn trailing line left behind by a crash mid-write.
+    records: List[Dict] = []
+    good_offset = 0
+    line_start = 0
+    with open(path, "rb") as f:
+        for raw in f:
+            body = raw.strip().lstrip(b",").rstrip(b",").strip()
+            if body == b"[":
+                good_offset = line_start + len(raw)
+            elif body and body != b"]":
+                try:
+                    records.append(json.loads(body))
+                except json.JSONDecodeError:
+                    break
+                good_offset = line_start + len(raw.rstrip().rstrip(b",").rstrip())
+            line_start += len(raw)
+    return records, good_offset
+
+
+def read_records(path: str) -> Iterator[Dict]:
+    with open(path, encoding="utf-8") as f:
+        head = f.read(1)
+        f.seek(0)
+        if head == "[":
+            yield from json.load(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def open_writer(path: str, fmt: Optional[str] = None, **kwargs) -> StreamingJSONWriter:
+    if fmt is None:
+        fmt = "jsonl" if path.endswith((".jsonl", ".ndjson")) else "array"
+    return StreamingJSONWriter(path, fmt=fmt, **kwargs)
@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Tuple
+from urllib.parse import quote, quote_plus
+
+# === URL Encoders ===
+ENCODERS: Dict[str, Callable[[str], str]] = {
+    "path": lambda topic: quote(topic.replace(" ", "_")),
+    "slug": lambda topic: quote(topic.replace(" ", "-")),
+    "query": quote_plus,
+}
+
+
+@dataclass(frozen=True)
+class LinkSource:
+    name: str
+    label: str      # e.g. "What is {topic}?"
+    url: str        # e.g. "https://en.wikipedia.org/wiki/{encoded}"
+    encoding: str = "query"
+
+    def __post_init__(self):
+        if self.encoding not in ENCODERS:
+            raise ValueError(f"Unknown encoding '{self.encoding}'. Use one of: {', '.join(ENCODERS)}.")
+
+
+DEFAULT_SOURCES = (
+    LinkSource("wikipedia", "What is {topic}?", "https://en.wikipedia.org/wiki/{encoded}", "path"),
+    LinkSource("youtube", "Youtube Intro to {topic}", "https://www.youtube.com/results?search_query=introduction+to+{encoded}"),
+    LinkSource("medium", "Benefits and Risks of {topic}", "https://medium.com/tag/{encoded}", "slug"),
+    LinkSource("scholar", "Research papers on {topic}", "https://scholar.google.com/scholar?q={encoded}"),
+)
+
+
+def normalize_topic(topic: str) -> str:
+    return " ".join(topic.split())
+
+
+# === Link Registry ===
+# Each source is compiled once into a single "<label> - <url>" format string.
+# Links are memoized per normalized topic in a bounded LRU, so a topic that
+# repeats across a batch costs one dict lookup.
+class LinkRegistry:
+    def __init__(self, sources: Iterable[LinkSource] = DEFAULT_SOURCES, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._sources: Dict[str, LinkSource] = {}
+        for source in sources:
+            self._sources[source.name] = source
+        self._compile()
+
+    def _compile(self) -> None:
+        templates = tuple((f"{s.label} - {s.url}", ENCODERS[s.encoding]) for s in self._sources.values())
+        encoders = {encode for _, encode in templates}
+
+        def build(topic: str) -> Tuple[str, ...]:
+            encoded = {encode: encode(topic) for encode in encoders}
+            return tuple(t.format(topic=topic, encoded=encoded[encode]) for t, encode in templates)
+
+        self._cached = lru_cache(maxsize=self.maxsize)(build)
+
+    @property
+    def sources(self) -> Tuple[LinkSource, ...]:
+        return tuple(self._sources.values())
+
+    def register(self, source: LinkSource) -> None:
+        self._sources[source.name] = source
+        self._compile()
+
+    def unregister(self, name: str) -> None:
+        del self._sources[name]
+        self._compile()
+
+    def links(self, topic: str) -> Tuple[str, ...]:
+        return self._cached(normalize_topic(topic))
+
+    def stats(self) -> Dict[str, int]:
+        info = self._cached.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": self.maxsize}
+
+
+default_registry = LinkRegistry()
@@ -0,0 +1,99 @@
+import datetime
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+DateLike = Union[datetime.date, str]
+
+
+# === Columnar Study Plan ===
+@dataclass
+class StudyPlan:
+    topics: List[str]
+    start: np.ndarray  # datetime64[D]
+    end: np.ndarray    # datetime64[D]
+    days: np.ndarray   # study days per topic
+
+    def __len__(self) -> int:
+        return len(self.topics)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.to_records())
+
+    def start_dates(self) -> List[str]:
+        return np.datetime_as_string(self.start, unit="D").tolist()
+
+    def end_dates(self) -> List[str]:
+        return np.datetime_as_string(self.end, unit="D").tolist()
+
+    def to_records(self) -> List[Dict]:
+        return [
+            {"topic": topic, "start_date": start, "end_date": end}
+            for topic, start, end in zip(self.topics, self.start_dates(), self.end_dates())
+        ]
+
+
+# === Allocation ===
+def allocate_days(total_days: int, weights: np.ndarray) -> np.ndarray:
+    # Every topic gets one day; the rest are shared in proportion to weight
+    # using the largest-remainder method, so all available days are used.
+    n = len(weights)
+    extra = total_days - n
+    if extra <= 0:
+        return np.ones(n, dtype=np.int64)
+    weight_sum = weights.sum()
+    if weight_sum <= 0 or (weights < 0).any():
+        raise ValueError("Topic weights must be non-negative and add up to a positive number.")
+    exact = weights * (extra / weight_sum)
+    days = np.floor(exact).astype(np.int64)
+    leftover = extra - int(days.sum())
+    if leftover > 0:
+        # Stable sort, so ties go to earlier topics.
+        days[np.argsort(days - exact, kind="stable")[:leftover]] += 1
+    return days + 1
+
+
+def study_calendar(start: np.datetime64, min_days: int, until: np.datetime64,
+                   exclude_weekdays: Iterable[int] = (), holidays: Iterable[DateLike] = ()) -> np.ndarray:
+    # Every study day from start up to (not including) until with excluded
+    # weekdays and holidays masked out, extended past until when needed so
+    # that at least min_days study days exist.
+    excluded = set(exclude_weekdays)
+    weekmask = [w not in excluded for w in range(7)]
+    open_days = sum(weekmask)
+    if not open_days:
+        raise ValueError("At least one weekday must be available for studying.")
+    holiday_days = np.array([str(h) for h in holidays], dtype="datetime64[D]")
+    until_span = int((until - start) // np.timedelta64(1, "D"))
+
+    if open_days == 7 and not len(holiday_days):
+        return np.arange(start, start + max(until_span, min_days), dtype="datetime64[D]")
+    span = max(until_span, (min_days + len(holiday_days)) * 7 // open_days + 7)
+    days = np.arange(start, start + span, dtype="datetime64[D]")
+    return days[np.is_busday(days, weekmask=weekmask, holidays=holiday_days)]
+
+
+# === Scheduler Engine ===
+def build_schedule(topics: Sequence[str], deadline: DateLike, start: Optional[DateLike] = None,
+                   weights: Optional[Sequence[float]] = None, exclude_weekdays: Iterable[int] = (),
+                   holidays: Iterable[DateLike] = ()) -> StudyPlan:
+    if not len(topics):
+        raise ValueError("At least one topic is required.")
+    weights = np.ones(len(topics)) if weights is None else np.asarray(weights, dtype=np.float64)
+    if weights.shape != (len(topics),):
+        raise ValueError("Provide exactly one weight per topic.")
+    start_day = np.datetime64(start if start is not None else datetime.date.today(), "D")
+    deadline_day = np.datetime64(deadline, "D")
+
+    calendar = study_calendar(start_day, len(topics), deadline_day, exclude_weekdays, holidays)
+    available = int(np.searchsorted(calendar, deadline_day))
+    days = allocate_days(available, weights)
+
+    end_idx = np.cumsum(days)
+    return StudyPlan(
+        topics=list(topics),
+        start=calendar[end_idx - days],
+        end=calendar[end_idx - 1],
+        days=days,
+    )
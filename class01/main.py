@@ -1,10 +1,44 @@
-from agents import Agent, Runner
-from dotenv import load_dotenv
+import os
+import sys
+from pathlib import Path
 
-load_dotenv()
+# Shared instrumentation lives with the Big Agents projects.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "class-projects" / "Big Agents"))
+from common.lazy import AgentGraph
+from common.metrics import format_summary, metrics_from_env
 
-agent = Agent(name = "Assistant", instructions = "You are a helpful assistant.")
+# The agent (and the Agents SDK import) is only built when first used.
+def build_agents() -> dict:
+    from agents import Agent
 
-result = Runner.run_sync(agent, "What is PIAIC ?")
+    return {"agent": Agent(name = "Assistant", instructions = "You are a helpful assistant.")}
 
-print(result.final_output)
\ No newline at end of file
+graph = AgentGraph(build_agents)
+__getattr__ = graph.module_getattr
+
+def main():
+    from agents import Runner
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    metrics = metrics_from_env()
+
+    # With AGENT_CASSETTE set the run goes through the shared client so it can
+    # be recorded and replayed offline (common/cassette.py).
+    run_config = None
+    if os.getenv("AGENT_CASSETTE"):
+        from common.provider import get_config
+
+        run_config = get_config()
+
+    with metrics.turn("class01") as turn:
+        result = Runner.run_sync(graph.agent, "What is PIAIC ?", hooks = turn.hooks, run_config = run_config)
+        turn.finish(result)
+
+    print(result.final_output)
+
+    if metrics.exporting:
+        print(f"📈 Latency: {format_summary(metrics.summary('class01'))}")
+
+if __name__ == "__main__":
+    main()